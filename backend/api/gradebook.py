@@ -0,0 +1,146 @@
+# backend/api/gradebook.py
+
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from backend.database import students_collection
+
+GRADEBOOK_MAX_LIMIT = 200
+
+router = APIRouter()
+
+
+def scope_match(topic_id: Optional[str], subtopic_id: Optional[str]) -> dict:
+    match = {}
+    if topic_id:
+        match["topic_id"] = topic_id.lower().strip()
+    if subtopic_id:
+        match["subtopic_id"] = subtopic_id.lower().strip()
+    return match
+
+
+def build_gradebook_pipeline(
+    after: Optional[str] = None,
+    limit: int = 50,
+    topic_id: Optional[str] = None,
+    subtopic_id: Optional[str] = None,
+    allowed: Optional[bool] = None,
+) -> list:
+    """
+    One page of the gradebook as a single aggregation over students.
+
+    Students are paged by user_id (keyset, so a page costs the same at any
+    offset) and each page joins its own progress and assignment grades
+    through the student_id indexes; nothing outside the page is read.
+    Progress is rolled up per (topic, subtopic) inside the join. The
+    localField + pipeline form of $lookup needs MongoDB 5.0+.
+    """
+    match = {"user_id": {"$gt": after or ""}}
+    if allowed is not None:
+        match["allowed"] = allowed
+    scope = scope_match(topic_id, subtopic_id)
+
+    return [
+        {"$match": match},
+        {"$sort": {"user_id": 1}},
+        {"$limit": limit + 1},  # one extra row tells us whether there is a next page
+        {"$lookup": {
+            "from": "progress",
+            "localField": "user_id",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": scope},
+                {"$group": {
+                    "_id": {"topic_id": "$topic_id", "subtopic_id": "$subtopic_id"},
+                    "average_grade": {"$avg": {"$ifNull": ["$topic_grade", 0]}},
+                    "average_quiz_score": {"$avg": {"$ifNull": ["$quiz_score", 0]}},
+                    "completed": {"$sum": {"$cond": [{"$gte": [{"$ifNull": ["$topic_grade", 0]}, 100]}, 1, 0]}},
+                    "started": {"$sum": 1},
+                }},
+            ],
+            "as": "progress",
+        }},
+        {"$lookup": {
+            "from": "assignment_grades",
+            "localField": "user_id",
+            "foreignField": "student_id",
+            "pipeline": [
+                {"$match": scope},
+                {"$project": {"_id": 0, "topic_id": 1, "subtopic_id": 1, "score": 1}},
+            ],
+            "as": "assignments",
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": 1,
+            "first_name": 1,
+            "last_name": 1,
+            "allowed": 1,
+            "progress": 1,
+            "assignments": 1,
+            "average_grade": {"$ifNull": [{"$avg": "$progress.average_grade"}, 0]},
+            "average_assignment_score": {"$avg": "$assignments.score"},
+            "completed": {"$sum": "$progress.completed"},
+            "started": {"$sum": "$progress.started"},
+        }},
+    ]
+
+
+def gradebook_row(doc: dict) -> dict:
+    """Student row with one cell per "topic/subtopic" column."""
+    cells = {}
+    for group in doc.pop("progress", []):
+        column = f"{group['_id']['topic_id']}/{group['_id']['subtopic_id']}"
+        cells[column] = {
+            "average_grade": round(group["average_grade"], 1),
+            "average_quiz_score": round(group["average_quiz_score"], 1),
+            "completed": group["completed"],
+            "started": group["started"],
+            "assignment_score": None,
+        }
+    for grade in doc.pop("assignments", []):
+        column = f"{grade.get('topic_id')}/{grade.get('subtopic_id')}"
+        cells.setdefault(column, {"average_grade": 0, "average_quiz_score": 0, "completed": 0, "started": 0})
+        cells[column]["assignment_score"] = grade.get("score")
+
+    doc["average_grade"] = round(doc["average_grade"], 1)
+    if doc.get("average_assignment_score") is not None:
+        doc["average_assignment_score"] = round(doc["average_assignment_score"], 1)
+    doc["cells"] = cells
+    return doc
+
+
+async def gradebook_page(
+    students=students_collection,
+    after: Optional[str] = None,
+    limit: int = 50,
+    topic_id: Optional[str] = None,
+    subtopic_id: Optional[str] = None,
+    allowed: Optional[bool] = None,
+) -> dict:
+    pipeline = build_gradebook_pipeline(after, limit, topic_id, subtopic_id, allowed)
+    docs = await students.aggregate(pipeline).to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    rows = [gradebook_row(doc) for doc in docs[:limit]]
+    return {
+        "columns": sorted({column for row in rows for column in row["cells"]}),
+        "students": rows,
+        "next_cursor": rows[-1]["user_id"] if has_more else None,
+    }
+
+
+@router.get("/gradebook")
+async def get_gradebook(
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=GRADEBOOK_MAX_LIMIT),
+    topic_id: Optional[str] = None,
+    subtopic_id: Optional[str] = None,
+    allowed: Optional[bool] = None,
+):
+    """
+    Student x topic matrix for the admin panel: per (topic, subtopic) the
+    average grade, average quiz score, nested subtopics completed/started
+    and the assignment score, plus per-student averages.
+    """
+    return await gradebook_page(students_collection, after, limit, topic_id, subtopic_id, allowed)
@@ -1,11 +1,191 @@
 # backend/api/quiz.py
 
-from fastapi import APIRouter
-from learning_objectives.digital_electronics.number_systems.binary_quiz import generate_binary_quiz
+import os
+import json
+import asyncio
+import hashlib
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+
+from backend.cache import TTLCache
+from backend.database import progress_collection, quiz_submissions_collection, student_summaries_collection
+from backend.objective_loader import load_quiz, load_quiz_scorer
+from backend.progress_store import progress_query, upsert_progress
+from backend.progress_cache import remember_progress
+from backend.quiz_submissions import save_submission
+
+QUIZ_POOL_SIZE = int(os.getenv("QUIZ_POOL_SIZE", "8"))  # pre-rendered unseeded quizzes per quiz/count
+QUIZ_POOL_TTL = float(os.getenv("QUIZ_POOL_TTL", "300"))  # seconds before a pool is regenerated
+QUIZ_SEEDED_CACHE_SIZE = int(os.getenv("QUIZ_SEEDED_CACHE_SIZE", "2048"))
+QUIZ_MAX_COUNT = 100
 
 router = APIRouter()
 
+# Seeded quizzes are deterministic: (quiz, count, seed, student) -> (body, etag)
+seeded_quizzes = TTLCache(max_entries=QUIZ_SEEDED_CACHE_SIZE, ttl=None)
+# Unseeded quizzes: a few pre-rendered bodies per (quiz, count), handed out round-robin
+quiz_pools = TTLCache(max_entries=256, ttl=QUIZ_POOL_TTL)
+_pool_cursors = {}
+
+
+def render_quiz(payload: dict):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def quiz_payload(key: tuple, count: Optional[int], seed: Optional[str], quiz: list) -> dict:
+    topic_id, subtopic_id, nested_subtopic_id = key
+    return {
+        "topic_id": topic_id,
+        "subtopic_id": subtopic_id,
+        "nested_subtopic_id": nested_subtopic_id,
+        "count": len(quiz),
+        "seed": seed,
+        "quiz": quiz,
+    }
+
+
+def pooled_quiz(spec, key: tuple, count: Optional[int]):
+    pool_key = key + (count,)
+    pool = quiz_pools.get(pool_key)
+    if pool is None:
+        pool = [render_quiz(quiz_payload(key, count, None, quiz)) for quiz in spec.generate_many(QUIZ_POOL_SIZE, count=count)]
+        quiz_pools.set(pool_key, pool)
+    cursor = _pool_cursors.get(pool_key, 0)
+    _pool_cursors[pool_key] = cursor + 1
+    return pool[cursor % len(pool)]
+
+
+@router.get("/quiz/{topic_id}/{subtopic_id}/{nested_subtopic_id}")
+async def get_quiz(
+    topic_id: str,
+    subtopic_id: str,
+    nested_subtopic_id: str,
+    request: Request,
+    count: Optional[int] = Query(None, ge=1, le=QUIZ_MAX_COUNT),
+    seed: Optional[str] = Query(None, max_length=64),
+    student_id: Optional[str] = Query(None, max_length=128),
+):
+    """
+    A quiz for the nested subtopic. With `seed` (optionally per `student_id`)
+    the quiz is reproducible and cacheable by ETag; without it, quizzes come
+    from a small pre-generated pool.
+    """
+    key = (topic_id, subtopic_id, nested_subtopic_id)
+    spec = load_quiz(*key)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"No quiz for {topic_id}/{subtopic_id}/{nested_subtopic_id}")
+
+    if seed is None and student_id is None:
+        body, etag = pooled_quiz(spec, key, count)
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+    cache_key = key + (count, seed, student_id)
+    rendered = seeded_quizzes.get(cache_key)
+    if rendered is None:
+        quiz = spec.generate(seed=seed, student_id=student_id, count=count)
+        rendered = render_quiz(quiz_payload(key, count, seed, quiz))
+        seeded_quizzes.set(cache_key, rendered)
+    body, etag = rendered
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": ("private" if student_id else "public") + ", max-age=3600",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/quiz/binary")
-async def get_binary_quiz():
-    quiz = generate_binary_quiz()
-    return {"quiz": quiz}
+async def get_binary_quiz(request: Request):
+    """Legacy path for the binary quiz."""
+    return await get_quiz("digital_electronics", "number_systems", "binary", request, None, None, None)
+
+
+class QuizAnswer(BaseModel):
+    type: str
+    question: str = ""
+    student_answer: str = ""
+
+
+class QuizSubmission(BaseModel):
+    student_id: str
+    topic_id: str
+    subtopic_id: str
+    nested_subtopic_id: str
+    answers: List[QuizAnswer]
+    # Identify the quiz that was issued: GET /quiz/... with this student_id, seed and count
+    seed: Optional[str] = Field(None, max_length=64)
+    count: Optional[int] = Field(None, ge=1, le=QUIZ_MAX_COUNT)
+
+
+def issued_questions(spec, submission: QuizSubmission) -> List[tuple]:
+    """(type, question) of every question GET /quiz gave this student for the submission's seed and count."""
+    quiz = spec.generate(seed=submission.seed, student_id=submission.student_id, count=submission.count)
+    return [(q["type"], q["question"]) for q in quiz]
+
+
+def check_answers(issued: List[tuple], answers: List[dict]):
+    """422 unless `answers` holds exactly one answer to each issued question."""
+    expected = set(issued)
+    seen = set()
+    for answer in answers:
+        question = (answer["type"], answer["question"])
+        if question not in expected:
+            raise HTTPException(status_code=422, detail=f"Question is not part of this quiz: {answer['question']!r}")
+        if question in seen:
+            raise HTTPException(status_code=422, detail=f"Question answered more than once: {answer['question']!r}")
+        seen.add(question)
+    if len(seen) != len(expected):
+        raise HTTPException(status_code=422, detail=f"Expected answers to all {len(expected)} questions, got {len(seen)}")
+
+
+@router.post("/quiz/submit")
+async def submit_quiz(submission: QuizSubmission):
+    """
+    Score a quiz server-side, store the submission and merge the result into
+    progress. The quiz is rebuilt from (student_id, seed, count) exactly as
+    GET /quiz issued it, and the answers must cover those questions, once each.
+    """
+    key = (submission.topic_id, submission.subtopic_id, submission.nested_subtopic_id)
+    spec = load_quiz(*key)
+    score_submission = load_quiz_scorer(submission.topic_id, submission.subtopic_id)
+    if spec is None or score_submission is None:
+        raise HTTPException(status_code=404, detail=f"No quiz checker for {'/'.join(key)}")
+
+    answers = [a.model_dump() for a in submission.answers]
+    if not answers:
+        # Never reaches progress: an empty submission would overwrite quiz_score with 0
+        raise HTTPException(status_code=422, detail="Empty quiz submission")
+    check_answers(issued_questions(spec, submission), answers)
+    result = score_submission(submission.nested_subtopic_id, answers)
+
+    _, updated = await asyncio.gather(
+        save_submission(quiz_submissions_collection, {**submission.model_dump(), "answers": answers}, result),
+        upsert_progress(
+            progress_collection,
+            progress_query(submission.student_id, *key),
+            quiz_flags=result["quiz_objective_progress"],
+            quiz_score=result["score"],
+            summaries=student_summaries_collection,
+        ),
+    )
+
+    remember_progress(updated)
+
+    return {
+        "score": result["score"],
+        "correct": result["correct"],
+        "total": result["total"],
+        "results": result["results"],
+        "quiz_objective_progress": result["quiz_objective_progress"],
+        "topic_grade": updated.get("topic_grade", 0) if updated else 0,
+    }
+
+
+@router.get("/metrics/quiz-cache")
+async def quiz_cache_metrics():
+    return {"seeded": seeded_quizzes.stats(), "pools": quiz_pools.stats()}
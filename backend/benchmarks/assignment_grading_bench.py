@@ -0,0 +1,111 @@
+# assignment_grading_bench.py — legacy iterrows grader vs the declarative engine
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.assignment_grading_bench --workbooks 500 --filler-rows 400
+#
+# Generates number systems workbooks shaped like the real assignment: a
+# "Quick Conversions Review" sheet with the answer table on rows 14-18
+# next to practice sheets the grader doesn't need, with random mistakes.
+
+import time
+import random
+import argparse
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook
+
+from backend.objective_loader import assignment_graders
+
+number_systems = assignment_graders.get_module(("digital_electronics", "number_systems"))
+SPEC = number_systems.SPEC
+
+
+def legacy_grade(file: bytes) -> dict:
+    """The original grader: reads every sheet, then walks the table with iterrows."""
+    try:
+        df_dict = pd.read_excel(BytesIO(file), sheet_name=None)
+        review_df = df_dict.get("Quick Conversions Review")
+        if review_df is None:
+            return {"score": 0, "feedback": "❌ Missing 'Quick Conversions Review' sheet in your Excel file."}
+        review_data = review_df.iloc[12:, 1:8].copy()
+        review_data.columns = ["Question", "Decimal", "Binary", "Octal", "Hex", "BCD", "Gray"]
+        review_data.reset_index(drop=True, inplace=True)
+        for col in review_data.columns:
+            review_data[col] = review_data[col].astype(str).str.strip()
+        feedback_lines, total_score, total_possible = [], 0, 0
+        for _, row in review_data.iterrows():
+            q = row["Question"]
+            if q in SPEC.answer_key:
+                for col in ["Decimal", "Binary", "Octal", "Hex", "BCD", "Gray"]:
+                    total_possible += 1
+                    student = row[col].replace(" ", "").lower()
+                    expected = SPEC.answer_key[q][col].replace(" ", "").lower()
+                    if student == expected:
+                        total_score += 1
+                    else:
+                        feedback_lines.append(f"{q} - {col} incorrect (Expected: {SPEC.answer_key[q][col]})")
+        final_score = round((total_score / total_possible) * 100, 2)
+        grade_msg = f"Your score: {final_score}%.\n"
+        if feedback_lines:
+            grade_msg += "Here are some things to improve:\n" + "\n".join(feedback_lines)
+        else:
+            grade_msg += "✅ Excellent! Everything looks correct."
+        return {"score": final_score, "feedback": grade_msg}
+    except Exception as e:
+        return {"score": 0, "feedback": f"❌ An error occurred while grading: {str(e)}"}
+
+
+def as_typed(answer: str):
+    """Excel stores purely numeric answers as numbers."""
+    return int(answer) if answer.isdigit() and not answer.startswith("0") else answer
+
+
+def make_workbook(rng: random.Random, filler_rows: int, error_rate: float):
+    """(xlsx bytes, the score a correct grader should give)."""
+    wb = Workbook()
+    practice = wb.active
+    practice.title = "Practice"
+    for r in range(1, filler_rows + 1):
+        n = rng.randint(0, 255)
+        practice.append([n, f"{n:b}", f"{n:o}", f"{n:X}", f"{n:08b}", rng.random(), "", "note"])
+
+    review = wb.create_sheet("Quick Conversions Review")
+    review.append(["", "Quick Conversions Review"])
+    correct = 0
+    for q, row in enumerate(SPEC.answer_key.items(), start=14):
+        question, answers = row
+        review.cell(row=q, column=2, value=question)
+        for c, name in enumerate(SPEC.graded_columns, start=3):
+            answer = answers[name]
+            if rng.random() < error_rate:
+                answer = str(rng.randint(0, 99))
+            correct += answer.replace(" ", "").lower() == answers[name].replace(" ", "").lower()
+            review.cell(row=q, column=c, value=as_typed(answer))
+
+    wb.create_sheet("Scratch").append(["free-form work"] * 6)
+    buffer = BytesIO()
+    wb.save(buffer)
+    total = len(SPEC.answer_key) * len(SPEC.graded_columns)
+    return buffer.getvalue(), round(correct / total * 100, 2)
+
+
+def main(args):
+    rng = random.Random(11)
+    print(f"Generating {args.workbooks} workbooks ({args.filler_rows} filler rows each)...")
+    workbooks = [make_workbook(rng, args.filler_rows, args.error_rate) for _ in range(args.workbooks)]
+
+    for name, grade in (("legacy (iterrows)", legacy_grade), ("engine (vectorized)", SPEC.grade)):
+        start = time.perf_counter()
+        scores = [grade(f)["score"] for f, _ in workbooks]
+        elapsed = time.perf_counter() - start
+        right = sum(score == expected for score, (_, expected) in zip(scores, workbooks))
+        print(f"{name:<22}{elapsed:>8.2f}s total{elapsed / len(workbooks) * 1000:>9.2f} ms/workbook   correct scores {right}/{len(workbooks)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment grading benchmark")
+    parser.add_argument("--workbooks", type=int, default=500)
+    parser.add_argument("--filler-rows", type=int, default=400)
+    parser.add_argument("--error-rate", type=float, default=0.15)
+    main(parser.parse_args())
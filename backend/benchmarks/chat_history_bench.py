@@ -0,0 +1,129 @@
+# chat_history_bench.py — prompt size and latency over a long chat session, verbatim vs compacted history
+#
+# Plays one synthetic 200-turn tutoring session against the fake completion
+# server twice: once sending the whole transcript every turn (the old
+# build_chat_messages), once through the history manager (recent turns
+# verbatim + rolling summary + token budget). Summary calls are run between
+# turns, as the evaluation queue would, and their tokens are counted too.
+# The fake server adds --prefill-ms-per-1k per 1000 prompt tokens.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.chat_history_bench --turns 200 --latency-ms 300 --prefill-ms-per-1k 40
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from backend.benchmarks.chat_load_test import start_fake_server
+
+SYSTEM = (
+    "You are an expert tutor helping a high school student learn number systems. "
+    "Be friendly, explain step by step, and check understanding with short questions.\n\n"
+    "The student is working toward:\n"
+    "- Convert decimal numbers to 4-bit and 8-bit binary values.\n"
+    "- Convert binary numbers back to decimal form.\n"
+    "- Explain the significance of the LSB and MSB.\n\n"
+    "Important: Ask only ONE question at a time. Do NOT ask what the student wants to do next — automatically move to the next objective."
+)
+
+
+def synthetic_turn(rng: random.Random, turn: int):
+    """A user message and a tutor reply of realistic length."""
+    n = rng.randrange(1, 256)
+    user = f"Turn {turn}: I think {n} in binary is {bin(n)[2:]} because " + " ".join(
+        rng.choice(["I divided by two", "kept the remainders", "read them bottom up", "checked the place values", "added 128 64 32"])
+        for _ in range(rng.randrange(2, 6))
+    )
+    reply = (
+        f"Nice work on {n}! Let's check: " + ", ".join(f"{bit}×{2 ** i}" for i, bit in enumerate(reversed(bin(n)[2:]))) +
+        ". " + " ".join(rng.choice([
+            "Remember the rightmost bit is the least significant bit.",
+            "Each place value doubles as you move left.",
+            "An 8-bit value can hold numbers from 0 to 255.",
+            "Grouping bits into nibbles makes long values easier to read.",
+        ]) for _ in range(rng.randrange(3, 7))) +
+        f" Now try converting {rng.randrange(1, 256)} to binary."
+    )
+    return user, reply
+
+
+async def play(label, build, args, manager=None):
+    from backend.llm_client import get_llm
+    rng = random.Random(7)
+    history, prompt_sizes, latencies = [], [], []
+    summary_tokens = summary_calls = 0
+
+    for turn in range(args.turns):
+        user, reply = synthetic_turn(rng, turn)
+        messages, fold_due = await build(history, user)
+
+        start = time.perf_counter()
+        response = await get_llm().chat_completion(messages, model="gpt-4o", max_tokens=1000)
+        latencies.append((time.perf_counter() - start) * 1000)
+        prompt_sizes.append(response.usage.prompt_tokens)
+
+        if fold_due:
+            # Off the request path in the API; timed separately here
+            calls_before = manager.folds
+            tokens_before = sum_prompt_tokens()
+            await manager.fold("bench", list(history))
+            summary_calls += manager.folds - calls_before
+            summary_tokens += sum_prompt_tokens() - tokens_before
+
+        history += [{"role": "user", "content": user}, {"role": "assistant", "content": reply}]
+
+    checkpoints = [c for c in (1, 25, 50, 100, 150, 200) if c <= args.turns]
+    latencies.sort()
+    print(f"\n{label}")
+    print("  prompt tokens at turn " + "  ".join(f"{c}: {prompt_sizes[c - 1]}" for c in checkpoints))
+    print(f"  chat prompt tokens total {sum(prompt_sizes):>9}   max {max(prompt_sizes)}")
+    print(f"  summary calls {summary_calls:>4}   summary prompt tokens {summary_tokens}")
+    print(f"  latency p50 {statistics.median(latencies):.0f} ms   p95 {latencies[int(len(latencies) * 0.95)]:.0f} ms   last-20 mean {statistics.mean(latencies[-20:]):.0f} ms")
+    return sum(prompt_sizes) + summary_tokens
+
+
+def sum_prompt_tokens() -> float:
+    from backend.metrics import llm_tokens
+    return sum(v for k, v in llm_tokens.values.items() if k[1] == "prompt")
+
+
+async def main(args):
+    from backend.chat_history import HistoryManager, SessionStore
+    from backend.llm_client import close_llm
+
+    proc = start_fake_server(args.port, args.latency_ms, "--prefill-ms-per-1k", str(args.prefill_ms_per_1k))
+    try:
+        async def verbatim(history, user):
+            return [{"role": "system", "content": SYSTEM}, *history, {"role": "user", "content": user}], False
+
+        manager = HistoryManager(SessionStore(), keep_turns=args.keep_turns, budget=args.budget)
+
+        async def compacted(history, user):
+            return await manager.build("bench", SYSTEM, history, user)
+
+        print(f"{args.turns} turns, model latency {args.latency_ms:.0f} ms + {args.prefill_ms_per_1k:.0f} ms per 1k prompt tokens")
+        before = await play("verbatim history (before)", verbatim, args)
+        after = await play(f"compacted: last {args.keep_turns} turns + summary, budget {args.budget} (after)", compacted, args, manager)
+        print(f"\nprompt tokens for the session, summaries included: {before} -> {after} ({after / before:.0%})")
+        print(f"history manager: {manager.stats()}")
+    finally:
+        await close_llm()
+        proc.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat history compaction benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--keep-turns", type=int, default=6)
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=40)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    asyncio.run(main(args))
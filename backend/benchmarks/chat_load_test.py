@@ -0,0 +1,107 @@
+# chat_load_test.py — concurrent chat sessions against the fake completion server
+#
+# Compares the old handler pattern (sync OpenAI client called inside an async
+# handler, which blocks the event loop) with the shared async LLM gateway.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.chat_load_test --sessions 50 --turns 4 --latency-ms 400
+
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+import httpx
+from openai import OpenAI
+
+from backend.llm_client import LLMGateway
+
+
+def start_fake_server(port: int, latency_ms: float, *extra_args: str) -> subprocess.Popen:
+    proc = subprocess.Popen([
+        sys.executable, "-m", "backend.benchmarks.fake_openai_server",
+        "--port", str(port), "--latency-ms", str(latency_ms), *extra_args,
+    ])
+    for _ in range(100):
+        try:
+            httpx.post(f"http://127.0.0.1:{port}/v1/chat/completions", json={"messages": []}, timeout=5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("❌ Fake completion server did not start")
+
+
+def session_messages(session: int, turn: int) -> list:
+    return [
+        {"role": "system", "content": "You are an expert binary tutor."},
+        {"role": "user", "content": f"Session {session}, turn {turn}: what is 13 in binary?"},
+    ]
+
+
+async def run_sessions(call, sessions: int, turns: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+
+    # Latency is measured from when a turn became ready to send (the previous
+    # reply arriving, or the start of the run), so time spent queued behind a
+    # blocked event loop is counted the same way a student would feel it.
+    async def session(i):
+        ready = start
+        for t in range(turns):
+            await call(session_messages(i, t))
+            done = time.perf_counter()
+            latencies.append(done - ready)
+            ready = done
+
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+    }
+
+
+async def main(args):
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    proc = start_fake_server(args.port, args.latency_ms)
+    try:
+        # Before: blocking client inside an async handler (the old /chat code path)
+        sync_client = OpenAI(api_key="test", base_url=base_url)
+
+        async def blocking_call(messages):
+            sync_client.chat.completions.create(model="gpt-4o", messages=messages)
+
+        # After: shared async gateway
+        gateway = LLMGateway(api_key="test", base_url=base_url)
+
+        async def gateway_call(messages):
+            await gateway.chat_completion(messages, model="gpt-4o")
+
+        results = {
+            "before (sync client)": await run_sessions(blocking_call, args.sessions, args.turns),
+            "after (LLM gateway)": await run_sessions(gateway_call, args.sessions, args.turns),
+        }
+        await gateway.aclose()
+    finally:
+        proc.terminate()
+
+    print(f"\n{args.sessions} sessions x {args.turns} turns, model latency {args.latency_ms:.0f} ms")
+    print(f"{'scenario':<24}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['requests']:>10}{r['rps']:>10.1f}{r['p50_ms']:>10.0f}{r['p99_ms']:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat load test against a fake completion server")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--port", type=int, default=9100)
+    asyncio.run(main(parser.parse_args()))
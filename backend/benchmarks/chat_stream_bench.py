@@ -0,0 +1,85 @@
+# chat_stream_bench.py — time-to-first-token: full completion vs streamed reply
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.chat_stream_bench --requests 30 --latency-ms 2500 --ttft-ms 200
+
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+import httpx
+
+from backend.llm_client import LLMGateway
+
+MESSAGES = [
+    {"role": "system", "content": "You are an expert binary tutor."},
+    {"role": "user", "content": "What is 13 in binary?"},
+]
+
+
+def start_fake_server(port: int, latency_ms: float, ttft_ms: float) -> subprocess.Popen:
+    proc = subprocess.Popen([
+        sys.executable, "-m", "backend.benchmarks.fake_openai_server",
+        "--port", str(port), "--latency-ms", str(latency_ms), "--ttft-ms", str(ttft_ms),
+    ])
+    for _ in range(100):
+        try:
+            httpx.post(f"http://127.0.0.1:{port}/v1/chat/completions", json={"messages": []}, timeout=30)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("❌ Fake completion server did not start")
+
+
+async def full_reply(gateway):
+    start = time.perf_counter()
+    await gateway.complete_text(MESSAGES)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed  # first visible text == whole reply
+
+
+async def streamed_reply(gateway):
+    start = time.perf_counter()
+    first = None
+    async for _ in gateway.stream_text(MESSAGES):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def summarize(samples):
+    ttft = sorted(s[0] * 1000 for s in samples)
+    total = sorted(s[1] * 1000 for s in samples)
+    p99 = lambda xs: xs[max(0, int(len(xs) * 0.99) - 1)]
+    return statistics.median(ttft), p99(ttft), statistics.median(total)
+
+
+async def main(args):
+    proc = start_fake_server(args.port, args.latency_ms, args.ttft_ms)
+    gateway = LLMGateway(api_key="test", base_url=f"http://127.0.0.1:{args.port}/v1")
+    try:
+        results = {}
+        for name, fn in (("/chat (full reply)", full_reply), ("/chat/stream", streamed_reply)):
+            samples = await asyncio.gather(*(fn(gateway) for _ in range(args.requests)))
+            results[name] = summarize(samples)
+    finally:
+        await gateway.aclose()
+        proc.terminate()
+
+    print(f"\n{args.requests} concurrent requests, model latency {args.latency_ms:.0f} ms, server TTFT {args.ttft_ms:.0f} ms")
+    print(f"{'mode':<22}{'TTFT p50':>12}{'TTFT p99':>12}{'total p50':>12}")
+    for name, (p50, p99, total) in results.items():
+        print(f"{name:<22}{p50:>10.0f}ms{p99:>10.0f}ms{total:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming chat time-to-first-token benchmark")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=2500)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--port", type=int, default=9101)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,153 @@
+# chat_verifier_bench.py — share of number_systems chat evaluations served without a model call
+#
+# Replays a seeded corpus of tutoring sessions (octal, hex, BCD, Gray code
+# pages: bare answers to the tutor's conversion questions, stated
+# conversions, conceptual explanations, acknowledgements) through
+# evaluate_chat_incremental twice: model-only (CHAT_LOCAL_VERIFY off, the
+# old behaviour) and with the local verifier. The model is the fake
+# completion server at --latency-ms; the LLM cache is off so every model
+# call is paid.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.chat_verifier_bench --sessions 40 --turns 25 --latency-ms 400
+
+import os
+import time
+import random
+import asyncio
+import logging
+import argparse
+import statistics
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["LLM_CACHE_BACKEND"] = "off"
+
+from backend.benchmarks.chat_load_test import start_fake_server
+from backend.quiz_generators.digital_electronics.number_systems.conversions import (
+    to_binary, to_octal, to_hex, to_bcd, to_gray_code,
+)
+
+PAGES = {
+    "octal": [("decimal", "octal", lambda n: str(n), to_octal), ("octal", "decimal", to_octal, str)],
+    "hex": [("decimal", "hex", lambda n: str(n), to_hex), ("binary", "hex", lambda n: to_binary(n, 8), to_hex), ("hex", "decimal", to_hex, str)],
+    "bcd": [("decimal", "BCD", lambda n: str(n), to_bcd)],
+    "gray_code": [("binary", "Gray code", lambda n: to_binary(n, 4), lambda n: to_gray_code(n, 4))],
+}
+CONCEPTUAL = [
+    "I think octal is handy because every digit lines up with exactly three binary bits",
+    "so hex is used for memory addresses since it is shorter to write than long binary strings",
+    "BCD wastes some codes because each nibble only goes up to 9 instead of 15",
+    "in gray code only one bit changes between neighbouring values which helps rotary encoders avoid glitches",
+    "why can't we just use decimal everywhere inside the computer?",
+]
+ACKS = ["ok", "next one please", "got it, thanks!", "yes"]
+
+
+def ask(rng, page):
+    source, target, fmt_in, fmt_out = rng.choice(PAGES[page])
+    n = rng.randrange(2, 100 if target == "BCD" else 16 if target == "Gray code" else 256)
+    return f"Convert {source} {fmt_in(n)} to {target}." if source != "decimal" else f"Convert {n} to {target}.", fmt_in(n), fmt_out(n), target
+
+
+def build_corpus(sessions, turns, seed=5):
+    """[(page, [(user, reply, correct or None), ...]), ...] plus the opening question per session."""
+    rng = random.Random(seed)
+    corpus = []
+    for s in range(sessions):
+        page = list(PAGES)[s % len(PAGES)]
+        question, given, answer, target = ask(rng, page)
+        opening = "Let's practise! " + question
+        session = []
+        for _ in range(turns):
+            kind = rng.random()
+            correct = None
+            if kind < 0.55:
+                correct = rng.random() < 0.8
+                value = answer if correct else answer[:-1] + ("1" if answer[-1] != "1" else "0")
+                user = rng.choice(["{v}", "I think it's {v}", "{v}?", "is it {v}"]).format(v=value)
+            elif kind < 0.7:
+                correct = rng.random() < 0.8
+                value = answer if correct else answer[:-1] + ("1" if answer[-1] != "1" else "0")
+                user = f"so {given} in {target} is {value}"
+            elif kind < 0.9:
+                user = rng.choice(CONCEPTUAL)
+            else:
+                user = rng.choice(ACKS)
+            if correct is not None:
+                question, given, answer, target = ask(rng, page)
+            reply = ("Nice work! " if correct else "Let's look at that again. ") + question
+            session.append((user, reply, correct))
+        corpus.append((page, opening, session))
+    return corpus
+
+
+async def replay(chat, corpus):
+    timings = []
+
+    async def session(page, opening, turns):
+        state = None
+        pending = [{"role": "assistant", "content": opening}]
+        for user, reply, _ in turns:
+            new_messages = pending + [{"role": "user", "content": user}, {"role": "assistant", "content": reply}]
+            start = time.perf_counter()
+            state, _ = await chat.evaluate_chat_incremental(state, new_messages, page)
+            timings.append((time.perf_counter() - start) * 1000)
+            pending = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(*entry) for entry in corpus))
+    return timings, time.perf_counter() - start
+
+
+def summarize(label, timings, wall, model_calls):
+    timings = sorted(timings)
+    print(f"{label:<16}{len(timings):>8}{model_calls:>8}{1 - model_calls / len(timings):>9.1%}"
+          f"{statistics.mean(timings):>10.1f}{statistics.median(timings):>9.1f}{timings[int(len(timings) * 0.95)]:>9.1f}{wall:>9.2f}")
+    return statistics.mean(timings)
+
+
+async def main(args):
+    from backend.graders.digital_electronics.chat_ai import number_systems_chat as chat
+    from backend.graders.digital_electronics.chat_ai.number_systems_verifier import counters, verifier_stats
+    from backend.llm_client import close_llm
+
+    # Keep per-evaluation warnings (model replies are canned) out of the report
+    logging.getLogger(chat.__name__).setLevel(logging.ERROR)
+
+    corpus = build_corpus(args.sessions, args.turns)
+    truth = [c for _, _, turns in corpus for _, _, c in turns if c is not None]
+
+    proc = start_fake_server(args.port, args.latency_ms)
+    try:
+        print(f"{args.sessions} sessions x {args.turns} turns, model latency {args.latency_ms:.0f} ms, "
+              f"{len(truth)} conversion answers ({sum(truth)} correct)")
+        print(f"{'mode':<16}{'evals':>8}{'model':>8}{'local':>9}{'mean ms':>10}{'p50':>9}{'p95':>9}{'wall s':>9}")
+
+        chat.CHAT_LOCAL_VERIFY = False
+        counters.update({k: 0 for k in counters})
+        timings, wall = await replay(chat, corpus)
+        before = summarize("model only", timings, wall, counters["model"])
+
+        chat.CHAT_LOCAL_VERIFY = True
+        counters.update({k: 0 for k in counters})
+        timings, wall = await replay(chat, corpus)
+        after = summarize("verifier", timings, wall, counters["model"])
+
+        print(f"\nmean evaluation latency saved: {before - after:.1f} ms per turn ({1 - after / before:.0%})")
+        print(f"answers checked {counters['correct'] + counters['incorrect']} "
+              f"(judged correct {counters['correct']}, corpus correct {sum(truth)})")
+        print(f"verifier stats: {verifier_stats()}")
+    finally:
+        await close_llm()
+        proc.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local conversion verifier benchmark")
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=25)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    asyncio.run(main(args))
@@ -0,0 +1,60 @@
+# checker_lookup_bench.py — objective checker lookup: exec-per-request vs registry
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.checker_lookup_bench --iterations 2000
+
+import os
+import time
+import argparse
+import importlib.util
+
+from backend.objective_loader import BACKEND_DIR, ModuleRegistry, objective_checkers, load_objective_checker
+
+KEY = ("digital_electronics", "number_systems", "binary")
+
+
+def legacy_load_objective_checker(topic_id, subtopic_id=None, nested_subtopic_id=None):
+    """The pre-registry lookup from main.py: probe the filesystem and exec the file every call."""
+    base_path = os.path.join(BACKEND_DIR, "learning_objectives")
+    paths_to_try = []
+    if nested_subtopic_id and subtopic_id:
+        paths_to_try.append(os.path.join(base_path, topic_id, subtopic_id, f"{nested_subtopic_id}.py"))
+    if subtopic_id:
+        paths_to_try.append(os.path.join(base_path, topic_id, f"{subtopic_id}.py"))
+    paths_to_try.append(os.path.join(base_path, f"{topic_id}.py"))
+
+    for path in paths_to_try:
+        if os.path.exists(path):
+            spec = importlib.util.spec_from_file_location("objective_checker", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return getattr(module, "evaluate_objectives", None)
+    return None
+
+
+def bench(label, fn, iterations):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<34}{per_call_us:>12.2f} µs/lookup")
+    return per_call_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Objective checker lookup micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    dev_registry = ModuleRegistry(
+        "learning_objectives_dev",
+        objective_checkers.base_dir,
+        objective_checkers.key_for_path,
+        reload=True,
+    )
+
+    legacy = bench("exec per request (old main.py)", lambda: legacy_load_objective_checker(*KEY), args.iterations)
+    cached = bench("registry", lambda: load_objective_checker(*KEY), args.iterations)
+    dev = bench("registry, mtime reload on", lambda: dev_registry.get(KEY, "evaluate_objectives"), args.iterations)
+    print(f"\nregistry speed-up: {legacy / cached:.0f}x (dev reload mode: {legacy / dev:.0f}x)")
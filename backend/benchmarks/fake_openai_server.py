@@ -0,0 +1,147 @@
+# fake_openai_server.py — local stand-in for the OpenAI chat completions API
+#
+# Usage:
+#   python -m backend.benchmarks.fake_openai_server --port 9100 --latency-ms 400
+#
+# Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:9100/v1
+#
+# Non-streaming requests reply after --latency-ms. Streaming requests send the
+# first token after --ttft-ms and spread the rest over the remaining latency.
+# --prefill-ms-per-1k adds time per 1000 prompt tokens to both, so longer
+# prompts answer more slowly, as they do against the real API, and
+# --decode-ms-per-token adds time per completion token to non-streaming replies.
+# --rpm answers 429 (with Retry-After) once that many requests arrived in the
+# last minute. Objective-evaluation prompts get a flag array back (one
+# {"id", "flags"} entry per item in JSON mode). GET /stats reports counts.
+
+import re
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FAKE_REPLY = "Great question! In binary, 13 is written as 1101. Can you convert 9 to binary?"
+ITEM_RE = re.compile(r"^### Item (\S+)$", re.MULTILINE)
+OBJECTIVE_RE = re.compile(r"^\d+\. ", re.MULTILINE)
+
+
+def fake_flags(prompt: str) -> list:
+    """A plausible flag array: one entry per numbered objective in the prompt."""
+    count = len(OBJECTIVE_RE.findall(prompt)) or 6
+    return [[True, "partial", False][(len(prompt) + i) % 3] for i in range(count)]
+
+
+def fake_reply(body: dict) -> str:
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        sections = ITEM_RE.split(prompt)[1:]
+        items = zip(sections[::2], sections[1::2])
+        return json.dumps({"results": [{"id": item_id, "flags": fake_flags(text)} for item_id, text in items]})
+    if "Respond ONLY with the array" in prompt:
+        return json.dumps(fake_flags(prompt))
+    return FAKE_REPLY
+
+
+def stream_chunks(model: str, latency: float, ttft: float):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    tokens = FAKE_REPLY.split(" ")
+    gap = max(latency - ttft, 0) / max(len(tokens) - 1, 1)
+
+    async def chunks():
+        await asyncio.sleep(ttft)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(gap)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return chunks()
+
+
+def create_app(latency_ms: float = 400, ttft_ms: float = 150, prefill_ms_per_1k: float = 0, decode_ms_per_token: float = 0, rpm: int = 0) -> FastAPI:
+    app = FastAPI()
+    app.state.latency = latency_ms / 1000
+    app.state.ttft = ttft_ms / 1000
+    app.state.prefill = prefill_ms_per_1k / 1000
+    app.state.decode = decode_ms_per_token / 1000
+    app.state.rpm = rpm
+    app.state.arrivals = deque()
+    app.state.stats = {"requests": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if app.state.rpm:
+            now, arrivals = time.monotonic(), app.state.arrivals
+            while arrivals and arrivals[0] <= now - 60:
+                arrivals.popleft()
+            if len(arrivals) >= app.state.rpm:
+                app.state.stats["rate_limited"] += 1
+                retry_after = max(arrivals[0] + 60 - now, 0.05)
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}},
+                    status_code=429,
+                    headers={"retry-after": f"{retry_after:.2f}"},
+                )
+            arrivals.append(now)
+        app.state.stats["requests"] += 1
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", []))
+        prefill = app.state.prefill * prompt_tokens / 1000
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(body.get("model", "gpt-4o"), app.state.latency + prefill, app.state.ttft + prefill),
+                media_type="text/event-stream",
+            )
+        reply = fake_reply(body)
+        completion_tokens = len(reply) // 4
+        app.state.stats["prompt_tokens"] += prompt_tokens
+        app.state.stats["completion_tokens"] += completion_tokens
+        await asyncio.sleep(app.state.latency + prefill + app.state.decode * completion_tokens)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--ttft-ms", type=float, default=150)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=0)
+    parser.add_argument("--decode-ms-per-token", type=float, default=0)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0 = unlimited)")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.ttft_ms, args.prefill_ms_per_1k, args.decode_ms_per_token, args.rpm), host=args.host, port=args.port, log_level="warning")
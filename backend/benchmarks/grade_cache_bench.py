@@ -0,0 +1,144 @@
+# grade_cache_bench.py — a burst of /grade uploads with resubmissions, grade cache off vs on
+#
+# Starts the API under uvicorn once per mode and fires --uploads workbook
+# uploads at it, --concurrency at a time. Each upload is either a new
+# workbook or, with probability --resubmit, a byte-identical copy of one
+# already sent (double clicks, retries, re-checking a score). Reports
+# throughput, latency, the cache hit rate and the peak RSS (VmHWM) of the
+# API process and of its grading workers.
+#
+# Mongo isn't needed: the grade cache runs in process, uploads carry no
+# student_id (so nothing is saved), and index creation fails fast.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.grade_cache_bench --uploads 200 --resubmit 0.5 --concurrency 25
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+import httpx
+
+from backend.benchmarks.assignment_grading_bench import make_workbook
+
+GRADE_URL = "/grade/digital_electronics/number_systems"
+
+
+def start_api(port: int, cache_backend: str, workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "test"),
+        "GRADE_CACHE_BACKEND": cache_backend,
+        "GRADING_WORKERS": str(workers),
+        "MONGO_URI": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100",
+        "LOG_LEVEL": "ERROR",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("❌ API server did not start")
+
+
+def peak_rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def descendants(pid: int) -> list:
+    children = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        for child in (task / "children").read_text().split():
+            children += [int(child)] + descendants(int(child))
+    return children
+
+
+def build_burst(args):
+    """Upload order as indexes into the list of distinct workbooks."""
+    rng = random.Random(17)
+    files, order = [], []
+    for _ in range(args.uploads):
+        if files and rng.random() < args.resubmit:
+            order.append(rng.randrange(len(files)))
+        else:
+            files.append(make_workbook(rng, args.filler_rows, 0.15)[0])
+            order.append(len(files) - 1)
+    return files, order
+
+
+async def burst(port, files, order, concurrency):
+    latencies, statuses = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+        async def upload(index):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(GRADE_URL, files={"file": ("assignment.xlsx", files[index])})
+                latencies.append(time.perf_counter() - start)
+                statuses.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(i) for i in order))
+        elapsed = time.perf_counter() - start
+        cache = (await client.get("/metrics/grade-cache")).json()
+    return latencies, statuses, elapsed, cache
+
+
+def run(label, backend, port, files, order, args):
+    proc = start_api(port, backend, args.workers)
+    try:
+        # One upload first so the pool's workers are warm in both modes
+        httpx.post(f"http://127.0.0.1:{port}{GRADE_URL}", files={"file": ("warm.xlsx", make_workbook(random.Random(0), 10, 0)[0])}, timeout=120)
+        latencies, statuses, elapsed, cache = asyncio.run(burst(port, files, order, args.concurrency))
+        api_rss = peak_rss_mb(proc.pid)
+        workers_rss = sum(peak_rss_mb(child) for child in descendants(proc.pid))
+    finally:
+        proc.terminate()
+        proc.wait()
+    latencies.sort()
+    ok = statuses.count(200)
+    graded = cache["stores"] if cache["enabled"] else len(statuses)
+    hit_rate = f"{cache['hit_rate']:.1%}" if cache["enabled"] else "-"
+    print(f"{label:<12}{ok:>5}{len(statuses) - ok:>6}{graded:>8}{elapsed:>9.2f}{len(statuses) / elapsed:>9.1f}"
+          f"{statistics.median(latencies) * 1000:>9.0f}{latencies[int(len(latencies) * 0.95)] * 1000:>9.0f}"
+          f"{hit_rate:>8}{api_rss:>10.1f}{workers_rss:>11.1f}")
+    if cache["enabled"]:
+        print(f"            cache: {cache}")
+
+
+def main(args):
+    files, order = build_burst(args)
+    sizes = [len(f) for f in files]
+    print(f"{args.uploads} uploads ({len(files)} distinct workbooks, {statistics.mean(sizes) / 1024:.0f} KB avg), "
+          f"{args.concurrency} concurrent, {args.workers} grading worker(s)")
+    print(f"{'cache':<12}{'ok':>5}{'err':>6}{'graded':>8}{'wall s':>9}{'up/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'hits':>8}{'API MB':>10}{'pool MB':>11}")
+    run("off", "off", args.port, files, order, args)
+    run("memory", "memory", args.port + 1, files, order, args)
+    print("(graded: workbooks parsed by the pool; hits include uploads that joined an identical one in flight;\n"
+          " API MB / pool MB: peak RSS of the API process and the sum over its worker processes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade cache upload burst benchmark")
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--resubmit", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--filler-rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=9300)
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+# gradebook_bench.py — admin class view: per-student calls (N+1) vs one /gradebook page
+#
+# Seeds classes of increasing size into a scratch database and times the
+# old way of building a class view (list students, then /progress-all and
+# /grades per student) against a gradebook page at the start and at the end
+# of the class. Needs a local mongod (5.0+).
+#
+# Usage (from the repo root):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.gradebook_bench --sizes 100 1000 5000
+
+import os
+import time
+import random
+import asyncio
+import argparse
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.api.gradebook import gradebook_page
+from backend.benchmarks.progress_upsert_check import CommandCounter
+
+
+class ReadCounter(CommandCounter):
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "getMore"):
+            self.count += 1
+
+
+NESTED = ["binary", "octal", "hex", "bcd", "gray_code"]
+SUBTOPICS = [("digital_electronics", "number_systems"), ("digital_electronics", "logic_gates"), ("programming", "python")]
+
+
+async def seed(db, size, rng):
+    await db.students.insert_many([
+        {"user_id": f"s{i:06d}", "first_name": "Test", "last_name": f"Student {i}", "allowed": True}
+        for i in range(size)
+    ])
+    progress, grades = [], []
+    for i in range(size):
+        for topic_id, subtopic_id in SUBTOPICS:
+            for nested in NESTED:
+                progress.append({
+                    "student_id": f"s{i:06d}", "topic_id": topic_id, "subtopic_id": subtopic_id,
+                    "nested_subtopic_id": nested, "quiz_score": rng.randint(0, 100), "topic_grade": rng.choice([0, 33, 67, 100]),
+                })
+            grades.append({"student_id": f"s{i:06d}", "topic_id": topic_id, "subtopic_id": subtopic_id, "score": rng.randint(0, 100)})
+    await db.progress.insert_many(progress)
+    await db.assignment_grades.insert_many(grades)
+
+
+async def legacy_class_view(db, limit):
+    rows = []
+    async for student in db.students.find().limit(limit):
+        user_id = student["user_id"]
+        progress = await db.progress.find({"student_id": user_id}).to_list(length=None)
+        grades = await db.assignment_grades.find({"student_id": user_id}).to_list(length=None)
+        rows.append((student, progress, grades))
+    return rows
+
+
+def last_cursor(size, limit):
+    """user_id just before the last page, as a client paging to the end would hold it."""
+    index = max(0, size - limit - 1)
+    return f"s{index:06d}" if size > limit else None
+
+
+async def timed(counter, coro):
+    counter.count = 0
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000, counter.count
+
+
+async def main(args):
+    counter = ReadCounter()
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), event_listeners=[counter])
+    db = client[args.database]
+    rng = random.Random(5)
+
+    print(f"{'students':>9}{'N+1 page':>12}{'trips':>8}{'gradebook p1':>15}{'last page':>12}{'trips':>8}")
+    try:
+        for size in args.sizes:
+            await client.drop_database(args.database)
+            await db.students.create_index([("user_id", 1)], unique=True)
+            await db.progress.create_index([("student_id", 1), ("topic_id", 1), ("subtopic_id", 1), ("nested_subtopic_id", 1)], unique=True)
+            await db.assignment_grades.create_index([("student_id", 1), ("topic_id", 1), ("subtopic_id", 1)], unique=True)
+            await seed(db, size, rng)
+
+            legacy_ms, legacy_trips = await timed(counter, legacy_class_view(db, args.limit))
+            first_ms, trips = await timed(counter, gradebook_page(db.students, limit=args.limit))
+            after = last_cursor(size, args.limit)
+            last_ms, _ = await timed(counter, gradebook_page(db.students, after=after, limit=args.limit))
+            print(f"{size:>9}{legacy_ms:>10.1f}ms{legacy_trips:>8}{first_ms:>13.1f}ms{last_ms:>10.1f}ms{trips:>8}")
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gradebook aggregation benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--limit", type=int, default=50, help="students per page")
+    parser.add_argument("--database", default="WebApp_gradebook_bench")
+    asyncio.run(main(parser.parse_args()))
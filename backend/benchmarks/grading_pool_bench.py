@@ -0,0 +1,83 @@
+# grading_pool_bench.py — event-loop stalls while a class uploads assignments: inline grading vs the process pool
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.grading_pool_bench --uploads 60 --workers 4
+#
+# A ticker coroutine stands in for chat requests: it wakes every 10 ms and
+# records how late it was. Inline grading runs grade() on the event loop
+# like the old /grade handler did.
+
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from backend.grading_pool import GradingPool, GradingOverloaded
+from backend.benchmarks.assignment_grading_bench import make_workbook, SPEC
+
+TOPIC = ("digital_electronics", "number_systems")
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - start - 0.01) * 1000)
+
+
+async def run(mode, files, pool):
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+
+    async def inline(contents):
+        return SPEC.grade(contents)
+
+    async def pooled(contents):
+        try:
+            pool.admit()
+        except GradingOverloaded:
+            return None
+        return await pool.grade(*TOPIC, contents)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*((inline if mode == "inline" else pooled)(f) for f in files))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "graded": sum(r is not None for r in results),
+        "lag_p50": statistics.median(lags),
+        "lag_p99": lags[max(0, int(len(lags) * 0.99) - 1)],
+        "lag_max": lags[-1],
+    }
+
+
+async def main(args):
+    rng = random.Random(3)
+    files = [make_workbook(rng, args.filler_rows, 0.15)[0] for _ in range(args.uploads)]
+
+    pool = GradingPool(workers=args.workers, max_queue=args.max_queue)
+    await pool.start()
+    try:
+        results = {"inline": await run("inline", files, pool), f"pool ({args.workers} workers)": await run("pool", files, pool)}
+    finally:
+        await pool.shutdown()
+
+    print(f"\n{args.uploads} concurrent uploads, {args.filler_rows} filler rows each, pool queue limit {args.max_queue}")
+    print(f"{'mode':<20}{'graded':>8}{'total':>9}{'loop lag p50':>15}{'p99':>10}{'max':>10}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['graded']:>8}{r['elapsed']:>8.2f}s{r['lag_p50']:>13.1f}ms{r['lag_p99']:>8.1f}ms{r['lag_max']:>8.1f}ms")
+    print(f"pool stats: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment grading process pool benchmark")
+    parser.add_argument("--uploads", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--filler-rows", type=int, default=400)
+    asyncio.run(main(parser.parse_args()))
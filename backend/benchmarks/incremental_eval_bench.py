@@ -0,0 +1,81 @@
+# incremental_eval_bench.py — per-turn objective evaluation cost as a session grows
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.incremental_eval_bench --turns 200
+
+import re
+import time
+import random
+import argparse
+
+from backend.incremental_evaluation import SessionStates
+from backend.objective_loader import objective_checkers
+
+SESSION_KEY = ("bench-student", "digital_electronics", "number_systems", "binary")
+binary = objective_checkers.get_module(SESSION_KEY[1:])
+
+
+def legacy_evaluate_objectives(message, chat_history):
+    """The original binary.py checker: joins the whole history and scans it with `.*?` regexes."""
+    chat_text = " ".join(msg["content"].lower() for msg in chat_history if msg["role"] in ("user", "assistant"))
+    flags = []
+    bin_to_dec_matches = re.findall(r"\b(0b)?[01]{1,8}\b.*?\b(=|is|equals?)\b.*?\b\d+\b", chat_text)
+    flags.append(len(bin_to_dec_matches) >= 2)
+    dec_to_bin_matches = re.findall(r"\b\d+\b.*?\b(=|is|equals?)\b.*?\b(0b)?[01]{1,8}\b", chat_text)
+    flags.append(bool(dec_to_bin_matches))
+    for kws in (["bit is", "nibble is", "byte is", "4 bits", "8 bits"], ["lsb", "msb"], ["digital signal"], ["place value"]):
+        flags.append(any(kw in chat_text for kw in kws))
+    return flags
+
+
+def synthetic_turn(rng, i):
+    n = rng.randint(0, 255)
+    user = rng.choice([
+        f"I think {n} is {n:b} in binary",
+        f"so {n:08b} equals {n}?",
+        "the msb is the leftmost bit and the lsb is the rightmost",
+        "a nibble is 4 bits and a byte is 8 bits",
+        "ok can you give me another one",
+    ])
+    reply = f"Nice work on turn {i}! Place value in binary doubles each position: 1, 2, 4, 8, 16. Try converting {rng.randint(0, 255)} next."
+    return user, reply
+
+
+def run(turns, report_every):
+    rng = random.Random(42)
+    sessions = SessionStates()
+    history = []
+    rows = []
+    for i in range(1, turns + 1):
+        user, reply = synthetic_turn(rng, i)
+        history.append({"role": "user", "content": user})
+        chat_with_latest = history + [{"role": "assistant", "content": reply}]
+
+        t0 = time.perf_counter()
+        legacy_evaluate_objectives(user, chat_with_latest)
+        t1 = time.perf_counter()
+        binary.evaluate_objectives(user, chat_with_latest)
+        t2 = time.perf_counter()
+        state, new_messages = sessions.new_messages(SESSION_KEY, history, user, reply)
+        state, _ = binary.evaluate_objectives_incremental(state, new_messages)
+        sessions.commit(SESSION_KEY, history, reply, state)
+        t3 = time.perf_counter()
+
+        transcript_chars = sum(len(m["content"]) for m in chat_with_latest)
+        new_chars = sum(len(m["content"]) for m in new_messages)
+        if i % report_every == 0:
+            rows.append((len(chat_with_latest), (t1 - t0) * 1e3, (t2 - t1) * 1e3, (t3 - t2) * 1e3, transcript_chars, new_chars))
+
+        history.append({"role": "assistant", "content": reply})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental objective evaluation benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--report-every", type=int, default=25)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9}{'legacy ms':>12}{'full ms':>10}{'incr ms':>10}{'LLM chars full':>16}{'LLM chars incr':>16}")
+    for messages, legacy, full, incr, full_chars, new_chars in run(args.turns, args.report_every):
+        print(f"{messages:>9}{legacy:>12.3f}{full:>10.3f}{incr:>10.3f}{full_chars:>16}{new_chars:>16}")
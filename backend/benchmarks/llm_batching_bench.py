@@ -0,0 +1,113 @@
+# llm_batching_bench.py — objective evaluations under a requests-per-minute limit, single vs batched calls
+#
+# --students concurrent students each have --evals chat turns evaluated
+# (with a little think time between turns) against a fake completion
+# server that answers 429 past --rpm requests a minute. Each mode gets its
+# own server so they don't share the rate-limit window. The LLM cache is
+# off so every evaluation needs the model.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.llm_batching_bench --students 60 --evals 5 --rpm 120
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["LLM_CACHE_BACKEND"] = "off"
+
+from backend.benchmarks.chat_load_test import start_fake_server
+
+OBJECTIVES = [
+    "Explain the relationship between octal and binary.",
+    "Use place values in octal to compute decimal equivalents.",
+    "Apply octal conversions in computing contexts.",
+]
+
+
+def eval_prompt(student: int, turn: int) -> str:
+    return (
+        "You are an AI tutor evaluating a student's understanding of the following objectives for the topic 'octal':\n" +
+        "\n".join(f"{i + 1}. {obj}" for i, obj in enumerate(OBJECTIVES)) +
+        "\n\nBased on these flags and the new chat messages below, return the updated Python-style array of flags for each objective using true, false, or 'partial':\n"
+        "Respond ONLY with the array. Do not include any explanation.\n\nNew Chat Messages:\n"
+        f"user: student {student} turn {turn}: octal digits each stand for three bits, so 0o17 is 001 111\n"
+        "assistant: Exactly right! Why do you think octal was popular on early computers?"
+    )
+
+
+async def run(label, port, args, batched):
+    from backend import llm_batching
+    from backend.llm_client import close_llm
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    await close_llm()  # next get_llm() picks up this server
+    llm_batching.LLM_BATCH_EVALUATIONS = batched
+    coalescer = llm_batching.evaluation_coalescer = llm_batching.EvaluationCoalescer(args.window_ms, args.max_batch)
+    before = httpx.get(f"http://127.0.0.1:{port}/stats").json()
+
+    latencies, failures = [], 0
+
+    async def student(i):
+        nonlocal failures
+        rng = random.Random(i)
+        await asyncio.sleep(rng.uniform(0, args.think_s))
+        for turn in range(args.evals):
+            start = time.perf_counter()
+            try:
+                await llm_batching.evaluate_flags(eval_prompt(i, turn))
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                failures += 1
+            await asyncio.sleep(rng.uniform(0, args.think_s))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(student(i) for i in range(args.students)))
+    elapsed = time.perf_counter() - start
+
+    after = httpx.get(f"http://127.0.0.1:{port}/stats").json()
+    latencies.sort()
+    p50 = statistics.median(latencies) if latencies else 0
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(f"{label:<10}{len(latencies):>7}{failures:>7}{elapsed:>9.1f}{len(latencies) / elapsed:>9.2f}"
+          f"{after['requests'] - before['requests']:>10}{after['rate_limited'] - before['rate_limited']:>7}"
+          f"{p50:>9.2f}{p95:>9.2f}")
+    if batched:
+        print(f"coalescer: {coalescer.stats()}")
+    await close_llm()
+
+
+async def main(args):
+    servers = [
+        start_fake_server(args.port, args.latency_ms, "--rpm", str(args.rpm), "--decode-ms-per-token", str(args.decode_ms_per_token)),
+        start_fake_server(args.port + 1, args.latency_ms, "--rpm", str(args.rpm), "--decode-ms-per-token", str(args.decode_ms_per_token)),
+    ]
+    try:
+        print(f"{args.students} students x {args.evals} evaluations, {args.rpm} requests/min, "
+              f"model {args.latency_ms:.0f} ms + {args.decode_ms_per_token:.0f} ms/output token, "
+              f"batch window {args.window_ms:.0f} ms / max {args.max_batch}")
+        print(f"{'mode':<10}{'evals':>7}{'failed':>7}{'wall s':>9}{'eval/s':>9}{'requests':>10}{'429s':>7}{'p50 s':>9}{'p95 s':>9}")
+        await run("single", args.port, args, batched=False)
+        await run("batched", args.port + 1, args, batched=True)
+    finally:
+        for proc in servers:
+            proc.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluation micro-batching benchmark")
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--evals", type=int, default=5)
+    parser.add_argument("--think-s", type=float, default=2.0)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--decode-ms-per-token", type=float, default=5)
+    parser.add_argument("--window-ms", type=float, default=50)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--port", type=int, default=9100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+# llm_cache_bench.py — practice problem requests with no cache, the response cache, and pool mode
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.llm_cache_bench --students 60 --rounds 5 --latency-ms 1500
+#
+# Every student asks for one practice problem per round for a random
+# objective from NESTED_OBJECTIVES["binary"]; rounds run back to back.
+
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from backend.llm_client import LLMGateway
+from backend.llm_cache import LLMResponseCache, MemoryCacheBackend, PracticeProblemPool, parse_problem_list
+from backend.benchmarks.chat_stream_bench import start_fake_server
+from backend.objective_loader import chat_evaluators
+
+OBJECTIVES = chat_evaluators.get(("digital_electronics", "number_systems"), "NESTED_OBJECTIVES")["binary"]
+SYSTEM = "You are a helpful tutor that gives short, direct practice problems."
+
+
+class CountingGateway(LLMGateway):
+    calls = 0
+
+    async def chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        return await super().chat_completion(messages, **kwargs)
+
+
+def single_prompt(objective):
+    return [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": f"Generate a single, clear, age-appropriate practice problem to help a student practice this skill: {objective}."},
+    ]
+
+
+async def run_mode(mode, gateway, students, rounds, seed):
+    cache = LLMResponseCache(local=MemoryCacheBackend(), gateway=gateway)
+    pool = PracticeProblemPool(cache, size=5)
+    rng = random.Random(seed)
+
+    async def generate(objective, count):
+        raw = await gateway.complete_text(single_prompt(objective), temperature=0.9)
+        return parse_problem_list(raw)[:count]
+
+    async def request(objective):
+        start = time.perf_counter()
+        if mode == "no cache":
+            await gateway.complete_text(single_prompt(objective))
+        elif mode == "response cache":
+            await cache.complete_text(single_prompt(objective))
+        else:
+            await pool.next(objective, lambda n: generate(objective, n))
+        return time.perf_counter() - start
+
+    gateway.calls = 0
+    latencies = []
+    for _ in range(rounds):
+        batch = [rng.choice(OBJECTIVES) for _ in range(students)]
+        latencies += await asyncio.gather(*(request(o) for o in batch))
+    latencies = sorted(l * 1000 for l in latencies)
+    return {
+        "requests": len(latencies),
+        "calls": gateway.calls,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "hit_rate": cache.stats()["hit_rate"],
+    }
+
+
+async def main(args):
+    proc = start_fake_server(args.port, args.latency_ms, args.latency_ms / 4)
+    gateway = CountingGateway(api_key="test", base_url=f"http://127.0.0.1:{args.port}/v1")
+    try:
+        results = {}
+        for mode in ("no cache", "response cache", "pool"):
+            results[mode] = await run_mode(mode, gateway, args.students, args.rounds, seed=7)
+    finally:
+        await gateway.aclose()
+        proc.terminate()
+
+    print(f"\n{args.students} students x {args.rounds} rounds, {len(OBJECTIVES)} objectives, model latency {args.latency_ms:.0f} ms")
+    print(f"{'mode':<16}{'requests':>10}{'LLM calls':>11}{'hit rate':>10}{'p50':>10}{'p99':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<16}{r['requests']:>10}{r['calls']:>11}{r['hit_rate']:>10.2%}{r['p50']:>8.0f}ms{r['p99']:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM response cache benchmark")
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=1500)
+    parser.add_argument("--port", type=int, default=9102)
+    asyncio.run(main(parser.parse_args()))
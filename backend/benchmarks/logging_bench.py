@@ -0,0 +1,99 @@
+# logging_bench.py — request-path cost of the old print() logging vs queued structured logging
+#
+# Replays the logging a /get-progress + /chat turn used to do (the query,
+# the raw progress document, the evaluator's raw reply and flags, all
+# printed) against the new calls (sampled debug records, INFO level).
+# Output goes to a sink that sleeps --sink-latency-us per write to stand in
+# for a slow terminal or log shipper.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.logging_bench --requests 20000 --sink-latency-us 50
+
+import io
+import sys
+import time
+import logging
+import argparse
+import contextlib
+
+from backend import logging_config
+
+DOC = {
+    "_id": "665f1c2e9b1e4a0012345678",
+    "student_id": "s00042",
+    "topic_id": "digital_electronics",
+    "subtopic_id": "number_systems",
+    "nested_subtopic_id": "binary",
+    "ai_objective_progress": [True, "progress", False, False, True, False],
+    "quiz_objective_progress": [True, True, False, "progress", False, False],
+    "quiz_score": 67,
+    "topic_grade": 50,
+}
+RAW_REPLY = "[true, 'partial', false, false, true, false]"
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.latency:
+            time.sleep(self.latency)  # blocking I/O releases the GIL, like a real pipe
+        return len(text)
+
+
+def print_request():
+    print("🟦 GET /get-progress query:", {k: DOC[k] for k in ("student_id", "topic_id", "subtopic_id", "nested_subtopic_id")})
+    print("📁 Raw progress document from DB:", DOC)
+    print("✅ Merged Objective Progress:", DOC["ai_objective_progress"])
+    print("📨 Sending prompt to GPT...")
+    print("📊 GPT Eval Raw:", RAW_REPLY)
+    print("✅ Parsed Progress Flags:", DOC["ai_objective_progress"])
+    print(f"📊 Evaluated progress flags: {DOC['ai_objective_progress']}")
+
+
+def log_request(logger):
+    logger.debug("Evaluating chat objectives", extra={"nested_subtopic": "binary", "new_messages": 2, "sampled": True})
+    logger.debug("Evaluated progress flags", extra={"flags": DOC["ai_objective_progress"], "sampled": True})
+
+
+def timed(n, fn, *args):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(*args)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main(args):
+    latency = args.sink_latency_us / 1e6
+
+    sink = SlowSink(latency)
+    with contextlib.redirect_stdout(sink):
+        print_us = timed(args.requests, print_request)
+    print_writes = sink.writes
+
+    results = {"print() (old)": (print_us, print_writes)}
+    for level in ("INFO", "DEBUG"):
+        sink = SlowSink(latency)
+        logging_config.setup_logging(level=level, levels="", fmt="json", stream=sink)
+        for f in logging.getLogger().handlers[0].filters:
+            f.sample_rate = args.sample_rate
+        logger = logging.getLogger("backend.bench")
+        request_us = timed(args.requests, log_request, logger)
+        logging_config.stop_logging()
+        results[f"logging @ {level}"] = (request_us, sink.writes)
+
+    print(f"{args.requests} requests, sink latency {args.sink_latency_us} µs/write, debug sample rate {args.sample_rate}", file=sys.stderr)
+    print(f"{'mode':<18}{'µs/request on loop':>20}{'sink writes':>15}", file=sys.stderr)
+    for name, (us, writes) in results.items():
+        print(f"{name:<18}{us:>20.2f}{writes:>15}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=50)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    main(parser.parse_args())
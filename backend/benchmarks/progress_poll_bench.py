@@ -0,0 +1,86 @@
+# progress_poll_bench.py — /get-progress polling with and without the progress cache
+#
+# Simulates students navigating pages: each poll asks for one of a few
+# nested subtopics, sends the ETag it last saw, and every --write-every
+# polls a save_progress write lands. Counts Mongo reads and 304s and
+# times the handler. Runs against a scratch database on a local mongod.
+#
+# Usage (from the repo root):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.progress_poll_bench --students 200 --polls 20000
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.requests import Request
+
+import backend.main as api
+from backend.progress_cache import progress_cache, progress_cache_stats, remember_progress
+from backend.progress_store import progress_query, upsert_progress
+from backend.benchmarks.progress_upsert_check import CommandCounter
+
+NESTED = ["binary", "octal", "hex", "bcd", "gray_code"]
+
+
+def poll_request(etag):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "headers": headers})
+
+
+async def run(label, collection, counter, args, use_cache):
+    rng = random.Random(11)
+    progress_cache.clear()
+    progress_cache.max_entries = args.cache_size if use_cache else 0
+    etags, timings, not_modified = {}, [], 0
+    counter.count = 0
+
+    for i in range(args.polls):
+        student = f"s{rng.randrange(args.students):05d}"
+        nested = rng.choice(NESTED)
+        query = progress_query(student, "digital_electronics", "number_systems", nested)
+        if i % args.write_every == 0:
+            updated = await upsert_progress(collection, query, ai_flags=[rng.random() < 0.5 for _ in range(6)])
+            remember_progress(updated)
+
+        start = time.perf_counter()
+        response = await api.get_progress(student, "digital_electronics", "number_systems", nested, poll_request(etags.get(query["student_id"] + nested)))
+        timings.append((time.perf_counter() - start) * 1000)
+        etags[query["student_id"] + nested] = response.headers.get("etag")
+        not_modified += response.status_code == 304
+
+    timings.sort()
+    print(f"{label:<10}{counter.count:>12}{not_modified / args.polls:>9.1%}{statistics.median(timings):>10.3f}ms{timings[int(len(timings) * 0.99)]:>10.3f}ms")
+
+
+async def main(args):
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), event_listeners=[counter])
+    collection = client[args.database]["progress"]
+    api.progress_collection = collection
+    try:
+        for s in range(args.students):
+            for nested in NESTED:
+                await upsert_progress(collection, progress_query(f"s{s:05d}", "digital_electronics", "number_systems", nested), ai_flags=[False] * 6)
+
+        print(f"{args.polls} polls, {args.students} students, a write every {args.write_every} polls")
+        print(f"{'mode':<10}{'mongo ops':>12}{'304s':>9}{'p50':>12}{'p99':>12}")
+        await run("no cache", collection, counter, args, use_cache=False)
+        await run("cache", collection, counter, args, use_cache=True)
+        print(f"cache stats: {progress_cache_stats()}")
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Progress polling cache benchmark")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=20000)
+    parser.add_argument("--write-every", type=int, default=10)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--database", default="WebApp_progress_poll_bench")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+# progress_upsert_check.py — lost-update check and round-trip count for progress saves
+#
+# Fires parallel saves for one (student, topic, subtopic, nested_subtopic) key,
+# each completing a different objective, and checks that every objective ends
+# up True. Runs against a scratch database on a local mongod (4.2+).
+#
+# Usage (from the repo root):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.progress_upsert_check --saves 50
+
+import os
+import sys
+import asyncio
+import argparse
+
+from pymongo import monitoring
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.progress_store import progress_query, upsert_progress
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ("find", "update", "findAndModify", "insert"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_save(collection, query, ai_flags):
+    """The pre-pipeline save_progress: find_one, merge in Python, update_one."""
+    existing = await collection.find_one(query)
+    existing_ai = existing.get("ai_objective_progress", []) if existing else []
+    length = max(len(existing_ai), len(ai_flags))
+    merged = []
+    for i in range(length):
+        e = existing_ai[i] if i < len(existing_ai) else False
+        n = ai_flags[i] if i < len(ai_flags) else False
+        merged.append(True if (e is True or n is True) else "progress" if "progress" in (e, n) else False)
+    await collection.update_one(query, {"$set": {"ai_objective_progress": merged}}, upsert=True)
+
+
+async def legacy_chat_turn(collection, query, ai_flags):
+    # /chat did its own find_one before calling save_progress
+    await collection.find_one(query)
+    await legacy_save(collection, query, ai_flags)
+
+
+async def pipeline_chat_turn(collection, query, ai_flags):
+    await upsert_progress(collection, query, ai_flags=ai_flags)
+
+
+async def run(label, turn, collection, counter, saves):
+    query = progress_query("concurrency-check", "digital_electronics", "number_systems", label)
+    await collection.delete_many(query)
+
+    # Save i completes objective i only
+    payloads = [[j == i for j in range(saves)] for i in range(saves)]
+    counter.count = 0
+    await asyncio.gather(*(turn(collection, query, flags) for flags in payloads), return_exceptions=True)
+    round_trips = counter.count / saves
+
+    doc = await collection.find_one(query)
+    completed = sum(1 for f in doc.get("ai_objective_progress", []) if f is True)
+    lost = saves - completed
+    print(f"{label:<10}{saves:>8}{completed:>12}{lost:>8}{round_trips:>16.1f}")
+    return lost
+
+
+async def main(args):
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), event_listeners=[counter])
+    collection = client[args.database]["progress"]
+    # Racing first-time upserts need a unique key to collapse onto one document
+    await collection.create_index(
+        [("student_id", 1), ("topic_id", 1), ("subtopic_id", 1), ("nested_subtopic_id", 1)], unique=True
+    )
+    try:
+        print(f"{'path':<10}{'saves':>8}{'completed':>12}{'lost':>8}{'trips/turn':>16}")
+        await run("legacy", legacy_chat_turn, collection, counter, args.saves)
+        lost = await run("pipeline", pipeline_chat_turn, collection, counter, args.saves)
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+    if lost:
+        print(f"❌ Pipeline upsert lost {lost} updates")
+        sys.exit(1)
+    print("✅ No updates lost with the pipeline upsert")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel progress save check")
+    parser.add_argument("--saves", type=int, default=50)
+    parser.add_argument("--database", default="WebApp_concurrency_check")
+    asyncio.run(main(parser.parse_args()))
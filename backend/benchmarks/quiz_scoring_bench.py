@@ -0,0 +1,94 @@
+# quiz_scoring_bench.py — scoring stored quiz submissions: the original if/elif evaluator vs the table-driven checker
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.quiz_scoring_bench --submissions 20000
+
+import time
+import random
+import argparse
+
+from backend.objective_loader import load_quiz, quiz_evaluators
+
+evaluator = quiz_evaluators.get_module(("digital_electronics", "number_systems"))
+NESTED = ["binary", "octal", "hex", "bcd", "gray_code"]
+
+
+def legacy_evaluate_number_systems(chat_history):
+    """The original evaluator: an if/elif chain of exact string compares."""
+    progress = {
+        "binary_conversion_binary_to_decimal": False,
+        "binary_conversion_decimal_to_binary": False,
+        "binary_structure_understanding": False,
+        "octal_conversion": False,
+        "hexadecimal_conversion": False,
+        "bcd_conversion": False,
+        "gray_code_conversion": False
+    }
+    for item in chat_history:
+        if not isinstance(item, dict):
+            continue
+        qtype = item.get("type", "")
+        student = item.get("student_answer", "").strip()
+        correct = item.get("correct_answer", "").strip()
+        if qtype == "bin_to_dec" and student == correct:
+            progress["binary_conversion_binary_to_decimal"] = True
+        elif qtype == "dec_to_bin" and student == correct:
+            progress["binary_conversion_decimal_to_binary"] = True
+        elif qtype == "definition" and student == correct:
+            progress["binary_structure_understanding"] = True
+        elif qtype == "dec_to_oct" and student == correct:
+            progress["octal_conversion"] = True
+        elif qtype == "dec_to_hex" and student.upper() == correct.upper():
+            progress["hexadecimal_conversion"] = True
+        elif qtype == "dec_to_bcd" and student == correct:
+            progress["bcd_conversion"] = True
+        elif qtype == "dec_to_gray" and student == correct:
+            progress["gray_code_conversion"] = True
+    return progress
+
+
+def typed_variant(rng, answer):
+    """How students actually type a correct answer: spacing, case, dropped leading zeros."""
+    variants = [answer, answer.lower(), answer.replace(" ", ""), answer.lstrip("0") or "0", f" {answer} "]
+    return rng.choice(variants)
+
+
+def make_submissions(n, seed=5):
+    rng = random.Random(seed)
+    submissions = []
+    for i in range(n):
+        nested = NESTED[i % len(NESTED)]
+        answers = []
+        for q in load_quiz("digital_electronics", "number_systems", nested).generate(rng):
+            expected = q.get("correct_answer", q.get("answer"))
+            typed = typed_variant(rng, expected) if rng.random() < 0.8 else "12"
+            answers.append({"type": q["type"], "question": q["question"], "student_answer": typed, "correct_answer": expected})
+        submissions.append((nested, answers))
+    return submissions
+
+
+def main(args):
+    submissions = make_submissions(args.submissions)
+    answers_total = sum(len(a) for _, a in submissions)
+
+    start = time.perf_counter()
+    for _, answers in submissions:
+        legacy_evaluate_number_systems(answers)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [evaluator.score_submission(nested, answers) for nested, answers in submissions]
+    table = time.perf_counter() - start
+
+    exact = sum(a["student_answer"].strip() == a["correct_answer"] for _, answers in submissions for a in answers)
+    accepted = sum(r["correct"] for r in results)
+    print(f"{len(submissions)} submissions, {answers_total} answers")
+    print(f"{'legacy if/elif (flags only)':<34}{legacy:>8.3f}s{len(submissions) / legacy:>12,.0f} subs/s")
+    print(f"{'table-driven (score + flags)':<34}{table:>8.3f}s{len(submissions) / table:>12,.0f} subs/s")
+    print(f"answers accepted: exact string compare {exact}, canonical compare {accepted}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quiz submission scoring benchmark")
+    parser.add_argument("--submissions", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+# roster_export_bench.py — peak memory of a full roster dump: old list-everything GET /students vs streamed export
+#
+# Seeds a scratch database with --students documents and measures the
+# Python heap peak (tracemalloc) of building the old response list versus
+# consuming /students/export line by line. Needs a local mongod.
+#
+# Usage (from the repo root):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.roster_export_bench --students 100000
+
+import os
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.students import export_lines, student_filter, student_projection
+
+
+async def legacy_list(collection):
+    students = []
+    async for doc in collection.find():
+        doc["_id"] = str(doc["_id"])
+        students.append(doc)
+    return len(students)
+
+
+async def streamed(collection, export_format):
+    size = 0
+    async for line in export_lines(student_filter(), student_projection(None), export_format, collection):
+        size += len(line)
+    return size
+
+
+async def measure(label, coro):
+    tracemalloc.start()
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16}{elapsed:>8.2f}s{peak / 1e6:>12.1f} MB")
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    collection = client[args.database]["students"]
+    try:
+        await collection.drop()
+        await collection.create_index([("user_id", 1)], unique=True)
+        for start in range(0, args.students, 10000):
+            await collection.insert_many([
+                {"user_id": f"s{i:07d}", "first_name": "Test", "last_name": f"Student {i}",
+                 "email": f"s{i}@example.edu", "allowed": i % 7 != 0}
+                for i in range(start, min(start + 10000, args.students))
+            ])
+
+        print(f"{args.students} students")
+        print(f"{'mode':<16}{'time':>9}{'heap peak':>13}")
+        await measure("list (old)", legacy_list(collection))
+        await measure("export ndjson", streamed(collection, "ndjson"))
+        await measure("export csv", streamed(collection, "csv"))
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roster export memory benchmark")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--database", default="WebApp_roster_bench")
+    asyncio.run(main(parser.parse_args()))
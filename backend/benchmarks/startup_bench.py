@@ -0,0 +1,128 @@
+# startup_bench.py — import time of backend.main and time to first served request
+#
+# Two measurements, each in fresh processes:
+#   1. `python -X importtime -c "import backend.main"`: wall time of the
+#      import, the slowest top-level imports and which heavy packages
+#      (openai, pandas, ...) were loaded just by importing the app.
+#   2. uvicorn started from scratch: time until /healthz answers, until
+#      /readyz reports the warm-up finished, and the latency of the first
+#      and second /grade uploads (different workbooks, grade cache off).
+#
+# Mongo isn't needed: index creation and the readiness ping fail fast
+# against a closed port, so /readyz stays 503 and the bench waits for
+# "warming": false instead.
+#
+# Usage (from the repo root):
+#   python -m backend.benchmarks.startup_bench --runs 5
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+from backend.benchmarks.assignment_grading_bench import make_workbook
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+HEAVY = ("openai", "httpx", "pandas", "numpy", "openpyxl", "motor", "pymongo", "fastapi", "pydantic")
+GRADE_URL = "/grade/digital_electronics/number_systems"
+
+
+def bench_env() -> dict:
+    return {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "test"),
+        "MONGO_URI": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100",
+        "GRADE_CACHE_BACKEND": "off",
+        "LOG_LEVEL": "ERROR",
+    }
+
+
+def import_profile():
+    """(wall seconds, {top-level module: cumulative µs}, set of every module imported)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=bench_env(), capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    top, loaded = {}, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        loaded.add(name)
+        if len(indent) <= 2:  # imported directly by backend.main (or by the -c statement)
+            top[name] = int(cumulative)
+    return wall, top, loaded
+
+
+def wait_for(url: str, ready, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            response = httpx.get(url, timeout=5)
+            if ready(response):
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"❌ {url} not ready in time")
+
+
+def server_profile(port: int):
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=bench_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + 120
+        alive = wait_for(f"{base}/healthz", lambda r: r.status_code == 200, deadline)
+        warm = wait_for(f"{base}/readyz", lambda r: r.status_code == 200 or not r.json().get("warming", True), deadline)
+        uploads = []
+        rng = random.Random(5)
+        for _ in range(2):
+            contents = make_workbook(rng, 400, 0.15)[0]
+            t = time.perf_counter()
+            response = httpx.post(f"{base}{GRADE_URL}", files={"file": ("assignment.xlsx", contents)}, timeout=120)
+            response.raise_for_status()
+            uploads.append(time.perf_counter() - t)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return alive - start, warm - start, uploads[0], uploads[1]
+
+
+def main(args):
+    imports = [import_profile() for _ in range(args.runs)]
+    walls = [wall for wall, _, _ in imports]
+    _, top, loaded = imports[-1]
+    print(f"import backend.main: median {statistics.median(walls) * 1000:.0f} ms "
+          f"(min {min(walls) * 1000:.0f}, {args.runs} runs, interpreter start included)")
+    print("slowest top-level imports (cumulative, last run):")
+    for name, us in sorted(top.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40}{us / 1000:>8.1f} ms")
+    print("heavy packages loaded by the import: " + (", ".join(p for p in HEAVY if p in loaded) or "none"))
+
+    print(f"\n{'run':<6}{'/healthz s':>12}{'warm s':>10}{'1st grade ms':>14}{'2nd grade ms':>14}")
+    rows = [server_profile(args.port + i) for i in range(args.server_runs)]
+    for i, (alive, warm, first, second) in enumerate(rows, start=1):
+        print(f"{i:<6}{alive:>12.2f}{warm:>10.2f}{first * 1000:>14.0f}{second * 1000:>14.0f}")
+    print(f"{'median':<6}{statistics.median(r[0] for r in rows):>12.2f}{statistics.median(r[1] for r in rows):>10.2f}"
+          f"{statistics.median(r[2] for r in rows) * 1000:>14.0f}{statistics.median(r[3] for r in rows) * 1000:>14.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="import-time runs")
+    parser.add_argument("--server-runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--port", type=int, default=9400)
+    main(parser.parse_args())
@@ -0,0 +1,154 @@
+# worker_scaling_bench.py — /get-progress and /save-progress throughput with 1..N API workers
+#
+# For each worker count the API is started through backend.serve against a
+# scratch database on a local mongod, and --clients load processes drive it
+# for --duration seconds: each keeps --connections requests in flight, a mix
+# of /get-progress polls and /save-progress writes (--write-ratio) over
+# --students students x 5 nested subtopics. The load generators run on the
+# same host, so leave them some cores when reading the top of the curve.
+#
+# Usage (from the repo root):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.worker_scaling_bench --max-workers 4 --duration 15
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import subprocess
+import multiprocessing
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.progress_store import progress_query, upsert_progress
+
+TOPIC, SUBTOPIC = "digital_electronics", "number_systems"
+NESTED = ["binary", "octal", "hex", "bcd", "gray_code"]
+
+
+def start_server(workers: int, port: int, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "test"),
+        "MONGO_DB": args.database,
+        "LOG_LEVEL": "ERROR",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    # Requests land on any worker; wait until enough in a row say ready
+    streak, deadline = 0, time.monotonic() + 120
+    while streak < workers * 4:
+        if time.monotonic() > deadline:
+            proc.terminate()
+            raise RuntimeError("❌ API workers did not become ready")
+        try:
+            streak = streak + 1 if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=5).status_code == 200 else 0
+        except httpx.TransportError:
+            streak = 0
+        time.sleep(0.05)
+    return proc
+
+
+async def drive(port: int, seed: int, args) -> dict:
+    rng = random.Random(seed)
+    counts = {"get": 0, "save": 0, "errors": 0}
+    latencies = []
+    deadline = time.monotonic() + args.duration
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+        async def loop():
+            while time.monotonic() < deadline:
+                student = f"s{rng.randrange(args.students):05d}"
+                nested = rng.choice(NESTED)
+                start = time.perf_counter()
+                try:
+                    if rng.random() < args.write_ratio:
+                        kind = "save"
+                        response = await client.post("/save-progress", json={
+                            "student_id": student, "topic_id": TOPIC, "subtopic_id": SUBTOPIC, "nested_subtopic_id": nested,
+                            "ai_objective_progress": [rng.random() < 0.5 for _ in range(6)],
+                        })
+                    else:
+                        kind = "get"
+                        response = await client.get("/get-progress", params={
+                            "student_id": student, "topic_id": TOPIC, "subtopic_id": SUBTOPIC, "nested_subtopic_id": nested,
+                        })
+                    response.raise_for_status()
+                    counts[kind] += 1
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    counts["errors"] += 1
+
+        await asyncio.gather(*(loop() for _ in range(args.connections)))
+    return {**counts, "latencies": latencies}
+
+
+def client_process(port: int, seed: int, args) -> dict:
+    return asyncio.run(drive(port, seed, args))
+
+
+async def seed_database(args):
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"), serverSelectionTimeoutMS=3000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        client.close()
+        raise SystemExit(f"❌ No mongod at MONGO_URI ({type(e).__name__}); this benchmark needs a local MongoDB")
+    collection = client[args.database]["progress"]
+    for s in range(args.students):
+        for nested in NESTED:
+            await upsert_progress(collection, progress_query(f"s{s:05d}", TOPIC, SUBTOPIC, nested), ai_flags=[False] * 6)
+    client.close()
+
+
+async def drop_database(args):
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    await client.drop_database(args.database)
+    client.close()
+
+
+def main(args):
+    asyncio.run(seed_database(args))
+    print(f"{args.students} students x {len(NESTED)} subtopics, {args.clients} load processes x {args.connections} connections, "
+          f"{args.write_ratio:.0%} writes, {args.duration:.0f} s per run, {os.cpu_count()} cores")
+    print(f"{'workers':<9}{'req/s':>9}{'get/s':>9}{'save/s':>9}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'scaling':>9}")
+    baseline = None
+    try:
+        for workers in range(1, args.max_workers + 1):
+            port = args.port + workers
+            proc = start_server(workers, port, args)
+            try:
+                with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+                    results = pool.starmap(client_process, [(port, 1000 * workers + c, args) for c in range(args.clients)])
+            finally:
+                proc.terminate()
+                proc.wait()
+            gets = sum(r["get"] for r in results)
+            saves = sum(r["save"] for r in results)
+            errors = sum(r["errors"] for r in results)
+            latencies = sorted(l for r in results for l in r["latencies"])
+            rate = (gets + saves) / args.duration
+            baseline = baseline or rate
+            print(f"{workers:<9}{rate:>9.0f}{gets / args.duration:>9.0f}{saves / args.duration:>9.0f}{errors:>8}"
+                  f"{statistics.median(latencies) * 1000:>9.1f}{latencies[int(len(latencies) * 0.99)] * 1000:>9.1f}{rate / baseline:>8.2f}x")
+    finally:
+        asyncio.run(drop_database(args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API worker scaling benchmark")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--database", default="WebApp_worker_scaling_bench")
+    parser.add_argument("--port", type=int, default=9500)
+    main(parser.parse_args())
@@ -0,0 +1,282 @@
+# chat_history.py — token-budgeted chat prompts with a rolling summary of older turns
+#
+# The client sends the whole transcript with every /chat call. Instead of
+# forwarding it verbatim, the prompt keeps the system prompt (objectives
+# included), the last CHAT_HISTORY_TURNS exchanges and the new message;
+# older messages are folded into a short summary stored per session
+# (student, topic, subtopic, nested subtopic). Whatever is assembled is
+# then cut to CHAT_PROMPT_TOKEN_BUDGET, oldest history first.
+#
+# Folding is one model call over the messages that fell out of the
+# verbatim window; it runs off the request path (evaluation queue) once
+# CHAT_SUMMARY_BATCH of them have piled up. Until it lands those messages
+# are still sent verbatim, so nothing is lost in between. At most one
+# fold per session is queued at a time; turns that arrive while it is
+# pending don't queue another.
+#
+# Settings (environment):
+#   CHAT_HISTORY_TURNS=6            user/assistant exchanges kept verbatim
+#   CHAT_PROMPT_TOKEN_BUDGET=3000   hard cap on prompt tokens per chat request
+#   CHAT_SUMMARY_BATCH=8            fold once this many older messages are waiting
+#   CHAT_SUMMARY_MAX_TOKENS=300     length cap for the summary
+#   CHAT_SUMMARY_MODEL=gpt-4o-mini
+#   CHAT_SESSION_BACKEND=mongo|memory   where summaries live (mongo: chat_sessions, shared by workers)
+#   CHAT_SESSION_MISS_TTL=30        seconds a session with no summary is remembered as such (skips the Mongo read)
+
+import os
+import math
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from backend.cache import TTLCache
+from backend.incremental_evaluation import _fingerprint
+from backend.llm_client import get_llm
+
+logger = logging.getLogger(__name__)
+
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "6"))
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "3000"))
+CHAT_SUMMARY_BATCH = int(os.getenv("CHAT_SUMMARY_BATCH", "8"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", "gpt-4o-mini")
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "mongo")
+CHAT_SESSION_MISS_TTL = float(os.getenv("CHAT_SESSION_MISS_TTL", "30"))
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per message (OpenAI chat format)
+
+SUMMARY_PROMPT = (
+    "You keep notes for a tutor. Update the notes with the conversation excerpt below. "
+    "Record what the student has shown they can do, mistakes or misconceptions still open, "
+    "and the question currently being worked on. Plain sentences, no greetings, under {words} words."
+)
+
+
+# ───── Token Counting ─────
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # optional dependency (and its first use may need a download); estimate instead
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text`: exact with tiktoken installed, else ~4 characters per token."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def prompt_tokens(messages: List[dict]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def fit_to_budget(messages: List[dict], budget: int, keep_head: int = 1) -> List[dict]:
+    """
+    Drop messages after the first `keep_head` (system prompt) oldest-first
+    until the prompt fits `budget`. The last message is never dropped; if
+    it alone overflows, its text is cut from the front.
+    """
+    head, body = list(messages[:keep_head]), list(messages[keep_head:])
+    total = prompt_tokens(head) + prompt_tokens(body)
+    while total > budget and len(body) > 1:
+        total -= message_tokens(body.pop(0))
+    if total > budget and body:
+        last = body[-1]
+        room = max(budget - prompt_tokens(head) - MESSAGE_OVERHEAD_TOKENS, 0)
+        text = str(last.get("content") or "")
+        body[-1] = {**last, "content": text[-room * 4:] if room else ""}
+    return head + body
+
+
+# ───── Session Store ─────
+_NO_SESSION = object()  # cached "no summary stored" marker
+
+
+class SessionStore:
+    """
+    Rolling summaries per session: {"summary", "folded", "fingerprint"},
+    where `folded` counts the leading history messages the summary covers
+    and `fingerprint` identifies the last of them. An in-process LRU sits
+    in front of the optional chat_sessions collection; sessions with no
+    summary yet (most of them) are cached as misses for `miss_ttl` seconds
+    so every chat turn doesn't read Mongo for nothing.
+    """
+
+    def __init__(self, collection=None, max_sessions: int = 5000, miss_ttl: float = CHAT_SESSION_MISS_TTL):
+        self.collection = collection
+        self.local = TTLCache(max_entries=max_sessions, ttl=None)
+        self.miss_ttl = miss_ttl
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        session = self.local.get(key)
+        if session is _NO_SESSION:
+            return None
+        if session is None and self.collection is not None:
+            try:
+                session = await self.collection.find_one({"_id": key}, {"_id": 0, "summary": 1, "folded": 1, "fingerprint": 1})
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Chat session read failed: %s", e)
+                return None
+            if session:
+                self.local.set(key, session)
+            else:
+                # Another worker's fold shows up here once the cached miss expires
+                self.local.set(key, _NO_SESSION, ttl=self.miss_ttl)
+        return session
+
+    async def set(self, key: str, session: dict):
+        self.local.set(key, session)
+        if self.collection is None:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": key}, {"$set": {**session, "updated_at": datetime.utcnow()}}, upsert=True
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Chat session write failed: %s", e)
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "errors": self.errors}
+
+
+# ───── History Manager ─────
+def session_key(student_id: str, topic_id: str, subtopic_id: Optional[str], nested_subtopic_id: Optional[str]) -> str:
+    return "/".join([student_id or "", topic_id or "", subtopic_id or "", nested_subtopic_id or ""])
+
+
+class HistoryManager:
+    def __init__(
+        self,
+        store: SessionStore,
+        keep_turns: int = CHAT_HISTORY_TURNS,
+        budget: int = CHAT_PROMPT_TOKEN_BUDGET,
+        summary_batch: int = CHAT_SUMMARY_BATCH,
+        summary_max_tokens: int = CHAT_SUMMARY_MAX_TOKENS,
+        summary_model: str = CHAT_SUMMARY_MODEL,
+    ):
+        self.store = store
+        self.keep_messages = keep_turns * 2
+        self.budget = budget
+        self.summary_batch = summary_batch
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_model = summary_model
+        self.prompts = 0
+        self.trimmed = 0
+        self.folds = 0
+        self.fold_failures = 0
+        self.resets = 0
+        self.fold_skips = 0
+        self._folding = set()  # sessions with a fold queued or running
+
+    async def _session(self, key: str, history: List[dict]) -> dict:
+        """The stored summary if `history` still extends what it covers, else an empty one."""
+        session = await self.store.get(key)
+        if session:
+            folded = session.get("folded", 0)
+            if 0 < folded <= len(history) and _fingerprint(history[folded - 1]) == session.get("fingerprint"):
+                return session
+            self.resets += 1
+        return {"summary": "", "folded": 0, "fingerprint": None}
+
+    def _split(self, history: List[dict], folded: int) -> Tuple[List[dict], List[dict]]:
+        """(older messages not yet summarized, recent messages kept verbatim)"""
+        unfolded = history[folded:]
+        cut = max(len(unfolded) - self.keep_messages, 0)
+        return unfolded[:cut], unfolded[cut:]
+
+    async def build(self, key: str, system_message: str, history: List[dict], message: str) -> Tuple[List[dict], bool]:
+        """
+        Prompt messages for a turn, within the token budget, and whether
+        enough older messages are waiting that `fold` should be scheduled.
+        A True here reserves the session's fold: the caller must run fold()
+        or, if it can't be queued, call release_fold().
+        """
+        session = await self._session(key, history)
+        pending, recent = self._split(history, session["folded"])
+
+        head = [{"role": "system", "content": system_message}]
+        if session["summary"]:
+            head.append({"role": "system", "content": "Summary of the earlier conversation:\n" + session["summary"]})
+        full = head + pending + recent + [{"role": "user", "content": message}]
+        messages = fit_to_budget(full, self.budget, keep_head=len(head))
+
+        self.prompts += 1
+        self.trimmed += len(messages) != len(full)
+        fold_due = len(pending) >= self.summary_batch
+        if fold_due and key in self._folding:
+            self.fold_skips += 1
+            fold_due = False
+        elif fold_due:
+            self._folding.add(key)
+        return messages, fold_due
+
+    def release_fold(self, key: str):
+        self._folding.discard(key)
+
+    async def fold(self, key: str, history: List[dict]):
+        """Summarize the messages that have left the verbatim window into the session summary."""
+        try:
+            await self._fold(key, history)
+        finally:
+            self.release_fold(key)
+
+    async def _fold(self, key: str, history: List[dict]):
+        session = await self._session(key, history)
+        pending, _ = self._split(history, session["folded"])
+        if not pending:
+            return
+
+        excerpt = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in pending)
+        notes = [{"role": "system", "content": SUMMARY_PROMPT.format(words=int(self.summary_max_tokens * 0.7))}]
+        if session["summary"]:
+            notes.append({"role": "user", "content": "Current notes:\n" + session["summary"]})
+        notes.append({"role": "user", "content": "Conversation excerpt:\n" + excerpt})
+        notes = fit_to_budget(notes, self.budget, keep_head=len(notes) - 1)
+
+        try:
+            summary = await get_llm().complete_text(
+                notes, model=self.summary_model, temperature=0.2, max_tokens=self.summary_max_tokens
+            )
+        except Exception as e:
+            self.fold_failures += 1
+            logger.warning("Chat history summary failed: %s", e, extra={"session": key})
+            return
+
+        folded = session["folded"] + len(pending)
+        await self.store.set(key, {"summary": summary, "folded": folded, "fingerprint": _fingerprint(history[folded - 1])})
+        self.folds += 1
+
+    def stats(self) -> dict:
+        return {
+            "prompts": self.prompts,
+            "trimmed": self.trimmed,
+            "folds": self.folds,
+            "fold_failures": self.fold_failures,
+            "resets": self.resets,
+            "fold_skips": self.fold_skips,
+            "folds_in_flight": len(self._folding),
+            **{f"sessions_{k}": v for k, v in self.store.stats().items()},
+        }
+
+
+# ───── Process-wide Manager ─────
+def build_history_manager(backend: str = CHAT_SESSION_BACKEND) -> HistoryManager:
+    if backend == "mongo":
+        from backend.database import chat_sessions_collection
+        if chat_sessions_collection is not None:
+            return HistoryManager(SessionStore(chat_sessions_collection))
+        logger.warning("CHAT_SESSION_BACKEND=mongo but MongoDB is unavailable; keeping summaries in process")
+    return HistoryManager(SessionStore())
+
+
+history_manager = build_history_manager()
@@ -0,0 +1,78 @@
+# check_query_plans.py — fail if any hot endpoint query does a collection scan
+#
+# Usage (from the repo root):
+#   python -m backend.check_query_plans            # explain only
+#   python -m backend.check_query_plans --ensure   # create missing indexes first
+
+import sys
+import asyncio
+import argparse
+
+from backend.database import (
+    students_collection,
+    progress_collection,
+    assignment_grades_collection,
+    ensure_indexes,
+)
+
+SAMPLE_STUDENT = "plan-check-student"
+SAMPLE_TOPIC = {
+    "topic_id": "digital_electronics",
+    "subtopic_id": "number_systems",
+    "nested_subtopic_id": "binary",
+}
+
+# Endpoint -> (collection, filter) for each query shape served in backend/main.py
+HOT_QUERIES = {
+    "/get-progress, /chat, /save-progress": (progress_collection, {"student_id": SAMPLE_STUDENT, **SAMPLE_TOPIC}),
+    "/progress-all/{student_id}": (progress_collection, {"student_id": SAMPLE_STUDENT}),
+    "/grades/{student_id}": (assignment_grades_collection, {"student_id": SAMPLE_STUDENT}),
+    "/grade/{topic_id}/{subtopic_id}": (assignment_grades_collection, {
+        "student_id": SAMPLE_STUDENT,
+        "topic_id": SAMPLE_TOPIC["topic_id"],
+        "subtopic_id": SAMPLE_TOPIC["subtopic_id"],
+    }),
+    "/students/{user_id}": (students_collection, {"user_id": SAMPLE_STUDENT}),
+    # /students and /gradebook page students by user_id; its progress/grades joins use the student_id prefixes above
+    "/students, /gradebook": (students_collection, {"user_id": {"$gt": SAMPLE_STUDENT}}),
+}
+
+
+def plan_stages(plan: dict):
+    """Yield every stage name in a (possibly nested) query plan."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def check_plans() -> bool:
+    ok = True
+    for endpoint, (collection, query) in HOT_QUERIES.items():
+        explain = await collection.find(query).explain()
+        winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(plan_stages(winning))
+        if "COLLSCAN" in stages:
+            ok = False
+            print(f"❌ {endpoint}: COLLSCAN on {collection.name} ({' <- '.join(stages)})")
+        else:
+            print(f"✅ {endpoint}: {' <- '.join(stages)}")
+    return ok
+
+
+async def main(ensure: bool):
+    if ensure:
+        await ensure_indexes()
+    if not await check_plans():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain hot endpoint queries and fail on COLLSCAN")
+    parser.add_argument("--ensure", action="store_true", help="create missing indexes before checking")
+    asyncio.run(main(parser.parse_args().ensure))
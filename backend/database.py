@@ -1,20 +1,124 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import logging
+from typing import Optional
+
+from backend.metrics import mongo_listener
+
+logger = logging.getLogger(__name__)
 
 # MongoDB connection URI (Local or Atlas)
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "WebApp")
+
+# ───── Client (created on first use, closed by the app lifespan) ─────
+# Importing this module opens nothing, so grading workers, scripts and tests
+# that only need the collection names don't start a client and its monitor threads.
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the shared Motor client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(MONGO_URI, event_listeners=[mongo_listener])  # command counts/latency for /metrics
+    return _client
+
+
+def get_db():
+    """The app database (WebApp unless overridden, e.g. by benchmarks)."""
+    return get_client()[MONGO_DB]
+
+
+class LazyCollection:
+    """A collection by name; attribute access resolves it on the current client."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        client = get_client()
+        if self._client is not client:
+            self._client, self._collection = client, client[MONGO_DB][self.name]
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyCollection({MONGO_DB}.{self.name})"
 
-# Create a MongoDB client
-try:
-    client = AsyncIOMotorClient(MONGO_URI)
-    db = client.WebApp  # Name of our database
-except Exception as e:
-    print(f"❌ MongoDB Connection Error: {e}")
-    db = None
 
 # Define collections (NoSQL equivalent of tables)
-students_collection = db["students"] if db is not None else None  # Stores student accounts
-progress_collection = db["progress"] if db is not None else None  # Tracks student progress
-assignments_collection = db["assignments"] if db is not None else None  # Stores uploaded Excel files
-assignment_grades_collection = db["assignment_grades"] if db is not None else None  # ✅ Graded scores & feedback
+students_collection = LazyCollection("students")  # Stores student accounts
+progress_collection = LazyCollection("progress")  # Tracks student progress
+assignments_collection = LazyCollection("assignments")  # Stores uploaded Excel files
+assignment_grades_collection = LazyCollection("assignment_grades")  # ✅ Graded scores & feedback
+student_summaries_collection = LazyCollection("student_summaries")  # Per-student rollup of progress and grades
+quiz_submissions_collection = LazyCollection("quiz_submissions")  # Scored /quiz/submit answers
+grading_jobs_collection = LazyCollection("grading_jobs")  # Async /grade-jobs status and results
+llm_cache_collection = LazyCollection("llm_cache")  # Cached model replies (LLM_CACHE_BACKEND=mongo)
+chat_sessions_collection = LazyCollection("chat_sessions")  # Rolling chat summaries per session
+grade_cache_collection = LazyCollection("grade_cache")  # Grades keyed by workbook hash (GRADE_CACHE_BACKEND=mongo)
+
+
+# ───── Indexes (match the filters used by the hot endpoints) ─────
+# Each entry: (collection, keys, options)
+INDEXES = [
+    # /get-progress, /chat, /save-progress, /reset-scores; prefix serves /progress-all/{student_id}
+    (progress_collection, [("student_id", 1), ("topic_id", 1), ("subtopic_id", 1), ("nested_subtopic_id", 1)],
+     {"unique": True, "name": "student_topic_unique"}),
+    # /students/{user_id}
+    (students_collection, [("user_id", 1)], {"unique": True, "name": "user_id_unique"}),
+    # /grade upserts; prefix serves /grades/{student_id}
+    (assignment_grades_collection, [("student_id", 1), ("topic_id", 1), ("subtopic_id", 1)],
+     {"unique": True, "name": "student_assignment_unique"}),
+    # /quiz/submit history per student and quiz; rescoring scans by key_version
+    (quiz_submissions_collection, [("student_id", 1), ("topic_id", 1), ("subtopic_id", 1), ("nested_subtopic_id", 1), ("submitted_at", 1)],
+     {"name": "student_quiz_submitted_at"}),
+    (quiz_submissions_collection, [("key_version", 1)], {"name": "key_version"}),
+    # /grade-jobs: finished jobs are kept for a day
+    (grading_jobs_collection, [("created_at", 1)], {"expireAfterSeconds": 86400, "name": "created_at_ttl"}),
+    # LLM response cache: Mongo drops entries once expires_at has passed
+    (llm_cache_collection, [("expires_at", 1)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    # Chat summaries: sessions idle for a week are dropped
+    (chat_sessions_collection, [("updated_at", 1)], {"expireAfterSeconds": 7 * 86400, "name": "updated_at_ttl"}),
+    # Grade cache: entries expire at expires_at, like the LLM cache
+    (grade_cache_collection, [("expires_at", 1)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+]
+
+async def ping_mongo():
+    """Raise unless the server answers (used for readiness)."""
+    await get_client().admin.command("ping")
+
+def close_mongo():
+    """Close the client if one was opened; the next use opens a new one."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+class MissingUniqueIndex(RuntimeError):
+    """A unique index the upserts rely on could not be built (e.g. duplicates already stored)."""
+
 
+async def ensure_indexes():
+    """
+    Create any missing indexes. Safe to run on every startup (create_index
+    is idempotent). A failed ordinary index is only logged; a failed unique
+    one raises MissingUniqueIndex, since upserts on that key would then
+    create duplicates or hit DuplicateKeyError, and the app must not
+    report ready.
+    """
+    missing = []
+    for collection, keys, options in INDEXES:
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            logger.error("Failed to create index %s on %s: %s", options.get("name"), collection.name, e)
+            if options.get("unique"):
+                missing.append(f"{collection.name}.{options.get('name')}")
+    if missing:
+        raise MissingUniqueIndex("unique index missing: " + ", ".join(missing))
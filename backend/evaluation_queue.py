@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import logging
+import zlib
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "4"))
+EVAL_QUEUE_SIZE = int(os.getenv("EVAL_QUEUE_SIZE", "1000"))  # total across all workers
+
+Job = Callable[[], Awaitable[None]]
+
+
+class EvaluationQueue:
+    """
+    Bounded in-process work queue for post-reply objective evaluation.
+
+    Jobs are sharded by student id onto one queue per worker, so each
+    student's jobs run in submission order while different students are
+    evaluated in parallel. `submit` never waits: when a shard is full it
+    returns False and the caller handles the job inline instead.
+    """
+
+    def __init__(self, workers: int = EVAL_WORKERS, maxsize: int = EVAL_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.shard_size = max(1, maxsize // self.workers)
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._draining = False
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.shard_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(q)) for q in self._queues]
+
+    def _shard(self, student_id: str) -> asyncio.Queue:
+        # crc32 rather than hash(): stable across processes and restarts
+        return self._queues[zlib.crc32(student_id.encode()) % self.workers]
+
+    def submit(self, student_id: str, job: Job) -> bool:
+        if not self.running or self._draining:
+            return False
+        try:
+            self._shard(student_id).put_nowait((time.monotonic(), job))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            submitted_at, job = await queue.get()
+            try:
+                try:
+                    await job()
+                    self.processed += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Background evaluation failed")
+                lag = time.monotonic() - submitted_at
+                self.lag_last = lag
+                self.lag_max = max(self.lag_max, lag)
+                self._lag_total += lag
+            finally:
+                queue.task_done()
+
+    async def drain(self, timeout: Optional[float] = 10.0):
+        """Finish queued jobs (up to `timeout` seconds), then stop the workers."""
+        if not self.running:
+            return
+        self._draining = True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Evaluation queue drain timed out with %d jobs left", self.depth())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+        self._draining = False
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def stats(self) -> dict:
+        done = self.processed + self.failed
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "depth": self.depth(),
+            "max_shard_depth": max((q.qsize() for q in self._queues), default=0),
+            "capacity": self.shard_size * self.workers,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "lag_last_seconds": round(self.lag_last, 4),
+            "lag_avg_seconds": round(self._lag_total / done, 4) if done else 0.0,
+            "lag_max_seconds": round(self.lag_max, 4),
+        }
+
+
+evaluation_queue = EvaluationQueue()
@@ -0,0 +1,156 @@
+# grade_cache.py — grade results keyed by workbook content
+#
+# Students resubmit the same workbook (double clicks, retries, a re-upload
+# after checking the score), and a byte-identical file always gets the
+# same grade from the same grader. Results are cached under
+# (topic, subtopic, grader version, SHA-256 of the upload), so a repeat
+# skips the worker pool and pandas entirely. The grader version is a hash
+# of the grader's source (see objective_loader.grader_version); editing a
+# grader or the engine changes it, and old entries simply stop matching.
+# Only real grades are stored: a result carrying "error" (the grader raised)
+# is returned to the caller but graded again on the next upload.
+#
+# Settings (environment):
+#   GRADE_CACHE_BACKEND=mongo|memory|off   mongo: grade_cache collection behind the in-process LRU
+#   GRADE_CACHE_TTL=604800                 seconds a cached grade is reused
+#   GRADE_CACHE_MAX_ENTRIES=4096           in-process entries
+#
+# Usage:
+#   key = grade_cache_key(topic_id, subtopic_id, version, upload.sha256)
+#   result = await grade_cache.get_or_create(key, grade)   # grade() runs only on a miss
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GRADE_CACHE_BACKEND = os.getenv("GRADE_CACHE_BACKEND", "mongo").lower()
+GRADE_CACHE_TTL = float(os.getenv("GRADE_CACHE_TTL", str(7 * 86400)))
+GRADE_CACHE_MAX_ENTRIES = int(os.getenv("GRADE_CACHE_MAX_ENTRIES", "4096"))
+
+
+def cacheable(result: Optional[dict]) -> bool:
+    """Whether `result` is a grade worth reusing (not a grader failure)."""
+    return isinstance(result, dict) and "error" not in result
+
+
+def grade_cache_key(topic_id: str, subtopic_id: str, grader_version: str, content_sha256: str) -> str:
+    return "/".join([topic_id, subtopic_id, grader_version, content_sha256])
+
+
+class GradeCache:
+    """
+    Read-through store of grade results. An in-process LRU sits in front of
+    the optional grade_cache collection, which every API worker shares;
+    Mongo errors count as misses so grading carries on without the cache.
+    Concurrent misses for the same key share one grading run, so a double
+    click is graded once. Failed grades (see cacheable) are never stored.
+    """
+
+    def __init__(self, collection=None, ttl: float = GRADE_CACHE_TTL, max_entries: int = GRADE_CACHE_MAX_ENTRIES, enabled: bool = True):
+        self.collection = collection
+        self.ttl = ttl
+        self.enabled = enabled
+        self.local = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        result = self.local.get(key)
+        if result is None and self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, {"result": 1})
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Grade cache read failed: %s", e)
+                doc = None
+            if doc:
+                result = doc["result"]
+                self.shared_hits += 1
+                self.local.set(key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(result)
+
+    async def set(self, key: str, result: dict):
+        if not self.enabled or not cacheable(result):
+            return
+        self.stores += 1
+        self.local.set(key, dict(result))
+        if self.collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"result": result, "created_at": now, "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Grade cache write failed: %s", e)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[dict]]) -> dict:
+        """Cached result for `key`, running `create()` once on a miss (shared by concurrent callers)."""
+        result = await self.get(key)
+        if result is not None:
+            return result
+        if not self.enabled:
+            return await create()
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return dict(await asyncio.shield(task))
+
+        async def fill():
+            result = await create()
+            await self.set(key, result)
+            return result
+
+        task = asyncio.ensure_future(fill())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return dict(await asyncio.shield(task))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.local),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_grade_cache(backend: str = GRADE_CACHE_BACKEND) -> GradeCache:
+    if backend == "off":
+        return GradeCache(enabled=False)
+    if backend == "mongo":
+        from backend.database import grade_cache_collection
+        if grade_cache_collection is not None:
+            return GradeCache(grade_cache_collection)
+        logger.warning("GRADE_CACHE_BACKEND=mongo but MongoDB is unavailable; caching grades in process")
+    return GradeCache()
+
+
+grade_cache = build_grade_cache()
@@ -2,18 +2,19 @@ import os
 import json
 import re
 import ast
-from typing import List, Union
-from dotenv import load_dotenv
-from openai import OpenAI
+import logging
+from typing import List, Optional, Union
 
-# ✅ Load .env before using getenv
-load_dotenv()
+from backend.llm_batching import evaluate_flags
+from backend.chat_history import fit_to_budget, CHAT_PROMPT_TOKEN_BUDGET
+from backend.graders.digital_electronics.chat_ai.number_systems_verifier import (
+    counters as verifier_counters, verify_messages, verified_flags, verifiable_objectives,
+)
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY is not set!")
+logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=api_key)
+# Check conversion answers locally and ask the model only about the conceptual objectives
+CHAT_LOCAL_VERIFY = os.getenv("CHAT_LOCAL_VERIFY", "1").lower() in ("1", "true", "yes")
 
 # Each nested_subtopic has specific objectives
 NESTED_OBJECTIVES = {
@@ -60,39 +61,74 @@ NESTED_OBJECTIVES = {
     # Additional subtopics can be added here.
 }
 
-def evaluate_chat(message: str, history: List[dict], nested_subtopic: str) -> List[Union[bool, str]]:
-    print(f"🔍 EVALUATING with nested_subtopic = {nested_subtopic}")
-    print(f"📝 Message: {message}")
-    print(f"🧠 History length: {len(history)}")
+def merge_flags(old: List[Union[bool, str]], new: List[Union[bool, str]]) -> List[Union[bool, str]]:
+    """Flags only move forward within a session: True beats "progress" beats False."""
+    return [
+        True if True in (o, n) else "progress" if "progress" in (o, n) else False
+        for o, n in zip(old, new)
+    ]
+
+async def evaluate_chat_incremental(state: Optional[dict], new_messages: List[dict], nested_subtopic: str):
+    """
+    Incremental evaluator: sends the model only the messages since the last
+    evaluation plus the flags earned so far, and returns (state, flags).
+    `state` is {"flags": [...], "verifier": {...}}; pass None to start a session.
+
+    Conversion objectives are credited from exactly checked answers (see
+    number_systems_verifier.py); the model is only asked about the rest,
+    and not at all when the new messages hold nothing for it to judge.
+    """
+    logger.debug("Evaluating chat objectives", extra={"nested_subtopic": nested_subtopic, "new_messages": len(new_messages), "sampled": True})
 
     objectives = NESTED_OBJECTIVES.get(nested_subtopic)
     if not objectives:
-        print(f"⚠️ No objectives found for nested_subtopic '{nested_subtopic}'")
-        return [False] * 6
+        logger.warning("No objectives found for nested_subtopic %r", nested_subtopic)
+        return state or {}, [False] * 6
+
+    previous = (state or {}).get("flags") or [False] * len(objectives)
+    verifier_counters["evaluations"] += 1
 
-    full_chat = history + [{"role": "user", "content": message}]
+    model_indices = list(range(len(objectives)))
+    verifier_state, checked = None, [False] * len(objectives)
+    if CHAT_LOCAL_VERIFY:
+        verifier_state, local = verify_messages((state or {}).get("verifier"), new_messages, nested_subtopic)
+        checked = verified_flags(verifier_state, nested_subtopic, len(objectives))
+        model_indices = [i for i in model_indices if i not in verifiable_objectives(nested_subtopic)]
+        # Skip the model only if every new message is fully covered by checked claims (a message that
+        # also explains something goes to the model), or there's nothing left for it to award
+        if local or all(previous[i] is True for i in model_indices):
+            verifier_counters["local"] += 1
+            flags = merge_flags(previous, checked)
+            return {"flags": flags, "verifier": verifier_state}, flags
+    verifier_counters["model"] += 1
+
+    def with_model_flags(model_flags: list) -> list:
+        merged = list(checked)
+        for i, flag in zip(model_indices, model_flags):
+            merged[i] = flag
+        return merge_flags(previous, merged)
 
     eval_prompt = (
         f"You are an AI tutor evaluating a student's understanding of the following objectives for the topic '{nested_subtopic}':\n" +
-        "\n".join([f"{i+1}. {obj}" for i, obj in enumerate(objectives)]) +
-        "\n\nBased on the full chat history below, return a Python-style array of flags for each objective using true, false, or 'partial':\n" +
+        "\n".join([f"{n+1}. {objectives[i]}" for n, i in enumerate(model_indices)])
+    )
+    if state:
+        eval_prompt += (
+            "\n\nFlags the student has already earned earlier in this session (true, false or 'partial'):\n" +
+            str(["partial" if previous[i] == "progress" else previous[i] for i in model_indices]).replace("True", "true").replace("False", "false") +
+            "\n\nBased on these flags and the new chat messages below, return the updated Python-style array of flags for each objective using true, false, or 'partial':\n"
+        )
+    else:
+        eval_prompt += "\n\nBased on the full chat history below, return a Python-style array of flags for each objective using true, false, or 'partial':\n"
+    eval_prompt += (
         "Respond ONLY with the array. Do not include any explanation.\n\n" +
-        "Chat History:\n" +
-        "\n".join([f"{m['role']}: {m['content']}" for m in full_chat])
+        ("New Chat Messages:\n" if state else "Chat History:\n") +
+        "\n".join([f"{m['role']}: {m['content']}" for m in new_messages])
     )
 
     try:
-        print("📨 Sending prompt to GPT...")
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": eval_prompt}],
-            temperature=0.0,
-            max_tokens=200
-        )
-
-        print("📨 GPT Response Object:", response)
-        raw = response.choices[0].message.content.strip()
-        print("📊 GPT Eval Raw:", raw)
+        # Deterministic (temperature 0): repeats come from the cache, misses are batched with other students'
+        raw = await evaluate_flags(eval_prompt)
 
         # Replace smart quotes and ensure lowercase booleans
         cleaned = (
@@ -106,25 +142,33 @@ def evaluate_chat(message: str, history: List[dict], nested_subtopic: str) -> Li
 
                 # Safely evaluate with ast.literal_eval (handles true/false/'partial')
         parsed = ast.literal_eval(cleaned)
-        print("✅ Parsed Progress Flags:", parsed)
 
         # Ensure output matches the number of objectives
         if isinstance(parsed, list):
             normalized = [
-                True if x is True else "partial" if str(x).lower() == "partial" else False
+                True if x is True else "progress" if str(x).lower() in ("partial", "progress") else False
                 for x in parsed
             ]
             # Pad if too short
-            while len(normalized) < len(objectives):
+            while len(normalized) < len(model_indices):
                 normalized.append(False)
             # Trim if too long (shouldn’t happen, but just in case)
-            normalized = normalized[:len(objectives)]
-            print(f"✅ Normalized (padded) Progress Flags: {normalized}")
-            return normalized
+            normalized = normalized[:len(model_indices)]
+            logger.debug("Evaluated progress flags", extra={"nested_subtopic": nested_subtopic, "flags": normalized, "sampled": True})
+            flags = with_model_flags(normalized)
+            return {"flags": flags, "verifier": verifier_state}, flags
         else:
-            print("⚠️ GPT returned non-list format:", parsed)
-            return [False] * len(objectives)
+            logger.warning("Evaluator returned a non-list reply", extra={"nested_subtopic": nested_subtopic, "reply": raw[:200]})
 
     except Exception as e:
-        print("❌ GPT eval error:", e)
-        return [False] * len(objectives)
+        logger.warning("Chat evaluation failed: %s", e, extra={"nested_subtopic": nested_subtopic})
+
+    # Model answer unusable: keep what was earned, plus this turn's checked conversions
+    flags = merge_flags(previous, checked)
+    return {"flags": flags, "verifier": verifier_state}, flags
+
+async def evaluate_chat(message: str, history: List[dict], nested_subtopic: str) -> List[Union[bool, str]]:
+    """Full-transcript evaluation (no session state); the oldest messages go first if it's over the token budget."""
+    full_chat = fit_to_budget(history + [{"role": "user", "content": message}], CHAT_PROMPT_TOKEN_BUDGET, keep_head=0)
+    _, flags = await evaluate_chat_incremental(None, full_chat, nested_subtopic)
+    return flags
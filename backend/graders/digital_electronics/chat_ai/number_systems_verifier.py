@@ -0,0 +1,307 @@
+# number_systems_verifier.py — exact checking of conversion claims in number_systems chat turns
+#
+# Most student turns in the number systems tutor are arithmetic: a bare
+# answer to the tutor's "Convert 25 to octal." or a claim like
+# "so 0x1F is 31 in decimal". Those are checked here with the shared
+# conversions and the quiz answer normalizers, and credited to the same
+# objective indices the quiz uses. Only turns with conceptual content
+# need the model evaluator (see number_systems_chat.py).
+#
+# Usage:
+#   state = initial_state()
+#   state, local = verify_messages(state, new_messages, "octal")
+#   flags = verified_flags(state, "octal")
+
+import re
+from typing import List, Optional, Tuple
+
+from backend.quiz_generators.digital_electronics.number_systems.conversions import (
+    to_binary, to_octal, to_hex, to_bcd, to_gray_code, gray_to_binary,
+)
+from backend.graders.digital_electronics.quiz_ai.number_systems_evaluator import (
+    NORMALIZERS, OBJECTIVE_INDEX, OBJECTIVE_COUNT, as_int, as_bcd,
+)
+
+# Correct checked conversions needed for an objective to count as completed
+CORRECT_FOR_COMPLETE = 2
+
+# evaluations/local/model are counted by the chat evaluator that uses this module
+counters = {"evaluations": 0, "local": 0, "model": 0, "claims": 0, "answers": 0, "correct": 0, "incorrect": 0}
+
+
+# ───── Bases ─────
+RADIX = {"bin": 2, "oct": 8, "dec": 10, "hex": 16, "bcd": 2, "gray": 2}
+BASE_NAMES = {
+    "binary": "bin", "base 2": "bin", "base-2": "bin", "base2": "bin",
+    "octal": "oct", "base 8": "oct", "base-8": "oct", "base8": "oct",
+    "decimal": "dec", "base 10": "dec", "base-10": "dec", "base10": "dec", "denary": "dec",
+    "hexadecimal": "hex", "hex": "hex", "base 16": "hex", "base-16": "hex", "base16": "hex",
+    "bcd": "bcd", "gray code": "gray", "gray": "gray",
+}
+FORMATTERS = {
+    "bin": to_binary,
+    "oct": to_octal,
+    "dec": str,
+    "hex": to_hex,
+    "bcd": to_bcd,
+    "gray": to_gray_code,
+}
+# The base a bare number is in, per nested subtopic (the other side is decimal)
+SUBTOPIC_BASE = {"binary": "bin", "octal": "oct", "hex": "hex", "bcd": "bcd", "gray_code": "gray"}
+
+BASE = r"(?:gray code|gray|bcd|binary|octal|decimal|denary|hexadecimal|hex|base[ -]?(?:2|8|10|16))"
+# A number must contain a digit unless it carries a prefix or is upper-case hex (A, FF; not "BCD")
+NUMBER = r"(?<![\w.])(?:0[bB][01]+|0[oO][0-7]+|0[xX][0-9a-fA-F]+|[0-9][0-9a-fA-F]*(?: [01]{4})*|[a-fA-F]+[0-9][0-9a-fA-F]*|(?!BCD\b)[A-F]+)(?![\w])"
+
+NUMBER_RE = re.compile(NUMBER)
+CONNECTOR_RE = re.compile(
+    rf"\s*(?:\(?(?P<lbase>{BASE})\)?\s*)?,?\s*(?:(?:in|to|into)\s+(?P<rbase>{BASE})\s*)?"
+    r"(?:=|==|->|→|\bis\b|\bequals\b|\bis equal to\b|\bbecomes\b|\bconverts to\b|\bgives\b)\s*"
+    rf"(?:(?:in\s+)?(?P<rbase2>{BASE})\s*)?:?\s*",
+    re.IGNORECASE,
+)
+LEADING_BASE_RE = re.compile(rf"(?P<base>{BASE})\s+(?:number\s+|value\s+)?$", re.IGNORECASE)
+TRAILING_BASE_RE = re.compile(rf"\s*(?:in\s+)?\(?(?P<base>{BASE})\b", re.IGNORECASE)
+
+QUESTION_RES = [
+    re.compile(
+        rf"(?:convert|write|express|change|turn)\s+(?:the\s+)?(?:(?P<fbase>{BASE})\s+(?:number\s+|value\s+)?)?(?P<value>{NUMBER})"
+        rf"\s+(?:from\s+{BASE}\s+)?(?:to|into|in)\s+(?P<tbase>{BASE})",
+        re.IGNORECASE,
+    ),
+    re.compile(rf"what(?:'s|’s| is)\s+(?:the\s+)?(?:(?P<fbase>{BASE})\s+(?:number\s+)?)?(?P<value>{NUMBER})\s+in\s+(?P<tbase>{BASE})", re.IGNORECASE),
+    re.compile(
+        rf"(?:what(?:'s|’s| is)\s+)?the\s+(?P<tbase>{BASE})\s+(?:representation|equivalent|value|form|version)\s+(?:of|for)\s+"
+        rf"(?:(?P<fbase>{BASE})\s+)?(?P<value>{NUMBER})",
+        re.IGNORECASE,
+    ),
+]
+ANSWER_RE = re.compile(
+    rf"^\s*(?:(?:i think|i got|it's|it’s|it is|is it|the answer is|answer:?|so|um+|ok(?:ay)?,?)\s+)*"
+    rf"(?P<value>{NUMBER})(?:\s+(?:in\s+)?(?P<base>{BASE}))?\s*[.!?]*\s*$",
+    re.IGNORECASE,
+)
+WORD_RE = re.compile(r"[a-z’']+")
+FILLER = {
+    "i", "think", "so", "the", "answer", "is", "it", "it's", "it’s", "its", "yes", "yeah", "ok", "okay", "right",
+    "correct", "that", "then", "and", "because", "in", "to", "um", "hmm", "wait", "oh", "got", "my", "let", "me",
+    "try", "check", "this", "a", "an", "of", "which", "means", "would", "be", "was", "am", "number", "value", "now",
+}
+
+
+def base_name(text: Optional[str]) -> Optional[str]:
+    return BASE_NAMES.get(re.sub(r"\s+", " ", text.lower())) if text else None
+
+
+def prefix_base(token: str) -> Optional[str]:
+    lowered = token.lower()
+    if lowered.startswith("0b"):
+        return "bin"
+    if lowered.startswith("0o"):
+        return "oct"
+    if lowered.startswith("0x") or re.search(r"[a-f]", lowered):
+        return "hex"
+    return None
+
+
+def binary_digits(token: str) -> bool:
+    return bool(re.fullmatch(r"[01 ]+", token))
+
+
+def infer_base(token: str, page_base: Optional[str]) -> Optional[str]:
+    """
+    Base implied by the token itself: a prefix, hex letters, or a bit
+    pattern nobody would write as a decimal ("0101 1000", "0110").
+    """
+    base = prefix_base(token)
+    if not base and binary_digits(token) and (" " in token or (len(token) >= 4 and token.startswith("0"))):
+        base = "bcd" if page_base == "bcd" else "bin"
+    return base
+
+
+def parse_value(token: str, base: str) -> Optional[int]:
+    """`token` read in `base` as an int, or None if it isn't valid there."""
+    try:
+        if base == "bcd":
+            bits = as_bcd(token)
+            if bits is None or any(int(bits[i:i + 4], 2) > 9 for i in range(0, len(bits), 4)):
+                return None
+            return int("".join(str(int(bits[i:i + 4], 2)) for i in range(0, len(bits), 4)))
+        if base == "gray":
+            value = as_int(2)(token)
+            return gray_to_binary(value) if value is not None else None
+        return as_int(RADIX[base])(token)
+    except (ValueError, KeyError):
+        return None
+
+
+# ───── Claim Extraction ─────
+def resolve_bases(lhs: str, rhs: str, lbase: Optional[str], rbase: Optional[str], nested_subtopic: str) -> Optional[Tuple[str, str]]:
+    """Fill in unstated bases from prefixes and the page's number system; None if still ambiguous."""
+    page_base = SUBTOPIC_BASE.get(nested_subtopic)
+    lbase = lbase or infer_base(lhs, page_base)
+    rbase = rbase or infer_base(rhs, page_base)
+
+    if lbase and not rbase:
+        rbase = "dec" if lbase != "dec" else page_base
+    elif rbase and not lbase:
+        lbase = "dec" if rbase != "dec" else page_base
+    elif not lbase and not rbase:
+        if page_base == "gray" and binary_digits(lhs) and binary_digits(rhs):
+            lbase, rbase = "bin", "gray"
+        elif page_base in ("bin", "bcd", "gray") and binary_digits(lhs) != binary_digits(rhs):
+            lbase, rbase = (page_base, "dec") if binary_digits(lhs) else ("dec", page_base)
+        else:
+            return None
+    if not lbase or not rbase or lbase == rbase:
+        return None
+    return lbase, rbase
+
+
+def check_conversion(value: int, from_base: str, to_base: str, answer: str) -> bool:
+    """`answer` read in `to_base` equals `value`, judged like a quiz answer of the same type."""
+    expected = FORMATTERS[to_base](value)
+    normalize = NORMALIZERS.get(f"{from_base}_to_{to_base}") or (as_bcd if to_base == "bcd" else as_int(RADIX[to_base]))
+    given = normalize(answer)
+    return given is not None and given == normalize(expected)
+
+
+def extract_claims(text: str, nested_subtopic: str, question: Optional[dict] = None) -> Tuple[List[dict], List[Tuple[int, int]]]:
+    """
+    Conversion claims stated in `text` ("13 in binary is 1101", "0x1F = 31")
+    as {"from", "to", "value", "correct"}, plus the character spans they cover.
+    A claim about the number in the tutor's pending `question` takes its
+    unstated bases from the question.
+    """
+    claims, spans = [], []
+    tokens = list(NUMBER_RE.finditer(text))
+    for left, right in zip(tokens, tokens[1:]):
+        connector = CONNECTOR_RE.fullmatch(text, left.end(), right.start())
+        if not connector:
+            continue
+        lhs, rhs = left.group(), right.group()
+        lbase = base_name(connector.group("lbase"))
+        if not lbase:
+            leading = LEADING_BASE_RE.search(text, max(left.start() - 20, 0), left.start())
+            lbase = base_name(leading.group("base")) if leading else None
+        rbase = base_name(connector.group("rbase") or connector.group("rbase2"))
+        end = right.end()
+        if not rbase:
+            trailing = TRAILING_BASE_RE.match(text, right.end())
+            if trailing:
+                rbase, end = base_name(trailing.group("base")), trailing.end()
+        stated = bool(lbase or rbase)
+        if question and lhs == question["token"]:
+            lbase, rbase = lbase or question["from"], rbase or question["to"]
+
+        bases = resolve_bases(lhs, rhs, lbase, rbase, nested_subtopic)
+        if bases is None or (lhs == rhs and not stated):
+            continue
+        value = parse_value(lhs, bases[0])
+        if value is None:
+            continue
+        claims.append({"from": bases[0], "to": bases[1], "value": value, "correct": check_conversion(value, bases[0], bases[1], rhs)})
+        spans.append((left.start(), end))
+    return claims, spans
+
+
+def extract_question(text: str, nested_subtopic: str) -> Optional[dict]:
+    """The last conversion the tutor asked for in `text`, as {"from", "to", "value", "token"}."""
+    found = None
+    for pattern in QUESTION_RES:
+        for match in pattern.finditer(text):
+            if found is None or match.start() > found.start():
+                found = match
+    if not found:
+        return None
+    token = found.group("value")
+    to_base = base_name(found.group("tbase"))
+    page_base = SUBTOPIC_BASE.get(nested_subtopic)
+    from_base = base_name(found.group("fbase")) or infer_base(token, page_base)
+    if not from_base:
+        from_base = page_base if to_base == "dec" else "dec"
+        if to_base == "dec" and page_base == "gray" and not binary_digits(token):
+            return None
+    if not to_base or from_base == to_base:
+        return None
+    value = parse_value(token, from_base)
+    return {"from": from_base, "to": to_base, "value": value, "token": token} if value is not None else None
+
+
+def residual_words(text: str, spans: List[Tuple[int, int]]) -> int:
+    """Words left once claim spans, numbers, base names and filler are removed."""
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + " " + text[end:]
+    text = re.sub(BASE, " ", NUMBER_RE.sub(" ", text), flags=re.IGNORECASE)
+    return sum(1 for word in WORD_RE.findall(text.lower()) if word not in FILLER)
+
+
+# ───── Incremental State ─────
+def initial_state() -> dict:
+    return {"verified": {}, "question": None}
+
+
+def verify_messages(state: Optional[dict], new_messages: List[dict], nested_subtopic: str) -> Tuple[dict, bool]:
+    """
+    Fold new chat messages into the verifier state. Returns (state, local)
+    where `local` is True when every new student message is fully covered
+    by checked conversions and filler, i.e. there's nothing left for the
+    model to judge.
+    """
+    state = {"verified": dict((state or {}).get("verified") or {}), "question": (state or {}).get("question")}
+    type_index = OBJECTIVE_INDEX.get(nested_subtopic, {})
+    local = True
+
+    for message in new_messages:
+        role, text = message.get("role"), str(message.get("content") or "")
+        if role == "assistant":
+            state["question"] = extract_question(text, nested_subtopic) or state["question"]
+            continue
+        if role != "user":
+            continue
+
+        question = state["question"]
+        claims, spans = extract_claims(text, nested_subtopic, question)
+        answer = ANSWER_RE.match(text) if not claims else None
+        if answer and question:
+            claims = [{"from": question["from"], "to": question["to"], "value": question["value"],
+                       "correct": check_conversion(question["value"], question["from"], question["to"], answer.group("value"))}]
+            spans = [answer.span()]
+            state["question"] = None
+            counters["answers"] += 1
+        counters["claims"] += len(claims)
+
+        for claim in claims:
+            counters["correct" if claim["correct"] else "incorrect"] += 1
+            index = type_index.get(f"{claim['from']}_to_{claim['to']}")
+            if index is None:
+                continue
+            correct, attempts = state["verified"].get(str(index), (0, 0))
+            state["verified"][str(index)] = (correct + claim["correct"], attempts + 1)
+
+        # Any words beyond the checked claims and filler may be conceptual: the model has to see them
+        if residual_words(text, spans):
+            local = False
+
+    return state, local
+
+
+def verifiable_objectives(nested_subtopic: str) -> set:
+    """Objective indices this module can credit for the nested subtopic."""
+    return set(OBJECTIVE_INDEX.get(nested_subtopic, {}).values())
+
+
+def verified_flags(state: Optional[dict], nested_subtopic: str, count: int = OBJECTIVE_COUNT) -> List:
+    """Flags earned by checked conversions: True after CORRECT_FOR_COMPLETE right answers, "progress" after any attempt."""
+    verified = (state or {}).get("verified") or {}
+    flags = [False] * count
+    for index in verifiable_objectives(nested_subtopic):
+        correct, attempts = verified.get(str(index), (0, 0))
+        if index < count:
+            flags[index] = True if correct >= CORRECT_FOR_COMPLETE else "progress" if attempts else False
+    return flags
+
+
+def verifier_stats() -> dict:
+    evaluations = counters["evaluations"]
+    return {**counters, "local_rate": round(counters["local"] / evaluations, 4) if evaluations else 0.0}
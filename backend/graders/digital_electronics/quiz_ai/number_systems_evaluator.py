@@ -1,47 +1,184 @@
-def evaluate_number_systems(chat_history):
-    progress = {
-        "binary_conversion_binary_to_decimal": False,
-        "binary_conversion_decimal_to_binary": False,
-        "binary_structure_understanding": False,
-        "octal_conversion": False,
-        "hexadecimal_conversion": False,
-        "bcd_conversion": False,
-        "gray_code_conversion": False
+import re
+import hashlib
+from functools import lru_cache
+
+from backend.objective_loader import load_quiz
+
+# ───── Answer Normalizers (one per question type) ─────
+# Each maps a typed answer to a canonical value; answers match when the
+# canonical values are equal. None means the answer can't be parsed.
+_SPACES = re.compile(r"\s+")
+_BITS = re.compile(r"[01]+")
+_PREFIXES = {2: "0b", 8: "0o", 16: "0x"}
+
+
+def as_int(base):
+    prefix = _PREFIXES.get(base)
+
+    def normalize(text):
+        text = "".join(str(text).split()).lower()
+        if prefix and text.startswith(prefix):
+            text = text[len(prefix):]
+        try:
+            return int(text, base)
+        except ValueError:
+            return None
+    return normalize
+
+
+def as_bcd(text):
+    """Digits only, left-padded to whole nibbles: "111 0101" == "0111 0101"."""
+    bits = "".join(str(text).split())
+    if not _BITS.fullmatch(bits):
+        return None
+    return "0" * (-len(bits) % 4) + bits
+
+
+def as_text(text):
+    return _SPACES.sub(" ", str(text).strip().lower()).rstrip(".")
+
+
+NORMALIZERS = {
+    "dec_to_bin": as_int(2),
+    "bin_to_dec": as_int(10),
+    "dec_to_oct": as_int(8),
+    "oct_to_dec": as_int(10),
+    "dec_to_hex": as_int(16),
+    "hex_to_dec": as_int(10),
+    "bin_to_hex": as_int(16),
+    "hex_to_bin": as_int(2),
+    "dec_to_bcd": as_bcd,
+    "bcd_to_dec": as_int(10),
+    "dec_to_gray": as_int(2),
+    "bin_to_gray": as_int(2),
+    "gray_to_bin": as_int(2),
+    "definition": as_text,
+}
+NORMALIZER_VERSION = 1  # bump when a normalizer changes so stored submissions get re-scored
+
+# ───── Question Type -> quiz_objective_progress Index ─────
+# Indices follow NESTED_OBJECTIVES in graders/digital_electronics/chat_ai/number_systems_chat.py
+OBJECTIVE_COUNT = 6
+OBJECTIVE_INDEX = {
+    "binary": {"dec_to_bin": 1, "bin_to_dec": 2},
+    "octal": {"dec_to_oct": 1, "oct_to_dec": 2},
+    "hex": {"bin_to_hex": 1, "hex_to_bin": 2, "dec_to_hex": 5, "hex_to_dec": 5},
+    "bcd": {"dec_to_bcd": 1, "bcd_to_dec": 2},
+    "gray_code": {"bin_to_gray": 1, "dec_to_gray": 1, "gray_to_bin": 2},
+}
+# Binary definition questions, first matching phrase wins
+DEFINITION_OBJECTIVES = [("most significant", 3), ("nibble", 4), ("byte", 4), ("place value", 5), ("bit", 0)]
+
+
+def objective_index(nested_subtopic_id, qtype, question):
+    if qtype == "definition":
+        question = question.lower()
+        return next((i for phrase, i in DEFINITION_OBJECTIVES if phrase in question), None)
+    return OBJECTIVE_INDEX.get(nested_subtopic_id, {}).get(qtype)
+
+
+# ───── Answer Key (from the quiz generators' question banks) ─────
+@lru_cache(maxsize=None)
+def answer_key(nested_subtopic_id):
+    """{(type, question): canonical answer} for every question the quiz can ask."""
+    spec = load_quiz("digital_electronics", "number_systems", nested_subtopic_id)
+    key = {}
+    for bank, _ in (spec.sections if spec else []):
+        for item in bank.items:
+            expected = item.get("correct_answer", item.get("answer"))
+            normalize = NORMALIZERS.get(item["type"])
+            if normalize and expected is not None:
+                key[(item["type"], item["question"])] = normalize(expected)
+    return key
+
+
+@lru_cache(maxsize=None)
+def answer_key_version(nested_subtopic_id):
+    digest = hashlib.sha1(repr((NORMALIZER_VERSION, sorted(answer_key(nested_subtopic_id).items()))).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def progress_flag(correct, total):
+    ratio = correct / total if total else 0
+    return True if ratio >= 0.67 else "progress" if ratio >= 0.34 else False
+
+
+def score_submission(nested_subtopic_id, answers):
+    """
+    Score a whole quiz submission in one pass.
+
+    `answers` are {"type", "question", "student_answer"} dicts, checked
+    against the answer key only. A question the key doesn't hold can't be
+    graded: it earns no credit and sets no objective flag, but still counts
+    toward the total; so does a repeat of a question already answered.
+    Anything else the client sends (such as a claimed correct answer) is
+    ignored. Returns the score, per-question results
+    (None = not gradable) and quiz_objective_progress.
+    """
+    key = answer_key(nested_subtopic_id)
+    type_index = OBJECTIVE_INDEX.get(nested_subtopic_id, {})
+    correct_by_objective = [0] * OBJECTIVE_COUNT
+    total_by_objective = [0] * OBJECTIVE_COUNT
+    results = []
+    correct = total = ungradable = 0
+    seen = set()
+
+    for answer in answers:
+        qtype, question = answer.get("type", ""), answer.get("question") or ""
+        normalize = NORMALIZERS.get(qtype)
+        expected = key.get((qtype, question)) if normalize and (qtype, question) not in seen else None
+        seen.add((qtype, question))
+        if expected is None:
+            results.append(None)
+            total += 1
+            ungradable += 1
+            continue
+
+        is_correct = normalize(answer.get("student_answer") or "") == expected
+        results.append(is_correct)
+        total += 1
+        correct += is_correct
+
+        index = objective_index(nested_subtopic_id, qtype, question) if qtype == "definition" else type_index.get(qtype)
+        if index is not None:
+            total_by_objective[index] += 1
+            correct_by_objective[index] += is_correct
+
+    return {
+        "score": round(correct / total * 100) if total else 0,
+        "correct": correct,
+        "total": total,
+        "ungradable": ungradable,
+        "results": results,
+        "quiz_objective_progress": [progress_flag(c, t) for c, t in zip(correct_by_objective, total_by_objective)],
+        "key_version": answer_key_version(nested_subtopic_id),
     }
 
-    def update_progress(key):
-        progress[key] = True
+
+# ───── Chat-history Quiz Items -> Named Progress ─────
+PROGRESS_KEYS = {
+    "bin_to_dec": "binary_conversion_binary_to_decimal",
+    "dec_to_bin": "binary_conversion_decimal_to_binary",
+    "definition": "binary_structure_understanding",
+    "dec_to_oct": "octal_conversion",
+    "dec_to_hex": "hexadecimal_conversion",
+    "dec_to_bcd": "bcd_conversion",
+    "dec_to_gray": "gray_code_conversion",
+}
+
+
+def evaluate_number_systems(chat_history):
+    progress = {name: False for name in PROGRESS_KEYS.values()}
 
     for item in chat_history:
         if not isinstance(item, dict):
             continue
-
         qtype = item.get("type", "")
-        student = item.get("student_answer", "").strip()
-        correct = item.get("correct_answer", "").strip()
-
-        # Binary
-        if qtype == "bin_to_dec" and student == correct:
-            update_progress("binary_conversion_binary_to_decimal")
-        elif qtype == "dec_to_bin" and student == correct:
-            update_progress("binary_conversion_decimal_to_binary")
-        elif qtype == "definition" and student == correct:
-            update_progress("binary_structure_understanding")
-
-        # Octal
-        elif qtype == "dec_to_oct" and student == correct:
-            update_progress("octal_conversion")
-
-        # Hexadecimal
-        elif qtype == "dec_to_hex" and student.upper() == correct.upper():
-            update_progress("hexadecimal_conversion")
-
-        # BCD
-        elif qtype == "dec_to_bcd" and student == correct:
-            update_progress("bcd_conversion")
-
-        # Gray Code
-        elif qtype == "dec_to_gray" and student == correct:
-            update_progress("gray_code_conversion")
-
-    return progress
\ No newline at end of file
+        normalize = NORMALIZERS.get(qtype)
+        if qtype not in PROGRESS_KEYS or normalize is None:
+            continue
+        expected = normalize(item.get("correct_answer", ""))
+        if expected is not None and normalize(item.get("student_answer", "")) == expected:
+            progress[PROGRESS_KEYS[qtype]] = True
+
+    return progress
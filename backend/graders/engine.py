@@ -0,0 +1,159 @@
+# engine.py — declarative Excel assignment grading
+#
+# An assignment grader is an AssignmentSpec: which sheet and cell range to
+# read, the answer key, and how to normalize answers before comparing.
+# Only that range of that sheet is streamed from the workbook, and the
+# student's answers are compared with the key in one vectorized pass.
+
+import re
+from io import BytesIO
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+# Normalization rules, applied in order to every answer and key value
+NORMALIZERS = {
+    "strip": lambda s: s.str.strip(),
+    "remove_spaces": lambda s: s.str.replace(r"\s+", "", regex=True),
+    "lower": lambda s: s.str.lower(),
+    "upper": lambda s: s.str.upper(),
+    "strip_leading_zeros": lambda s: s.str.replace(r"^0+(?=.)", "", regex=True),
+}
+
+CELL_RANGE = re.compile(r"^([A-Z]+)(\d+):([A-Z]+)(\d*)$")
+
+
+def cell_text(value) -> str:
+    """Cell value as the text a student typed (25.0 -> "25", empty -> "")."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+@dataclass(frozen=True)
+class AssignmentSpec:
+    """
+    sheet:        worksheet holding the answers
+    cell_range:   e.g. "B14:H" (open-ended) or "B14:H40"
+    columns:      names for the columns in the range; `key_column` identifies the question
+    answer_key:   {question: {column: expected answer}}
+    normalize:    NORMALIZERS applied to both answers and key before comparing
+    """
+    sheet: str
+    cell_range: str
+    columns: List[str]
+    key_column: str
+    answer_key: Dict[str, Dict[str, str]]
+    normalize: Tuple[str, ...] = ("strip",)
+    answer_columns: Optional[List[str]] = field(default=None)
+
+    def __post_init__(self):
+        match = CELL_RANGE.match(self.cell_range.upper())
+        if not match:
+            raise ValueError(f"Invalid cell range: {self.cell_range}")
+        first_col, first_row, last_col, last_row = match.groups()
+        width = column_index_from_string(last_col) - column_index_from_string(first_col) + 1
+        if width != len(self.columns):
+            raise ValueError(f"{self.cell_range} spans {width} columns but {len(self.columns)} names were given")
+        unknown = [rule for rule in self.normalize if rule not in NORMALIZERS]
+        if unknown:
+            raise ValueError(f"Unknown normalization rules: {unknown}")
+
+    @cached_property
+    def bounds(self) -> dict:
+        first_col, first_row, last_col, last_row = CELL_RANGE.match(self.cell_range.upper()).groups()
+        return {
+            "min_col": column_index_from_string(first_col),
+            "max_col": column_index_from_string(last_col),
+            "min_row": int(first_row),
+            "max_row": int(last_row) if last_row else None,
+        }
+
+    @cached_property
+    def graded_columns(self) -> List[str]:
+        return self.answer_columns or [c for c in self.columns if c != self.key_column]
+
+    @cached_property
+    def expected(self) -> pd.DataFrame:
+        """Answer key as a frame (question x column), raw text."""
+        return pd.DataFrame.from_dict(self.answer_key, orient="index")[self.graded_columns].astype(str)
+
+    @cached_property
+    def expected_normalized(self) -> pd.DataFrame:
+        return self.normalize_frame(self.expected)
+
+    def normalize_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        def apply_rules(column: pd.Series) -> pd.Series:
+            for rule in self.normalize:
+                column = NORMALIZERS[rule](column)
+            return column
+        return frame.apply(apply_rules)
+
+    def read_answers(self, file: bytes) -> Optional[pd.DataFrame]:
+        """Stream just the spec's range out of the workbook; None if the sheet is missing."""
+        workbook = load_workbook(BytesIO(file), read_only=True, data_only=True)
+        try:
+            if self.sheet not in workbook.sheetnames:
+                return None
+            rows = [
+                [cell_text(v) for v in row]
+                for row in workbook[self.sheet].iter_rows(values_only=True, **self.bounds)
+            ]
+        finally:
+            workbook.close()
+        return pd.DataFrame(rows, columns=self.columns, dtype=object) if rows else pd.DataFrame(columns=self.columns, dtype=object)
+
+    def grade(self, file: bytes) -> dict:
+        try:
+            answers = self.read_answers(file)
+            if answers is None:
+                return {
+                    "score": 0,
+                    "feedback": f"❌ Missing '{self.sheet}' sheet in your Excel file."
+                }
+
+            # Rows whose question id is in the key, in sheet order (repeats are graded again)
+            answers = answers[answers[self.key_column].isin(self.expected.index)]
+            questions = answers[self.key_column].to_numpy()
+            total_possible = len(questions) * len(self.graded_columns)
+            if not total_possible:
+                return {
+                    "score": 0,
+                    "feedback": f"❌ No answers found in '{self.sheet}' ({self.cell_range})."
+                }
+
+            student = self.normalize_frame(answers[self.graded_columns]).to_numpy()
+            correct = student == self.expected_normalized.loc[questions].to_numpy()
+
+            final_score = round(correct.sum() / total_possible * 100, 2)
+            grade_msg = f"Your score: {final_score}%.\n"
+
+            wrong_rows, wrong_cols = np.nonzero(~correct)
+            if len(wrong_rows):
+                expected = self.expected.loc[questions].to_numpy()
+                feedback_lines = [
+                    f"{questions[r]} - {self.graded_columns[c]} incorrect (Expected: {expected[r, c]})"
+                    for r, c in zip(wrong_rows, wrong_cols)
+                ]
+                grade_msg += "Here are some things to improve:\n" + "\n".join(feedback_lines)
+            else:
+                grade_msg += "✅ Excellent! Everything looks correct."
+
+            return {
+                "score": float(final_score),
+                "feedback": grade_msg
+            }
+
+        except Exception as e:
+            return {
+                "score": 0,
+                "feedback": f"❌ An error occurred while grading: {str(e)}",
+                "error": type(e).__name__,  # not a grade: kept out of the grade cache
+            }
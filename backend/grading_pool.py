@@ -0,0 +1,345 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from backend.database import assignment_grades_collection, grading_jobs_collection, student_summaries_collection
+from backend.progress_summaries import update_assignment_summary
+from backend.progress_cache import invalidate_progress
+from backend.grade_cache import grade_cache
+
+logger = logging.getLogger(__name__)
+
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", str(min(4, os.cpu_count() or 1))))
+GRADING_MAX_QUEUE = int(os.getenv("GRADING_MAX_QUEUE", "64"))  # queued + running jobs per API process
+GRADING_MAX_PER_STUDENT = int(os.getenv("GRADING_MAX_PER_STUDENT", "2"))
+GRADING_TIMEOUT = float(os.getenv("GRADING_TIMEOUT", "30"))  # seconds per job
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+
+class GraderNotFound(LookupError):
+    pass
+
+
+class GradingOverloaded(Exception):
+    """The pool already holds GRADING_MAX_QUEUE jobs (HTTP 503)."""
+
+
+class StudentGradingLimit(Exception):
+    """The student already has GRADING_MAX_PER_STUDENT jobs in flight (HTTP 429)."""
+
+
+class GradingTimeout(Exception):
+    pass
+
+
+# ───── Worker Process Side ─────
+def _warm_worker():
+    """Process initializer: pay the pandas/openpyxl import and grader loading once per worker."""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import openpyxl  # noqa: F401
+    from backend.objective_loader import assignment_graders
+    assignment_graders.warm()
+
+
+def _ping() -> int:
+    time.sleep(0.05)  # long enough that concurrent pings land on different workers
+    return os.getpid()
+
+
+def _grade_in_worker(topic_id: str, subtopic_id: str, contents: bytes) -> Optional[dict]:
+    from backend.objective_loader import load_grader
+    grade = load_grader(topic_id, subtopic_id)
+    if grade is None:
+        return None
+    return grade(contents)
+
+
+# ───── API Process Side ─────
+class GradingPool:
+    """
+    Runs assignment graders in a ProcessPoolExecutor so workbook parsing
+    never blocks the event loop.
+
+    Admission is bounded: more than `max_queue` jobs in flight raises
+    GradingOverloaded, more than `max_per_student` for one student raises
+    StudentGradingLimit. A job that exceeds `timeout` raises GradingTimeout;
+    its worker may be stuck, so the pool's workers are replaced (the old ones
+    killed) and the slot is freed right away. Jobs caught on the old workers
+    are resubmitted once to the new ones.
+    """
+
+    def __init__(
+        self,
+        workers: int = GRADING_WORKERS,
+        max_queue: int = GRADING_MAX_QUEUE,
+        max_per_student: int = GRADING_MAX_PER_STUDENT,
+        timeout: float = GRADING_TIMEOUT,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_per_student = max_per_student
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._per_student: Dict[str, int] = {}
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._busy_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the API process has an event loop and Mongo threads running
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    async def start(self):
+        if self.running:
+            return
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        logger.info("Grading pool ready: %d warm worker(s)", len(set(pids)))
+
+    def _release(self, student_id: Optional[str]):
+        self.in_flight -= 1
+        if student_id:
+            remaining = self._per_student.get(student_id, 1) - 1
+            if remaining > 0:
+                self._per_student[student_id] = remaining
+            else:
+                self._per_student.pop(student_id, None)
+
+    def admit(self, student_id: Optional[str] = None):
+        """Reserve a slot or raise; every successful admit must be followed by one grade()."""
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            raise GradingOverloaded(f"{self.in_flight} grading jobs in progress")
+        if student_id and self._per_student.get(student_id, 0) >= self.max_per_student:
+            self.rejected += 1
+            raise StudentGradingLimit(f"{student_id} already has {self.max_per_student} grading jobs running")
+        self.in_flight += 1
+        if student_id:
+            self._per_student[student_id] = self._per_student.get(student_id, 0) + 1
+
+    def _submit(self, topic_id: str, subtopic_id: str, contents: bytes):
+        executor = self._executor
+        try:
+            return executor, executor.submit(_grade_in_worker, topic_id, subtopic_id, contents)
+        except BrokenProcessPool:
+            self._recycle(executor, "Grading pool broken")
+            executor = self._executor
+            return executor, executor.submit(_grade_in_worker, topic_id, subtopic_id, contents)
+
+    async def grade(self, topic_id: str, subtopic_id: str, contents: bytes, student_id: Optional[str] = None) -> dict:
+        """Grade in a worker process; the caller must have called admit(student_id)."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        retried = False
+        release_now = True
+        try:
+            while True:
+                if not self.running:
+                    await self.start()
+                executor, future = self._submit(topic_id, subtopic_id, contents)
+                try:
+                    result = await asyncio.wait_for(asyncio.wrap_future(future), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    self.timed_out += 1
+                    # A running task can't be cancelled, so replace the workers: the hung one is killed and its slot freed
+                    self._recycle(executor, "Grading job timed out")
+                    raise GradingTimeout(f"Grading took longer than {self.timeout:.0f}s")
+                except BrokenProcessPool:
+                    if executor is not self._executor and not retried and time.monotonic() < deadline:
+                        # Another job's timeout recycled the workers under this one; run it again on the new ones
+                        retried = True
+                        continue
+                    self.failed += 1
+                    self._recycle(executor, "Grading pool broken")
+                    raise
+                except asyncio.CancelledError:
+                    # The caller went away; the slot is held until the worker actually finishes
+                    release_now = False
+                    loop = asyncio.get_running_loop()
+                    future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finish, student_id, started))
+                    raise
+                except Exception:
+                    self.failed += 1
+                    raise
+                break
+        finally:
+            if release_now:
+                self._finish(student_id, started)
+        if result is None:
+            raise GraderNotFound(f"No grader for {topic_id}/{subtopic_id}")
+        self.completed += 1
+        return result
+
+    def _finish(self, student_id: Optional[str], started: float):
+        self._busy_total += time.monotonic() - started
+        self._release(student_id)
+
+    def _recycle(self, executor: Optional[ProcessPoolExecutor], reason: str):
+        """Swap `executor` for fresh workers and kill its processes (no-op if it was already swapped out)."""
+        if executor is None or executor is not self._executor:
+            return
+        logger.warning("%s, restarting grading workers", reason)
+        self._executor = self._new_executor()
+        # Kill rather than wait: a hung grader never returns. Jobs still on the
+        # old workers fail with BrokenProcessPool and are retried by grade().
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False)
+
+    async def shutdown(self):
+        if not self.running:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.get_running_loop().run_in_executor(None, lambda: executor.shutdown(wait=True, cancel_futures=True))
+
+    def stats(self) -> dict:
+        done = self.completed + self.failed + self.timed_out
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "capacity": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "avg_job_seconds": round(self._busy_total / done, 4) if done else 0.0,
+        }
+
+
+grading_pool = GradingPool()
+
+
+# ───── Grades and Jobs ─────
+async def save_assignment_grade(student_id: str, topic_id: str, subtopic_id: str, result: dict):
+    await assignment_grades_collection.update_one(
+        {
+            "student_id": student_id,
+            "topic_id": topic_id,
+            "subtopic_id": subtopic_id
+        },
+        {
+            "$set": {
+                "score": result["score"],
+                "feedback": result["feedback"],
+                "timestamp": datetime.utcnow()
+            }
+        },
+        upsert=True
+    )
+    await update_assignment_summary(student_summaries_collection, student_id, topic_id, subtopic_id, result["score"])
+    invalidate_progress(student_id, topic_id, subtopic_id)
+
+
+class GradingJobs:
+    """
+    Async job API on top of the pool. Job documents live in the
+    grading_jobs collection so any API process can answer a poll;
+    waiting on a job submitted to this process doesn't touch Mongo.
+    """
+
+    def __init__(self, pool: GradingPool, collection=grading_jobs_collection):
+        self.pool = pool
+        self.collection = collection
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _new_job(topic_id: str, subtopic_id: str, student_id: Optional[str]) -> dict:
+        return {
+            "_id": uuid.uuid4().hex,
+            "status": "queued",
+            "student_id": student_id,
+            "topic_id": topic_id,
+            "subtopic_id": subtopic_id,
+            "created_at": datetime.utcnow(),
+        }
+
+    async def submit(
+        self,
+        topic_id: str,
+        subtopic_id: str,
+        contents: bytes,
+        student_id: Optional[str] = None,
+        cache_key: Optional[str] = None,
+    ) -> dict:
+        """
+        Record and start a job; like GradingPool.grade, the caller must have
+        called pool.admit(student_id). With `cache_key` the result is also
+        stored in the grade cache.
+        """
+        job = self._new_job(topic_id, subtopic_id, student_id)
+        try:
+            await self.collection.insert_one(job)
+        except BaseException:
+            self.pool._release(student_id)
+            raise
+        task = asyncio.create_task(self._run(job, contents, cache_key))
+        self._tasks[job["_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["_id"], None))
+        return job
+
+    async def record_cached(self, topic_id: str, subtopic_id: str, result: dict, student_id: Optional[str] = None) -> dict:
+        """Record a job that a grade-cache hit has already finished (no pool slot involved)."""
+        if student_id:
+            await save_assignment_grade(student_id, topic_id, subtopic_id, result)
+        job = self._new_job(topic_id, subtopic_id, student_id)
+        job.update(status="done", result=result, cached=True, finished_at=job["created_at"])
+        await self.collection.insert_one(job)
+        return job
+
+    async def _run(self, job: dict, contents: bytes, cache_key: Optional[str] = None):
+        try:
+            result = await self.pool.grade(job["topic_id"], job["subtopic_id"], contents, job["student_id"])
+            if cache_key:
+                await grade_cache.set(cache_key, result)
+            if job["student_id"]:
+                await save_assignment_grade(job["student_id"], job["topic_id"], job["subtopic_id"], result)
+            update = {"status": "done", "result": result}
+        except Exception as e:
+            if not isinstance(e, (GraderNotFound, GradingTimeout)):
+                logger.exception("Grading job failed", extra={"job_id": job["_id"]})
+            update = {"status": "failed", "error": str(e) or type(e).__name__}
+        update["finished_at"] = datetime.utcnow()
+        try:
+            await self.collection.update_one({"_id": job["_id"]}, {"$set": update})
+        except Exception as e:
+            logger.error("Failed to record grading job %s: %s", job["_id"], e)
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[dict]:
+        """Job document; with `wait`, block up to that many seconds for it to finish."""
+        deadline = time.monotonic() + wait
+        task = self._tasks.get(job_id)
+        if wait and task is not None:
+            await asyncio.wait({task}, timeout=wait)
+        while True:
+            job = await self.collection.find_one({"_id": job_id})
+            if job is None or job["status"] in ("done", "failed") or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(0.25)
+
+    async def drain(self, timeout: float = 10.0):
+        if self._tasks:
+            await asyncio.wait(set(self._tasks.values()), timeout=timeout)
+
+
+grading_jobs = GradingJobs(grading_pool)
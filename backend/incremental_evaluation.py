@@ -0,0 +1,76 @@
+import os
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+MAX_EVAL_SESSIONS = int(os.getenv("MAX_EVAL_SESSIONS", "5000"))
+
+
+def _fingerprint(message: dict) -> str:
+    raw = f"{message.get('role')}\x00{message.get('content')}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SessionStates:
+    """
+    Per-session evaluator state for incremental objective checkers.
+
+    Incremental checkers expose
+        evaluate_objectives_incremental(state, new_messages) -> (state, flags)
+    (or an async `evaluate_chat_incremental` for LLM evaluators) where
+    `state` is a small JSON-serializable dict. This store remembers, per
+    (student_id, topic_id, subtopic_id, nested_subtopic_id), how much of the
+    client-sent history has already been folded into that state, so each
+    turn only looks at the new messages.
+
+    If the history no longer extends what was seen (new session, edited
+    history, or an entry evicted from this LRU) the state is rebuilt from
+    the full history, so results never depend on cache hits.
+    """
+
+    def __init__(self, max_sessions: int = MAX_EVAL_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[tuple, dict]" = OrderedDict()
+
+    def new_messages(self, key: tuple, history: List[dict], message: str, reply: str) -> Tuple[Optional[dict], List[dict]]:
+        """(stored state, messages not yet evaluated) for this turn."""
+        entry = self._sessions.get(key)
+        consumed = entry["consumed"] if entry else 0
+        if entry and consumed <= len(history) and (
+            consumed == 0 or _fingerprint(history[consumed - 1]) == entry["fingerprint"]
+        ):
+            self._sessions.move_to_end(key)
+            state, fresh = entry["state"], list(history[consumed:])
+            # Last turn's reply was already evaluated; it now comes back as history
+            pending = entry.get("pending_reply")
+            for i, m in enumerate(fresh):
+                if m.get("role") == "assistant" and m.get("content") == pending:
+                    del fresh[i]
+                    break
+        else:
+            state, fresh = None, list(history)
+
+        if not history or history[-1].get("role") != "user" or history[-1].get("content") != message:
+            fresh.append({"role": "user", "content": message})
+        fresh.append({"role": "assistant", "content": reply})
+        return state, fresh
+
+    def commit(self, key: tuple, history: List[dict], reply: str, state: dict):
+        self._sessions[key] = {
+            "consumed": len(history),
+            "fingerprint": _fingerprint(history[-1]) if history else None,
+            "pending_reply": reply,
+            "state": state,
+        }
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def reset(self, key: tuple):
+        self._sessions.pop(key, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+session_states = SessionStates()
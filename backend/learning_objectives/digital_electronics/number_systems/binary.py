@@ -2,86 +2,122 @@
 
 import re
 
-def evaluate_objectives(message, chat_history):
+objectives = [
+    "Convert binary to decimal",
+    "Convert decimal to binary",
+    "Identify bit, nibble, and byte",
+    "Differentiate LSB and MSB",
+    "Understand how binary represents digital signals",
+    "Explain the importance of place value in binary"
+]
+
+# Conversions are matched within a single message, with bounded gaps so a
+# long message can't make the regex backtrack across the whole session.
+BIN_TO_DEC = re.compile(r"\b(?:0b)?[01]{1,8}\b.{0,60}?(?:=|\bis\b|\bequals?\b).{0,60}?\b\d+\b")
+DEC_TO_BIN = re.compile(r"\b(\d+)\b.{0,60}?(?:=|\bis\b|\bequals?\b).{0,60}?\b(?:0b)?[01]{1,8}\b")
+
+# Phrases whose presence anywhere in the session moves an objective along
+KEYWORDS = {
+    "binary to decimal", "decimal to binary", "binary", "decimal",
+    "bit is", "nibble is", "byte is", "4 bits", "8 bits", "group of 4", "group of 8",
+    "bit", "nibble", "byte",
+    "lsb", "msb",
+    "digital signal", "on or off", "1 and 0", "high or low", "binary signal",
+    "place value", "2^", "powers of 2", "128", "64", "32", "16", "8", "4", "2", "1",
+}
+
+
+def initial_state():
+    return {"bin_to_dec": 0, "dec_to_bin_4bit": False, "dec_to_bin_8bit": False, "seen": []}
+
+
+def evaluate_objectives_incremental(state, new_messages):
     """
-    Evaluates chat history to determine student progress toward binary learning objectives.
-    Returns a list of flags: True (Completed), "progress" (Making Progress), False (Needs Work).
+    Folds only the new chat messages into `state` and returns (state, flags).
+    `state` is a small JSON-serializable dict; pass None to start a session.
     """
+    state = dict(state or initial_state())
+    seen = set(state["seen"])
+
+    for msg in new_messages:
+        if msg.get("role") not in ("user", "assistant"):
+            continue
+        text = str(msg.get("content", "")).lower()
+
+        state["bin_to_dec"] += len(BIN_TO_DEC.findall(text))
+        for decimal in DEC_TO_BIN.findall(text):
+            if int(decimal) < 16:
+                state["dec_to_bin_4bit"] = True
+            else:
+                state["dec_to_bin_8bit"] = True
 
-    objectives = [
-        "Convert binary to decimal",
-        "Convert decimal to binary",
-        "Identify bit, nibble, and byte",
-        "Differentiate LSB and MSB",
-        "Understand how binary represents digital signals",
-        "Explain the importance of place value in binary"
-    ]
+        seen.update(kw for kw in KEYWORDS if kw not in seen and kw in text)
 
-    chat_text = " ".join(msg["content"].lower() for msg in chat_history if msg["role"] in ("user", "assistant"))
+    state["seen"] = sorted(seen)
+    return state, flags_from_state(state)
 
+
+def flags_from_state(state):
+    """True (Completed), "progress" (Making Progress), False (Needs Work) per objective."""
+    seen = set(state["seen"])
     flags = []
 
     # Objective 1: Convert binary to decimal
-    bin_to_dec_matches = re.findall(r"\b(0b)?[01]{1,8}\b.*?\b(=|is|equals?)\b.*?\b\d+\b", chat_text)
-    if len(bin_to_dec_matches) >= 2:
+    if state["bin_to_dec"] >= 2:
         flags.append(True)
-    elif "binary to decimal" in chat_text or ("binary" in chat_text and "decimal" in chat_text):
+    elif "binary to decimal" in seen or ("binary" in seen and "decimal" in seen):
         flags.append("progress")
     else:
         flags.append(False)
 
     # Objective 2: Convert decimal to binary — requires both 4-bit and 8-bit conversions
-    dec_to_bin_matches = re.findall(r"\b\d+\b.*?\b(=|is|equals?)\b.*?\b(0b)?[01]{1,8}\b", chat_text)
-
-    has_4bit = False
-    has_8bit = False
-    for match in dec_to_bin_matches:
-        numbers = re.findall(r'\d+', match[0])
-        if not numbers:
-            continue
-        decimal_value = int(numbers[0])
-        if decimal_value < 16:
-            has_4bit = True
-        elif decimal_value >= 16:
-            has_8bit = True
-
+    has_4bit, has_8bit = state["dec_to_bin_4bit"], state["dec_to_bin_8bit"]
     if has_4bit and has_8bit:
         flags.append(True)
-    elif has_4bit or has_8bit or "decimal to binary" in chat_text:
+    elif has_4bit or has_8bit or "decimal to binary" in seen:
         flags.append("progress")
     else:
         flags.append(False)
 
     # Objective 3: Identify bit, nibble, and byte
-    if any(kw in chat_text for kw in ["bit is", "nibble is", "byte is", "4 bits", "8 bits", "group of 4", "group of 8"]):
+    if seen & {"bit is", "nibble is", "byte is", "4 bits", "8 bits", "group of 4", "group of 8"}:
         flags.append(True)
-    elif any(kw in chat_text for kw in ["bit", "nibble", "byte"]):
+    elif seen & {"bit", "nibble", "byte"}:
         flags.append("progress")
     else:
         flags.append(False)
 
     # Objective 4: Differentiate LSB and MSB
-    if "lsb" in chat_text and "msb" in chat_text:
+    if "lsb" in seen and "msb" in seen:
         flags.append(True)
-    elif "lsb" in chat_text or "msb" in chat_text:
+    elif "lsb" in seen or "msb" in seen:
         flags.append("progress")
     else:
         flags.append(False)
 
     # Objective 5: Understand how binary represents digital signals
-    if "binary" in chat_text and "digital signal" in chat_text:
+    if "binary" in seen and "digital signal" in seen:
         flags.append(True)
-    elif any(kw in chat_text for kw in ["on or off", "1 and 0", "high or low", "binary signal"]):
+    elif seen & {"on or off", "1 and 0", "high or low", "binary signal"}:
         flags.append("progress")
     else:
         flags.append(False)
 
     # Objective 6: Explain the importance of place value in binary
-    if "place value" in chat_text and "binary" in chat_text:
+    if "place value" in seen and "binary" in seen:
         flags.append(True)
-    elif any(kw in chat_text for kw in ["2^", "powers of 2", "128", "64", "32", "16", "8", "4", "2", "1"]):
+    elif seen & {"2^", "powers of 2", "128", "64", "32", "16", "8", "4", "2", "1"}:
         flags.append("progress")
     else:
         flags.append(False)
 
     return flags
+
+
+def evaluate_objectives(message, chat_history):
+    """
+    Evaluates chat history to determine student progress toward binary learning objectives.
+    Returns a list of flags: True (Completed), "progress" (Making Progress), False (Needs Work).
+    """
+    _, flags = evaluate_objectives_incremental(None, chat_history)
+    return flags
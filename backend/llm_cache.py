@@ -0,0 +1,301 @@
+# ───── Standard Library ─────
+import os
+import json
+import logging
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# ───── Internal Modules ─────
+from backend.cache import TTLCache
+from backend.llm_client import DEFAULT_MODEL, LLMGateway, get_llm
+
+logger = logging.getLogger(__name__)
+
+# ───── Cache Settings (overridable via .env) ─────
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()  # memory | mongo | off
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PRACTICE_POOL_SIZE = int(os.getenv("PRACTICE_POOL_SIZE", "5"))  # 0 disables pool mode
+
+
+def normalize_messages(messages: List[dict]) -> List[dict]:
+    """Role and whitespace-collapsed content only, so cosmetic differences share a key."""
+    return [
+        {"role": str(m.get("role", "")).lower(), "content": " ".join(str(m.get("content", "")).split())}
+        for m in messages
+    ]
+
+
+def cache_key(model: str, messages: List[dict], temperature: Optional[float] = None, **params) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": normalize_messages(messages),
+            "temperature": float(temperature) if temperature is not None else None,
+            "params": params,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ───── Backends ─────
+class MemoryCacheBackend:
+    """Per-process LRU with TTL, bounded by entry count and approximate size."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = LLM_CACHE_MAX_BYTES, ttl: float = LLM_CACHE_TTL):
+        self.cache = TTLCache(
+            max_entries=max_entries,
+            ttl=ttl,
+            max_bytes=max_bytes,
+            sizeof=lambda value: len(json.dumps(value)),
+        )
+
+    async def get(self, key: str):
+        return self.cache.get(key)
+
+    async def set(self, key: str, value, ttl: float):
+        self.cache.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        self.cache.pop(key)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class MongoCacheBackend:
+    """
+    Shared cache in the llm_cache collection; survives restarts and is seen
+    by every worker. Expired documents are removed by the TTL index on
+    `expires_at` (see database.INDEXES) and ignored on read until then.
+    """
+
+    name = "mongo"
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.errors = 0
+
+    async def get(self, key: str):
+        try:
+            doc = await self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, {"value": 1})
+        except Exception as e:
+            self.errors += 1
+            logger.warning("LLM cache read failed: %s", e)
+            return None
+        return doc["value"] if doc else None
+
+    async def set(self, key: str, value, ttl: float):
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "created_at": now, "expires_at": now + timedelta(seconds=ttl)}},
+                upsert=True,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning("LLM cache write failed: %s", e)
+
+    async def delete(self, key: str):
+        try:
+            await self.collection.delete_one({"_id": key})
+        except Exception as e:
+            self.errors += 1
+            logger.warning("LLM cache delete failed: %s", e)
+
+    def stats(self) -> dict:
+        return {"errors": self.errors}
+
+
+class LLMResponseCache:
+    """
+    Read-through cache in front of the LLM gateway.
+
+    Lookups go to the in-process backend first, then the optional shared
+    (Mongo) backend. Concurrent misses for the same key share one model
+    call, so a classroom opening the same page at once costs a single request.
+    """
+
+    def __init__(self, local: Optional[MemoryCacheBackend], shared=None, ttl: float = LLM_CACHE_TTL, gateway: Optional[LLMGateway] = None):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.gateway = gateway
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.local is not None or self.shared is not None
+
+    async def get(self, key: str):
+        if self.local is not None:
+            value = await self.local.get(key)
+            if value is not None:
+                self.local_hits += 1
+                return value
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.shared_hits += 1
+                if self.local is not None:
+                    await self.local.set(key, value, self.ttl)
+                return value
+        return None
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        ttl = ttl or self.ttl
+        if self.local is not None:
+            await self.local.set(key, value, ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        for backend in (self.local, self.shared):
+            if backend is not None:
+                await backend.delete(key)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable], ttl: Optional[float] = None):
+        """Cached value for `key`, running `create()` once on a miss (shared by concurrent callers)."""
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+
+        async def fill():
+            result = await create()
+            if result:
+                await self.set(key, result, ttl)
+            return result
+
+        task = asyncio.ensure_future(fill())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def complete_text(
+        self,
+        messages: List[dict],
+        model: str = DEFAULT_MODEL,
+        temperature: Optional[float] = None,
+        ttl: Optional[float] = None,
+        **kwargs,
+    ) -> str:
+        """Drop-in for LLMGateway.complete_text that serves repeated prompts from the cache."""
+        gateway = self.gateway or get_llm()
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if not self.enabled:
+            return await gateway.complete_text(messages, model=model, **kwargs)
+
+        params = {k: v for k, v in kwargs.items() if k not in ("temperature", "timeout")}
+        key = cache_key(model, messages, temperature, **params)
+        return await self.get_or_create(key, lambda: gateway.complete_text(messages, model=model, **kwargs), ttl)
+
+    def stats(self) -> dict:
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses + self.coalesced
+        return {
+            "backend": LLM_CACHE_BACKEND if self.enabled else "off",
+            "hits": hits,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "in_flight": len(self._inflight),
+            "local": self.local.stats() if self.local is not None else None,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+
+# ───── Practice Problem Pool ─────
+class PracticeProblemPool:
+    """
+    Pool mode for practice problems: generates `size` varied problems per
+    objective in one model call, stores them in the response cache and
+    hands them out round-robin until the entry expires. Round-robin
+    positions live in a bounded LRU with the cache's TTL, since objectives
+    come from the client.
+    """
+
+    def __init__(self, cache: LLMResponseCache, size: int = PRACTICE_POOL_SIZE, max_objectives: int = LLM_CACHE_MAX_ENTRIES):
+        self.cache = cache
+        self.size = size
+        self._cursors = TTLCache(max_entries=max_objectives, ttl=cache.ttl)
+        self.served = 0
+        self.generated = 0
+
+    async def next(self, objective: str, generate: Callable[[int], Awaitable[List[str]]]) -> Optional[str]:
+        """Next problem for `objective`; `generate(n)` produces a fresh list of up to n problems."""
+        key = "pool:" + hashlib.sha256(" ".join(objective.lower().split()).encode("utf-8")).hexdigest()
+
+        async def fill():
+            problems = [p for p in await generate(self.size) if p]
+            self.generated += len(problems)
+            return problems
+
+        problems = await self.cache.get_or_create(key, fill)
+        if not problems:
+            return None
+
+        cursor = self._cursors.get(key, 0)
+        self._cursors.set(key, cursor + 1)
+        self.served += 1
+        return problems[cursor % len(problems)]
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "objectives": len(self._cursors),
+            "served": self.served,
+            "generated": self.generated,
+        }
+
+
+def parse_problem_list(raw: str) -> List[str]:
+    """Problems from a JSON array reply; falls back to one problem per non-empty line."""
+    text = raw.strip()
+    if text.startswith("```"):
+        text = text.strip("`").split("\n", 1)[-1]
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, list):
+            return [str(p).strip() for p in parsed if str(p).strip()]
+    except ValueError:
+        pass
+    return [line.strip(" -•\t") for line in raw.splitlines() if line.strip(" -•\t")]
+
+
+# ───── Process-wide Cache ─────
+def build_llm_cache(backend: str = LLM_CACHE_BACKEND) -> LLMResponseCache:
+    if backend == "off":
+        return LLMResponseCache(local=None)
+    local = MemoryCacheBackend()
+    if backend == "mongo":
+        from backend.database import llm_cache_collection
+        if llm_cache_collection is not None:
+            return LLMResponseCache(local=local, shared=MongoCacheBackend(llm_cache_collection))
+        logger.warning("LLM_CACHE_BACKEND=mongo but MongoDB is unavailable; using the in-process cache only")
+    return LLMResponseCache(local=local)
+
+
+llm_cache = build_llm_cache()
+practice_pool = PracticeProblemPool(llm_cache)
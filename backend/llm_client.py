@@ -0,0 +1,205 @@
+# ───── Standard Library ─────
+import os
+import random
+import logging
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
+
+# openai and httpx are imported when the first gateway is built (the
+# openai package alone is a few hundred ms of import time)
+
+from backend.metrics import llm_calls, record_llm_usage
+
+logger = logging.getLogger(__name__)
+
+# ───── Gateway Settings (overridable via .env) ─────
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # seconds per attempt
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))  # in-flight model calls per process
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))  # pooled HTTP connections
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))  # seconds, doubled each retry
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> tuple:
+    """Transient openai errors worth retrying: timeouts, connection errors, 429s and 5xx."""
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+    return (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+
+class LLMGateway:
+    """
+    Shared async client for every module that talks to the model.
+
+    Wraps a single AsyncOpenAI client on a pooled httpx connection, caps the
+    number of concurrent completions with a semaphore and retries transient
+    failures (timeouts, connection errors, 429s, 5xx) with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = LLM_TIMEOUT,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+    ):
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+        # Retries are handled here so backoff and the concurrency cap apply together
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http,
+            max_retries=0,
+            timeout=timeout,
+        )
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.backoff_max) * random.uniform(0.5, 1.0)
+
+    async def chat_completion(
+        self,
+        messages: List[dict],
+        model: str = DEFAULT_MODEL,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """Run one chat completion and return the raw response object."""
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        timeout=timeout or self.timeout,
+                        **kwargs,
+                    )
+                llm_calls.inc(model=model, outcome="ok")
+                record_llm_usage(model, getattr(response, "usage", None))
+                return response
+            except retryable_errors() as e:
+                llm_calls.inc(model=model, outcome="retryable_error")
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning("LLM call failed (%s), retry %d/%d in %.2fs", type(e).__name__, attempt + 1, self.max_retries, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def complete_text(self, messages: List[dict], **kwargs) -> str:
+        """Run one chat completion and return the stripped reply text."""
+        response = await self.chat_completion(messages, **kwargs)
+        return (response.choices[0].message.content or "").strip()
+
+    async def stream_text(
+        self,
+        messages: List[dict],
+        model: str = DEFAULT_MODEL,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Opening the stream is retried like chat_completion (the concurrency
+        slot is given back during the backoff); once the first chunk has
+        been received, errors propagate to the caller. Token usage comes
+        from the final chunk and is recorded like chat_completion's.
+        """
+        attempt = 0
+        while True:
+            await self._semaphore.acquire()
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=timeout or self.timeout,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs,
+                )
+                llm_calls.inc(model=model, outcome="stream")
+                break
+            except retryable_errors() as e:
+                self._semaphore.release()
+                llm_calls.inc(model=model, outcome="retryable_error")
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning("LLM stream failed (%s), retry %d/%d in %.2fs", type(e).__name__, attempt + 1, self.max_retries, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+            except BaseException:
+                self._semaphore.release()
+                raise
+
+        try:
+            usage = None
+            async for chunk in stream:
+                # With include_usage the last chunk has no choices, only usage
+                usage = getattr(chunk, "usage", None) or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            record_llm_usage(model, usage)
+        finally:
+            try:
+                await stream.close()
+            finally:
+                self._semaphore.release()
+
+    async def aclose(self):
+        await self.client.close()
+        await self._http.aclose()
+
+
+# ───── Process-wide Gateway ─────
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm() -> LLMGateway:
+    """Return the shared gateway, creating it on first use."""
+    global _gateway
+    if _gateway is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("❌ OPENAI_API_KEY not found in environment variables")
+        _gateway = LLMGateway(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+    return _gateway
+
+
+async def close_llm():
+    global _gateway
+    if _gateway is not None:
+        await _gateway.aclose()
+        _gateway = None
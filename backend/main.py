@@ -1,66 +1,283 @@
 # ───── Standard Library ─────
 import os
 import json
-import traceback
-import importlib.util
+import time
+import asyncio
+import logging
+import importlib
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache, partial
 from typing import List, Optional, Union
 from pathlib import Path
 
 # ───── Third-Party Libraries ─────
 from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, File, Request, Query, Body 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from openai import OpenAI
-
-# ───── Internal Modules (absolute from backend/) ─────
-from backend.objective_loader import load_objective_checker
-from backend.database import students_collection, progress_collection, assignment_grades_collection
-from backend.models import Student, Progress
 
 # ───── Load Environment Variables ─────
+# Before the backend modules below, which read their settings at import
 env_path = Path(__file__).resolve().parent / ".env"
-if not env_path.exists():
-    print(f"⚠️  .env file not found at {env_path}")
 load_dotenv(dotenv_path=env_path)
 
-# ───── OpenAI Client Setup ─────
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("❌ OPENAI_API_KEY not found in environment variables")
-
-print("✅ Loaded OpenAI Key:", api_key[:10] + "...")
-client = OpenAI(api_key=api_key)
-
-
-# ───── Load AI Prompt File ─────
-SUBTOPIC_AI_PROMPTS = {}
-try:
-    file_path = os.path.join(os.path.dirname(__file__), "data", "ai_prompts.json")
-    with open(file_path, "r", encoding="utf-8") as f:
-        SUBTOPIC_AI_PROMPTS = json.load(f)
-    print("✅ Loaded ai_prompts.json")
-except Exception as e:
-    print(f"❌ Failed to load ai_prompts.json: {e}")
-
-# ───── FastAPI App Setup ─────
-app = FastAPI(default_response_class=JSONResponse)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # Frontend dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# ───── Internal Modules (absolute from backend/) ─────
+from backend.logging_config import setup_logging, RequestIdMiddleware
+from backend.metrics import MetricsMiddleware, COLLECTORS, render_metrics, span
+from backend.objective_loader import (
+    load_objective_checker,
+    load_nested_chat_evaluator,
+    load_incremental_chat_evaluator,
+    has_grader,
+    grader_version,
+    objective_checkers,
+    chat_evaluators,
+)
+from backend.incremental_evaluation import session_states
+from backend.chat_history import history_manager, session_key
+from backend.graders.digital_electronics.chat_ai.number_systems_verifier import verifier_stats
+from backend.database import (
+    students_collection,
+    progress_collection,
+    assignment_grades_collection,
+    student_summaries_collection,
+    ensure_indexes,
+    MissingUniqueIndex,
+    ping_mongo,
+    close_mongo,
+)
+from backend.models import Student, Progress
+from backend.students import (
+    list_students_response,
+    export_students_response,
+    STUDENTS_PAGE_SIZE,
+    STUDENTS_MAX_PAGE_SIZE,
+)
+from backend.progress_store import progress_query, upsert_progress, flags_grade
+from backend.progress_summaries import update_lesson_summary, summary_response
+from backend.progress_cache import (
+    cached_view,
+    cache_view,
+    remember_progress,
+    progress_cache_stats,
+    counters as progress_counters,
+)
+from backend.llm_client import get_llm, close_llm
+from backend.llm_cache import llm_cache, practice_pool, parse_problem_list, PRACTICE_POOL_SIZE
+from backend.llm_batching import evaluation_coalescer
+from backend.evaluation_queue import evaluation_queue
+from backend.api.quiz import router as quiz_router, seeded_quizzes, quiz_pools
+from backend.api.gradebook import router as gradebook_router
+from backend.grading_pool import (
+    grading_pool,
+    grading_jobs,
+    save_assignment_grade,
+    GraderNotFound,
+    GradingOverloaded,
+    GradingTimeout,
+    StudentGradingLimit,
 )
+from backend.grade_cache import grade_cache, grade_cache_key
+from backend.uploads import Upload, UploadLimitMiddleware, UploadRoute, spool_upload
+
+# ───── Logging (JSON lines through a queue; see backend.logging_config) ─────
+setup_logging()
+logger = logging.getLogger(__name__)
+if not env_path.exists():
+    logger.warning(".env file not found at %s", env_path)
+
+
+# ───── Chat Objective Evaluation ─────
+# "background": evaluate and save progress after the reply is sent
+# "inline": evaluate before responding (the reply waits for it)
+CHAT_EVAL_MODE = os.getenv("CHAT_EVAL_MODE", "background")
+
+# ───── AI Prompt File (read on first use or during warm-up) ─────
+@lru_cache(maxsize=None)
+def subtopic_prompts() -> dict:
+    try:
+        file_path = os.path.join(os.path.dirname(__file__), "data", "ai_prompts.json")
+        with open(file_path, "r", encoding="utf-8") as f:
+            prompts = json.load(f)
+        logger.info("Loaded ai_prompts.json")
+        return prompts
+    except Exception as e:
+        logger.error("Failed to load ai_prompts.json: %s", e)
+        return {}
+
+# ───── Startup Warm-up and Readiness ─────
+class WarmUp:
+    """
+    Work that makes the first requests fast but isn't needed to serve
+    /healthz: loading prompts and plug-in modules, importing the openai
+    client, starting the grading pool. It runs as a background task from
+    the lifespan, so the process accepts connections right away. Mongo is
+    pinged alongside (and retried until it answers); /readyz reports 200
+    once warm-up is done, every step succeeded and Mongo is reachable.
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def warming(self) -> bool:
+        return self.finished is None
+
+    @property
+    def ready(self) -> bool:
+        return not self.warming and all(state == "ok" for state in self.steps.values())
+
+    async def _step(self, name: str, work):
+        start = time.monotonic()
+        try:
+            await work()
+            self.steps[name] = "ok"
+            logger.info("Warm-up step %s done in %.2fs", name, time.monotonic() - start)
+        except Exception as e:
+            self.steps[name] = f"failed: {e}"
+            logger.error("Warm-up step %s failed: %s", name, e)
+
+    async def _connect_mongo(self):
+        """Ping until Mongo answers (a database that comes up late still makes the process ready), then create indexes."""
+        attempt = 0
+        while True:
+            try:
+                await ping_mongo()
+                break
+            except Exception as e:
+                self.steps["mongo"] = f"waiting: {type(e).__name__}"
+                await asyncio.sleep(min(2 ** attempt, 30))
+                attempt += 1
+        try:
+            await ensure_indexes()
+        except MissingUniqueIndex as e:
+            # Stays unready: writes keyed on that index aren't safe until the data is fixed
+            self.steps["mongo"] = f"failed: {e}"
+            logger.error("MongoDB reachable but %s", e)
+            return
+        self.steps["mongo"] = "ok"
+        logger.info("MongoDB reachable, indexes ensured")
+
+    async def _run(self):
+        async def llm():
+            # The openai package is the slowest import left; pay it off the event loop
+            await asyncio.to_thread(importlib.import_module, "openai")
+            get_llm()
+
+        async def registries():
+            subtopic_prompts()
+            objective_checkers.warm()
+            chat_evaluators.warm()
+
+        self.steps["mongo"] = "connecting"
+        mongo = asyncio.create_task(self._connect_mongo())
+        try:
+            await self._step("registries", registries)
+            await self._step("llm_client", llm)
+            await self._step("grading_pool", grading_pool.start)
+            self.finished = time.monotonic()
+            logger.info("Warm-up finished in %.2fs", self.finished - self.started)
+            await mongo
+        finally:
+            mongo.cancel()
+
+    def start(self):
+        self.started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def status(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {"ready": self.ready, "warming": self.warming, "seconds": round(elapsed, 3), "steps": dict(self.steps)}
+
+
+warm_up = WarmUp()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Owns the process-wide clients: starts the queue and warm-up, and closes everything on shutdown."""
+    evaluation_queue.start()
+    warm_up.start()
+    try:
+        yield
+    finally:
+        await warm_up.stop()
+        # The queue drains before the LLM client closes so queued evaluations can finish
+        await evaluation_queue.drain()
+        await grading_jobs.drain()
+        await grading_pool.shutdown()
+        await close_llm()
+        close_mongo()
+
+# ───── Routes (registered on the app by create_app) ─────
+router = APIRouter()
+upload_router = APIRouter(route_class=UploadRoute)  # workbook uploads (UPLOAD_SPOOL_BYTES spooling)
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving. Doesn't wait for warm-up or Mongo."""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: 200 once warm-up has finished and every step succeeded, 503 until then."""
+    status = warm_up.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
 # ───── Root Route for Health Check ─────
-@app.get("/")
+@router.get("/")
 async def root():
     return {"status": "ok", "message": "FastAPI backend is running"}
 
+# Existing stats() endpoints, also exported as /metrics gauges
+COLLECTORS.update({
+    "evaluation_queue": lambda: evaluation_queue.stats(),
+    "grading_pool": lambda: grading_pool.stats(),
+    "grade_cache": lambda: grade_cache.stats(),
+    "llm_cache": lambda: llm_cache.stats(),
+    "llm_batching": lambda: evaluation_coalescer.stats(),
+    "practice_pool": lambda: practice_pool.stats(),
+    "progress_cache": progress_cache_stats,
+    "chat_history": lambda: history_manager.stats(),
+    "chat_verifier": verifier_stats,
+    "quiz_seeded_cache": lambda: seeded_quizzes.stats(),
+    "quiz_pool_cache": lambda: quiz_pools.stats(),
+})
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, stage, LLM and Mongo metrics."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/evaluation")
+async def evaluation_metrics():
+    return evaluation_queue.stats()
+
+@router.get("/metrics/grading")
+async def grading_metrics():
+    return grading_pool.stats()
+
+@router.get("/metrics/grade-cache")
+async def grade_cache_metrics():
+    return grade_cache.stats()
+
+@router.get("/metrics/progress-cache")
+async def progress_cache_metrics():
+    return progress_cache_stats()
+
+@router.get("/metrics/llm-cache")
+async def llm_cache_metrics():
+    return {**llm_cache.stats(), "practice_pool": practice_pool.stats()}
+
 # ───── Pydantic Model for Chat Endpoint ─────
 class ChatRequest(BaseModel):
     student_id: str
@@ -71,15 +288,27 @@ class ChatRequest(BaseModel):
     history: List[dict] = []
     objectives: Optional[List[str]] = []
 
-@app.get("/students")
-async def get_students():
-    students = []
-    async for doc in students_collection.find():
-        doc["_id"] = str(doc["_id"])
-        students.append(doc)
-    return students
+@router.get("/students")
+async def get_students(
+    after: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(STUDENTS_PAGE_SIZE, ge=1, le=STUDENTS_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="comma-separated, e.g. user_id,first_name,last_name"),
+    allowed: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, max_length=64),
+):
+    return await list_students_response(after, limit, fields, allowed, name_prefix)
+
+# Declared before /students/{student_id} so "export" isn't taken for a student id
+@router.get("/students/export")
+async def export_students(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    allowed: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, max_length=64),
+):
+    return export_students_response(format, fields, allowed, name_prefix)
 
-@app.put("/students/{student_id}")
+@router.put("/students/{student_id}")
 async def update_student_allowed(student_id: str, updated_data: dict):
     result = await students_collection.update_one(
         {"user_id": student_id},
@@ -89,7 +318,7 @@ async def update_student_allowed(student_id: str, updated_data: dict):
         raise HTTPException(status_code=404, detail="Student not found or no change made.")
     return {"message": "Student updated"}
 
-@app.get("/students/{student_id}")
+@router.get("/students/{student_id}")
 async def get_student(student_id: str):
     student = await students_collection.find_one({"user_id": student_id})
     if not student:
@@ -97,71 +326,59 @@ async def get_student(student_id: str):
     student["_id"] = str(student["_id"])  # Optional: remove ObjectId serialization issues
     return student
 
-@app.get("/progress/{student_id}")
+@router.get("/progress/{student_id}")
 async def get_progress(student_id: str):
     progress = await progress_collection.find_one({"student_id": student_id})
     if not progress:
         raise HTTPException(status_code=404, detail="No progress found")
     return progress
 
-@app.get("/get-progress")
+@router.get("/get-progress")
 async def get_progress(
     student_id: str,
     topic_id: str,
     subtopic_id: str,
     nested_subtopic_id: str,
+    request: Request,
 ):
-    print("🟦 GET /get-progress query:", {
-        "student_id": student_id,
-        "topic_id": topic_id,
-        "subtopic_id": subtopic_id,
-        "nested_subtopic_id": nested_subtopic_id
-    })
-
-    progress = await progress_collection.find_one({
-        "student_id": student_id,
-        "topic_id": topic_id,
-        "subtopic_id": subtopic_id,
-        "nested_subtopic_id": nested_subtopic_id
-    })
-
-    print("📁 Raw progress document from DB:", progress)
-
-    if not progress:
-        print("🔴 No progress found.")
-        raise HTTPException(status_code=404, detail="Progress not found")
-
-    def merge_objective_progress(ai_flags, quiz_flags):
-        max_len = max(len(ai_flags), len(quiz_flags))
-        ai_flags += [False] * (max_len - len(ai_flags))
-        quiz_flags += [False] * (max_len - len(quiz_flags))
-        return [a or q for a, q in zip(ai_flags, quiz_flags)]
-
-    merged_flags = merge_objective_progress(
-        progress.get("ai_objective_progress", []),
-        progress.get("quiz_objective_progress", [])
-    )
-
-    topic_grade = progress.get("quiz_score", 0)
-    print("✅ Merged Objective Progress:", merged_flags)
-
-    return {
-        "objective_progress": merged_flags,
-        "quiz_score": progress.get("quiz_score", 0),
-        "assignment_score": progress.get("assignment_score", 0),
-        "topic_grade": topic_grade,
-    }
-
-@app.post("/progress/")
+    """
+    Merged objective progress for one nested subtopic, served from the
+    progress cache when possible. Unchanged polls that send If-None-Match
+    get a 304.
+    """
+    query = progress_query(student_id, topic_id, subtopic_id, nested_subtopic_id)
+
+    cached = cached_view(query)
+    if cached is None:
+        with span("mongo_find_one"):
+            progress = await progress_collection.find_one(query)
+        if not progress:
+            raise HTTPException(status_code=404, detail="Progress not found")
+        cached = cache_view(query, progress)
+    view, etag = cached
+
+    # no-cache: the browser keeps the body but revalidates every poll
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        progress_counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=view, headers=headers)
+
+@router.post("/progress/")
 async def update_progress(progress: Progress):
-    await progress_collection.update_one(
-        {"student_id": progress.student_id},
-        {"$set": progress.dict()},
-        upsert=True
+    """Legacy progress write: merged into the lesson's progress document like /save-progress."""
+    updated = await upsert_progress(
+        progress_collection,
+        progress_query(progress.student_id, progress.topic, progress.subtopic, progress.nested_subtopic),
+        ai_flags=progress.objective_progress,
+        # The model defaults quiz_score to 0; only a score the client sent may replace the stored one
+        quiz_score=progress.quiz_score if "quiz_score" in progress.model_fields_set else None,
+        summaries=student_summaries_collection,
     )
+    remember_progress(updated)
     return {"message": "Progress updated"}
 
-@app.get("/grades/{student_id}")
+@router.get("/grades/{student_id}")
 async def get_grades(student_id: str):
     grades = assignment_grades_collection.find({"student_id": student_id})
     results = []
@@ -170,208 +387,266 @@ async def get_grades(student_id: str):
         results.append(grade)
     return results
 
-def load_objective_checker(topic_id: str, subtopic_id: Optional[str] = None, nested_subtopic_id: Optional[str] = None):
-    base_path = os.path.join(os.path.dirname(__file__), "learning_objectives")
-
-    paths_to_try = []
-
-    # 1. Most specific: topic/subtopic/nested_subtopic
-    if nested_subtopic_id and subtopic_id:
-        paths_to_try.append(os.path.join(base_path, topic_id, subtopic_id, f"{nested_subtopic_id}.py"))
-
-    # 2. Fallback to topic/subtopic.py
-    if subtopic_id:
-        paths_to_try.append(os.path.join(base_path, topic_id, f"{subtopic_id}.py"))
-
-    # 3. Fallback to topic.py
-    paths_to_try.append(os.path.join(base_path, f"{topic_id}.py"))
-
-    for path in paths_to_try:
-        if os.path.exists(path):
-            try:
-                spec = importlib.util.spec_from_file_location("objective_checker", path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                print(f"✅ Loaded objective checker from: {abs_nested_path}")
-                return getattr(module, "evaluate_objectives", None)
-            except Exception as e:
-                print(f"❌ Failed to load objective checker from {path}: {e}")
+async def build_chat_messages(request: ChatRequest) -> List[dict]:
+    prompts = subtopic_prompts().get(
+        request.subtopic_id or request.topic_id,
+        subtopic_prompts()["general"]
+    )
+    system_message = prompts["system"]
 
-    print(f"⚠️ Objective checker not found for: {topic_id} / {subtopic_id} / {nested_subtopic_id}")
-    return None
+    if request.objectives:
+        objectives_list = "\n".join([f"- {obj}" for obj in request.objectives])
+        system_message += f"\n\nThe student is working toward:\n{objectives_list}"
 
-def load_nested_chat_evaluator(topic_id: str, subtopic_id: str):
-    try:
-        module_path = f"backend/graders/{topic_id}/chat_ai/{subtopic_id}_chat.py"
-        abs_path = os.path.join(os.path.dirname(__file__), module_path)
-        if not os.path.exists(abs_path):
-            print(f"❌ Evaluator file not found: {module_path}")
-            return None, {}
+    system_message += "\n\nImportant: Ask only ONE question at a time. Do NOT ask what the student wants to do next — automatically move to the next objective."
 
-        spec = importlib.util.spec_from_file_location("chat_ai", abs_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+    if not request.history:
+        return [{"role": "system", "content": system_message}, {"role": "assistant", "content": prompts["initial"]}]
 
-        evaluator = getattr(module, "evaluate_chat", None)
-        objectives = getattr(module, "NESTED_OBJECTIVES", {})
-        return evaluator, objectives
+    # Recent turns verbatim, older ones as the session's rolling summary, capped at the token budget
+    key = session_key(request.student_id, request.topic_id, request.subtopic_id, request.nested_subtopic_id)
+    messages, fold_due = await history_manager.build(key, system_message, request.history, request.message)
+    if fold_due and not evaluation_queue.submit(request.student_id, partial(history_manager.fold, key, list(request.history))):
+        history_manager.release_fold(key)
+    return messages
 
-    except Exception as e:
-        print(f"❌ Failed to load evaluator: {e}")
-        return None, {}
+async def evaluate_chat_turn(request: ChatRequest, reply: str) -> list:
+    """
+    Objective flags for the turn: the learning_objectives checker if one exists, else the chat_ai evaluator.
+    Incremental evaluators only see the messages added since the session's previous turn.
+    """
+    turn_key = (request.student_id, request.topic_id, request.subtopic_id, request.nested_subtopic_id)
 
-@app.post("/chat") 
-async def chat(request: ChatRequest):
-    try:
-        # ---- Prompt Setup ----
-        prompts = SUBTOPIC_AI_PROMPTS.get(
-            request.subtopic_id or request.topic_id,
-            SUBTOPIC_AI_PROMPTS["general"]
+    with span("checker_load"):
+        incremental = load_objective_checker(
+            topic_id=request.topic_id,
+            subtopic_id=request.subtopic_id,
+            nested_subtopic_id=request.nested_subtopic_id,
+            attr="evaluate_objectives_incremental"
         )
-        system_message = prompts["system"]
-
-        if request.objectives:
-            objectives_list = "\n".join([f"- {obj}" for obj in request.objectives])
-            system_message += f"\n\nThe student is working toward:\n{objectives_list}"
-
-        system_message += "\n\nImportant: Ask only ONE question at a time. Do NOT ask what the student wants to do next — automatically move to the next objective."
-
-        messages = [{"role": "system", "content": system_message}]
-        if not request.history:
-            messages.append({"role": "assistant", "content": prompts["initial"]})
-        else:
-            messages.extend(request.history)
-            messages.append({"role": "user", "content": request.message})
-
-        # ---- GPT Response ----
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1000
+    if incremental:
+        state, new_messages = session_states.new_messages(turn_key, request.history, request.message, reply)
+        state, progress_flags = incremental(state, new_messages)
+        session_states.commit(turn_key, request.history, reply, state)
+        logger.debug("Evaluated progress flags", extra={"flags": progress_flags, "sampled": True})
+        return progress_flags
+
+    with span("checker_load"):
+        get_objective_state = load_objective_checker(
+            topic_id=request.topic_id,
+            subtopic_id=request.subtopic_id,
+            nested_subtopic_id=request.nested_subtopic_id
         )
-
-        reply = response.choices[0].message.content.strip()
-
-        # ---- Evaluate Progress ----
-        progress_flags = []
+    if get_objective_state:
         chat_with_latest = request.history + [
             {"role": "user", "content": request.message},
             {"role": "assistant", "content": reply}
         ]
-
-        get_objective_state = load_objective_checker(
-            topic_id=request.topic_id,
-            subtopic_id=request.subtopic_id,
-            nested_subtopic_id=request.nested_subtopic_id
+        progress_flags = get_objective_state(request.message, chat_with_latest)
+        logger.debug("Evaluated progress flags", extra={"flags": progress_flags, "sampled": True})
+        return progress_flags
+
+    if request.subtopic_id and request.nested_subtopic_id:
+        with span("checker_load"):
+            evaluate_incremental = load_incremental_chat_evaluator(request.topic_id, request.subtopic_id)
+        if evaluate_incremental:
+            state, new_messages = session_states.new_messages(turn_key, request.history, request.message, reply)
+            state, progress_flags = await evaluate_incremental(state, new_messages, request.nested_subtopic_id)
+            session_states.commit(turn_key, request.history, reply, state)
+            return progress_flags
+
+        with span("checker_load"):
+            evaluate_chat, _ = load_nested_chat_evaluator(request.topic_id, request.subtopic_id)
+        if evaluate_chat:
+            return await evaluate_chat(request.message, request.history, request.nested_subtopic_id)
+
+    return []
+
+async def save_chat_progress(request: ChatRequest, progress_flags: list) -> Optional[dict]:
+    """Merge the turn's flags into stored progress (one round trip); returns the updated document."""
+    if not (request.subtopic_id and request.nested_subtopic_id):
+        return None
+    updated = await upsert_progress(
+        progress_collection,
+        progress_query(request.student_id, request.topic_id, request.subtopic_id, request.nested_subtopic_id),
+        ai_flags=progress_flags,
+        summaries=student_summaries_collection,
+    )
+    remember_progress(updated)
+    return updated
+
+async def evaluate_and_save_chat_turn(request: ChatRequest, reply: str) -> Optional[dict]:
+    with span("evaluate"):
+        progress_flags = await evaluate_chat_turn(request, reply)
+    with span("save_progress"):
+        return await save_chat_progress(request, progress_flags)
+
+def chat_turn_result(progress_flags: list, existing: Optional[dict]) -> dict:
+    # ---- Grade: the stored one (merged AI + quiz flags), else the same rule on this turn's flags ----
+    topic_grade = existing.get("topic_grade", 0) if existing else flags_grade(progress_flags)
+
+    # ---- Optional: Completion Message ----
+    ready_prompt = None
+    if progress_flags and all(p is True for p in progress_flags):
+        ready_prompt = (
+            "✅ Awesome work! You've demonstrated a strong understanding of this topic. "
+            "You can take the quiz to challenge yourself further, or just keep exploring other pages—"
+            "I'll be here to help on your next topic!"
         )
 
-        if get_objective_state:
-            progress_flags = get_objective_state(chat_with_latest)
-            print(f"📊 Evaluated progress flags: {progress_flags}")
-        else:
-            progress_flags = []
+    return {
+        "progress": progress_flags,
+        "topic_grade": topic_grade,
+        "ready_prompt": ready_prompt
+    }
 
-        # ---- Load Stored Progress ----
-        stored_progress = []
-        try:
-            existing = await progress_collection.find_one({
-                "student_id": request.student_id,
-                "topic_id": request.topic_id,
-                "subtopic_id": request.subtopic_id,
-                "nested_subtopic_id": request.nested_subtopic_id
-            })
-            if existing:
-                stored_progress = existing.get("objective_progress", [])
-        except Exception as e:
-            print(f"⚠️ Failed to fetch stored progress: {e}")
-
-        # ---- Merge Old and New ----
-        if stored_progress and len(stored_progress) == len(progress_flags):
-            merged_progress = []
-            for new, old in zip(progress_flags, stored_progress):
-                if old is True:
-                    merged_progress.append(True)
-                elif new is True:
-                    merged_progress.append(True)
-                elif new == "progress" or old == "progress":
-                    merged_progress.append("progress")
-                else:
-                    merged_progress.append(False)
-            progress_flags = merged_progress
-
-        # ---- Grade Calculation from Progress ----
-        total = len(progress_flags)
-        completed = sum(1 if p is True else 0.5 if p == "progress" else 0 for p in progress_flags)
-        topic_grade = round((completed / total) * 100) if total else 0
-
-        # ---- Optional: Completion Message ----
-        ready_prompt = None
-        if progress_flags and all(p is True for p in progress_flags):
-            ready_prompt = (
-                "✅ Awesome work! You've demonstrated a strong understanding of this topic. "
-                "You can take the quiz to challenge yourself further, or just keep exploring other pages—"
-                "I'll be here to help on your next topic!"
-            )
-
-        # ---- Save to MongoDB ----
-        save_payload = SaveProgressRequest(
-            student_id=request.student_id,
-            topic_id=request.topic_id,
-            subtopic_id=request.subtopic_id,
-            nested_subtopic_id=request.nested_subtopic_id,
-            ai_objective_progress=progress_flags
-        )
-        await save_progress(save_payload)
+async def finish_chat_turn(request: ChatRequest, reply: str) -> dict:
+    """
+    Evaluate objectives and save progress for a finished turn.
+
+    In background mode the work is queued and the response carries
+    `"evaluation": "queued"`; the client picks the new progress up from
+    /get-progress. If the queue is full the turn is evaluated inline.
+    """
+    if CHAT_EVAL_MODE == "background" and evaluation_queue.submit(
+        request.student_id, partial(evaluate_and_save_chat_turn, request, reply)
+    ):
+        return {"progress": [], "topic_grade": None, "ready_prompt": None, "evaluation": "queued"}
+
+    with span("evaluate"):
+        progress_flags = await evaluate_chat_turn(request, reply)
+    with span("save_progress"):
+        existing = await save_chat_progress(request, progress_flags)
+    if existing:
+        progress_flags = existing.get("ai_objective_progress", progress_flags)
+    return {**chat_turn_result(progress_flags, existing), "evaluation": "complete"}
+
+CHAT_REPLY_PARAMS = {"model": "gpt-4o", "temperature": 0.7, "max_tokens": 1000}
+
+@router.post("/chat") 
+async def chat(request: ChatRequest):
+    try:
+        with span("prompt"):
+            messages = await build_chat_messages(request)
 
-        # ---- Response ----
-        return {
-            "reply": reply,
-            "progress": progress_flags,
-            "topic_grade": max(topic_grade, existing.get("quiz_score", 0) if existing else 0),
-            "ready_prompt": ready_prompt
-        }
+        # ---- GPT Response ----
+        with span("llm"):
+            if request.history:
+                reply = await get_llm().complete_text(messages, **CHAT_REPLY_PARAMS)
+            else:
+                # Opening greeting is the same for every student on the page
+                reply = await llm_cache.complete_text(messages, **CHAT_REPLY_PARAMS)
+
+        return {"reply": reply, **await finish_chat_turn(request, reply)}
 
     except Exception as e:
-        print("⚠️ Chat error:", traceback.format_exc())
+        logger.exception("Chat error")
         return {
             "reply": f"⚠️ Error: {str(e)}",
             "progress": [],
             "ready_prompt": None
         }
 
-@app.get("/quiz/binary")
-async def get_binary_quiz():
-    try:
-        from backend.quiz.binary_quiz import generate_binary_quiz
-        return {"quiz": generate_binary_quiz()}
-    except Exception as e:
-        print("⚠️ Failed to generate quiz:", e)
-        raise HTTPException(status_code=500, detail="Quiz generation error")
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat. Responds with NDJSON lines:
+      {"type": "token", "content": "..."}   as the model produces text
+      {"type": "done", "reply": ..., "progress": ..., "topic_grade": ..., "ready_prompt": ...}
+      {"type": "error", "reply": "..."}     if anything fails
+    """
+    with span("prompt"):
+        messages = await build_chat_messages(request)
+
+    async def events():
+        try:
+            with span("llm"):
+                if request.history:
+                    parts = []
+                    async for delta in get_llm().stream_text(messages, **CHAT_REPLY_PARAMS):
+                        parts.append(delta)
+                        yield json.dumps({"type": "token", "content": delta}) + "\n"
+                    reply = "".join(parts).strip()
+                else:
+                    # Cached opening greeting goes out as a single token
+                    reply = await llm_cache.complete_text(messages, **CHAT_REPLY_PARAMS)
+                    yield json.dumps({"type": "token", "content": reply}) + "\n"
+            result = await finish_chat_turn(request, reply)
+            yield json.dumps({"type": "done", "reply": reply, **result}) + "\n"
+
+        except Exception as e:
+            logger.exception("Chat stream error")
+            yield json.dumps({"type": "error", "reply": f"⚠️ Error: {str(e)}"}) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 class PracticeProblemRequest(BaseModel):
     objective: str
 
-@app.post("/generate-practice-problem")
+PRACTICE_SYSTEM_PROMPT = "You are a helpful tutor that gives short, direct practice problems."
+
+async def generate_practice_problems(objective: str, count: int) -> List[str]:
+    """`count` varied problems for the pool in a single model call."""
+    raw = await get_llm().complete_text(
+        [
+            {"role": "system", "content": PRACTICE_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f"Generate {count} different, clear, age-appropriate practice problems to help a student practice this skill: {objective}. "
+                "Vary the numbers and wording. Return ONLY a JSON array of strings, one problem per item, with no explanations."
+            )},
+        ],
+        model="gpt-4o",
+        temperature=0.9,
+    )
+    return parse_problem_list(raw)[:count]
+
+@router.post("/generate-practice-problem")
 async def generate_practice_problem(req: PracticeProblemRequest):
     prompt = f"Generate a single, clear, age-appropriate practice problem to help a student practice this skill: {req.objective}. Only return one practice problem. Do not include explanations or a list."
 
     try:
-        response = client.chat.completions.create(  # 🛠 No await here
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful tutor that gives short, direct practice problems."},
+        if PRACTICE_POOL_SIZE > 0 and llm_cache.enabled:
+            problem = await practice_pool.next(req.objective, partial(generate_practice_problems, req.objective))
+            if problem:
+                return {"problem": problem}
+
+        problem = await llm_cache.complete_text(
+            [
+                {"role": "system", "content": PRACTICE_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
-            ]
+            ],
+            model="gpt-4o",
         )
-        return {"problem": response.choices[0].message.content}
+        return {"problem": problem}
     except Exception as e:
-        print("❌ Practice problem generation failed:", e)
-        import traceback
-        traceback.print_exc()
+        logger.exception("Practice problem generation failed")
         raise HTTPException(status_code=500, detail="Failed to generate practice problem")
 
-@app.post("/grade/{topic_id}/{subtopic_id}")
+def grade_key(topic_id: str, subtopic_id: str, upload: Upload) -> str:
+    """Grade cache key for this workbook under the current grader; 404 for unknown graders."""
+    version = grader_version(topic_id, subtopic_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"No grader for {topic_id}/{subtopic_id}")
+    return grade_cache_key(topic_id, subtopic_id, version, upload.sha256)
+
+def admit_grading_job(topic_id: str, subtopic_id: str, student_id: Optional[str]):
+    """404 for unknown graders, 503 when the pool is full, 429 when the student already has jobs running."""
+    # Only checks the file exists: the grader itself (and pandas) is loaded in the worker,
+    # which reports a module without a grade function as GraderNotFound
+    if not has_grader(topic_id, subtopic_id):
+        raise HTTPException(status_code=404, detail=f"No grader for {topic_id}/{subtopic_id}")
+    try:
+        grading_pool.admit(student_id)
+    except GradingOverloaded:
+        raise HTTPException(status_code=503, detail="Grading is busy, please try again shortly", headers={"Retry-After": "5"})
+    except StudentGradingLimit:
+        raise HTTPException(status_code=429, detail="You already have assignments being graded", headers={"Retry-After": "5"})
+
+@upload_router.post("/grade/{topic_id}/{subtopic_id}")
 async def dynamic_grader(
     topic_id: str,
     subtopic_id: str,
@@ -379,46 +654,60 @@ async def dynamic_grader(
     request: Request = None
 ):
     try:
-        contents = await file.read()
-        rel_path = f"backend/graders/{topic_id}/{subtopic_id}.py"
-        abs_path = os.path.join(os.path.dirname(__file__), rel_path)
-
-        if not os.path.exists(abs_path):
-            raise HTTPException(status_code=404, detail=f"No grader for {topic_id}/{subtopic_id}")
-
-        spec = importlib.util.spec_from_file_location("grader", abs_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        upload = await spool_upload(file)
+        student_id = request.query_params.get("student_id")
+        key = grade_key(topic_id, subtopic_id, upload)
 
-        if not hasattr(module, "grade"):
-            raise HTTPException(status_code=500, detail=f"'grade' function missing in {topic_id}/{subtopic_id}.py")
+        async def grade_upload():
+            admit_grading_job(topic_id, subtopic_id, student_id)
+            # Parsing runs in a worker process; this handler only waits for the result
+            return await grading_pool.grade(topic_id, subtopic_id, await upload.read(), student_id)
 
-        result = module.grade(contents)
+        # Cache hits skip the pool; identical uploads already being graded share that run
+        result = await grade_cache.get_or_create(key, grade_upload)
 
-        student_id = request.query_params.get("student_id")
         if student_id:
-            await assignment_grades_collection.update_one(
-                {
-                    "student_id": student_id,
-                    "topic_id": topic_id,
-                    "subtopic_id": subtopic_id
-                },
-                {
-                    "$set": {
-                        "score": result["score"],
-                        "feedback": result["feedback"],
-                        "timestamp": datetime.utcnow()
-                    }
-                },
-                upsert=True
-            )
+            await save_assignment_grade(student_id, topic_id, subtopic_id, result)
 
         return result
 
+    except HTTPException:
+        raise
+    except GraderNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GradingTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        print("⚠️ Grading error:", traceback.format_exc())
+        logger.exception("Grading error", extra={"topic_id": topic_id, "subtopic_id": subtopic_id})
         raise HTTPException(status_code=500, detail="Failed to grade assignment")
 
+@upload_router.post("/grade-jobs/{topic_id}/{subtopic_id}", status_code=202)
+async def submit_grading_job(
+    topic_id: str,
+    subtopic_id: str,
+    file: UploadFile = File(...),
+    student_id: Optional[str] = Query(None)
+):
+    """Queue an assignment for grading; poll GET /grade-jobs/{job_id} for the result."""
+    upload = await spool_upload(file)
+    key = grade_key(topic_id, subtopic_id, upload)
+    result = await grade_cache.get(key)
+    if result is not None:
+        job = await grading_jobs.record_cached(topic_id, subtopic_id, result, student_id)
+        return {"job_id": job["_id"], "status": job["status"]}
+    admit_grading_job(topic_id, subtopic_id, student_id)
+    job = await grading_jobs.submit(topic_id, subtopic_id, await upload.read(), student_id, cache_key=key)
+    return {"job_id": job["_id"], "status": job["status"]}
+
+@router.get("/grade-jobs/{job_id}")
+async def get_grading_job(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    """Job status and, once done, its result. `wait` blocks up to that many seconds for completion."""
+    job = await grading_jobs.get(job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Grading job not found")
+    job["job_id"] = job.pop("_id")
+    return job
+
 class ScoreUpdate(BaseModel):
     student_id: str
     topic_id: str
@@ -440,77 +729,28 @@ class SaveProgressRequest(BaseModel):
     quiz_objective_progress: Optional[List[Union[bool, str]]] = []
     ai_objective_progress: Optional[List[Union[bool, str]]] = []
 
-@app.post("/save-progress")
+@router.post("/save-progress")
 async def save_progress(payload: SaveProgressRequest):
     if not all([payload.student_id, payload.topic_id, payload.subtopic_id, payload.nested_subtopic_id]):
         return JSONResponse(status_code=400, content={"error": "Missing required identifiers"})
 
-    topic_id = payload.topic_id.lower().strip()
-    subtopic_id = payload.subtopic_id.lower().strip()
-    nested_subtopic_id = payload.nested_subtopic_id.lower().strip()
-
-    query = {
-        "student_id": payload.student_id,
-        "topic_id": topic_id,
-        "subtopic_id": subtopic_id,
-        "nested_subtopic_id": nested_subtopic_id,
-    }
-
-    existing = await progress_collection.find_one(query)
-
-    existing_ai = existing.get("ai_objective_progress", []) if existing else []
-    existing_quiz = existing.get("quiz_objective_progress", []) if existing else []
-
-    def merge_progress(existing, new):
-        length = max(len(existing), len(new))
-        merged = []
-        for i in range(length):
-            e = existing[i] if i < len(existing) else False
-            n = new[i] if i < len(new) else False
-            if e is True or n is True:
-                merged.append(True)
-            elif e == "progress" or n == "progress":
-                merged.append("progress")
-            else:
-                merged.append(False)
-        return merged
-
-    new_ai = payload.ai_objective_progress or existing_ai
-    new_quiz = payload.quiz_objective_progress or existing_quiz
-
-    merged_ai = merge_progress(existing_ai, new_ai)
-    merged_quiz = merge_progress(existing_quiz, new_quiz)
-
-    # Final combination: either AI or quiz can complete an objective
-    final_combined_progress = merge_progress(merged_ai, merged_quiz)
-
-    # Calculate topic grade
-    def calc_grade(flags):
-        total = len(flags)
-        if total == 0:
-            return 0
-        completed = sum(1 for f in flags if f is True)
-        return int((completed / total) * 100)
-
-    topic_grade = calc_grade(final_combined_progress)
-
-    # Build document to update
-    update_doc = {
-        "$set": {
-            "ai_objective_progress": merged_ai,
-            "quiz_objective_progress": merged_quiz,
-            "topic_grade": topic_grade,
-        }
-    }
-
-    if payload.quiz_score is not None:
-        update_doc["$set"]["quiz_score"] = payload.quiz_score
+    query = progress_query(payload.student_id, payload.topic_id, payload.subtopic_id, payload.nested_subtopic_id)
 
-    await progress_collection.update_one(query, update_doc, upsert=True)
+    # Merge (True beats "progress" beats False) and grade server-side in one atomic update
+    updated = await upsert_progress(
+        progress_collection,
+        query,
+        ai_flags=payload.ai_objective_progress,
+        quiz_flags=payload.quiz_objective_progress,
+        quiz_score=payload.quiz_score,
+        summaries=student_summaries_collection,
+    )
+    remember_progress(updated)
+    topic_grade = updated.get("topic_grade", 0)
 
     return {"status": "✅ Progress updated", "topic_grade": topic_grade}
 
-@app.get("/progress-all/{student_id}")
+@router.get("/progress-all/{student_id}")
 async def get_user_progress(student_id: str):
     results = []
     cursor = progress_collection.find({"student_id": student_id})
@@ -526,15 +766,22 @@ async def get_user_progress(student_id: str):
         results.append(formatted)
     return results
 
-@app.put("/reset-scores/{student_id}/{topic_id}/{subtopic_id}/{nested_subtopic_id}")
+@router.get("/progress-summary/{student_id}")
+async def get_progress_summary(student_id: str):
+    """Overall, per-topic and per-lesson status from the student's summary document (one read)."""
+    summary = await student_summaries_collection.find_one({"_id": student_id})
+    return summary_response(student_id, summary)
+
+@router.put("/reset-scores/{student_id}/{topic_id}/{subtopic_id}/{nested_subtopic_id}")
 async def reset_scores(student_id: str, topic_id: str, subtopic_id: str, nested_subtopic_id: str):
+    query = {
+        "student_id": student_id,
+        "topic_id": topic_id,
+        "subtopic_id": subtopic_id,
+        "nested_subtopic_id": nested_subtopic_id
+    }
     result = await progress_collection.update_one(
-        {
-            "student_id": student_id,
-            "topic_id": topic_id,
-            "subtopic_id": subtopic_id,
-            "nested_subtopic_id": nested_subtopic_id
-        },
+        query,
         {
             "$set": {
                 "quiz_score": 0,
@@ -542,5 +789,42 @@ async def reset_scores(student_id: str, topic_id: str, subtopic_id: str, nested_
             }
         }
     )
+    if result.matched_count:
+        progress = await progress_collection.find_one(query)
+        remember_progress(progress)
+        await update_lesson_summary(student_summaries_collection, progress)
     return {"message": "Scores reset", "matched": result.matched_count, "modified": result.modified_count}
 
+
+# ───── App Factory ─────
+def create_app() -> FastAPI:
+    """The API application: middleware, routers and the lifespan that owns the shared clients."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY not found in environment variables")
+    logger.info("Loaded OpenAI key %s...", api_key[:10])
+
+    app = FastAPI(default_response_class=JSONResponse, lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],  # Frontend dev server
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Request-ID", "ETag"],  # /students pagination, log correlation, progress polling
+    )
+    app.add_middleware(UploadLimitMiddleware)  # 413 for oversized /grade bodies before they are spooled
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(RequestIdMiddleware)  # added last, so it runs first and the slow-request log has the id
+
+    app.include_router(router)
+    app.include_router(upload_router)
+    # Quizzes: /quiz/{topic_id}/{subtopic_id}/{nested_subtopic_id} (and the legacy /quiz/binary)
+    app.include_router(quiz_router)
+    app.include_router(gradebook_router)
+    return app
+
+
+# `uvicorn backend.main:app`
+app = create_app()
@@ -0,0 +1,243 @@
+# metrics.py — request timing, stage spans and a Prometheus text endpoint
+#
+# No client library: a handful of counters, gauges and histograms kept in
+# process and rendered in the Prometheus text format (0.0.4) by /metrics.
+#
+# Settings (environment):
+#   SLOW_REQUEST_MS=2000   log the span breakdown of requests slower than this (0 disables)
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# ───── Metric Types ─────
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()  # Mongo listener callbacks arrive on driver threads
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{label}="{value}"' for label, value in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        return [f"{self.name}{self._label_text(k)} {v}" for k, v in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        lines = []
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = self._label_text(key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = self._label_text(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {series[-1]}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {series[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+# Existing stats() providers, exported as gauges: prefix -> callable returning a flat dict
+COLLECTORS: Dict[str, Callable[[], dict]] = {}
+
+http_requests = Counter("webapp_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+http_latency = Histogram("webapp_http_request_seconds", "HTTP request latency by route", ("route", "method"))
+http_in_flight = Gauge("webapp_http_requests_in_flight", "HTTP requests being served")
+stage_latency = Histogram("webapp_stage_seconds", "Latency of instrumented request stages", ("stage",))
+llm_tokens = Counter("webapp_llm_tokens_total", "Model tokens used, from response.usage", ("model", "kind"))
+llm_calls = Counter("webapp_llm_calls_total", "Model calls by outcome", ("model", "outcome"))
+mongo_commands = Counter("webapp_mongo_commands_total", "MongoDB commands by name and outcome", ("command", "outcome"))
+mongo_latency = Histogram("webapp_mongo_command_seconds", "MongoDB command latency", ("command",))
+
+
+# ───── Spans ─────
+# Per request: list of (stage, seconds), for the slow-request log
+_spans: ContextVar[Optional[list]] = ContextVar("spans", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a stage of the current request (works in sync and async code)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_latency.observe(elapsed, stage=stage)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def record_llm_usage(model: str, usage):
+    """Token counts from an OpenAI `response.usage` (None-safe)."""
+    if usage is None:
+        return
+    llm_tokens.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+    llm_tokens.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+
+
+# ───── Mongo Command Listener ─────
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def _finish(self, event, outcome: str):
+        mongo_commands.inc(command=event.command_name, outcome=outcome)
+        mongo_latency.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+mongo_listener = MongoCommandMetrics()
+
+
+# ───── ASGI Middleware ─────
+class MetricsMiddleware:
+    """
+    Per-route latency/count, in-flight gauge and span collection. Routes
+    are labelled by their path template (/students/{student_id}), so the
+    label set stays bounded.
+    """
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+        spans = []
+        token = _spans.set(spans)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            _spans.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope.get("method", "")
+            http_latency.observe(elapsed, route=route, method=method)
+            http_requests.inc(route=route, method=method, status=status["code"])
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning("Slow request", extra={
+                    "route": route,
+                    "method": method,
+                    "status": status["code"],
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "spans": [{"stage": s, "ms": round(t * 1000, 1)} for s, t in spans],
+                })
+
+
+# ───── Exposition ─────
+def render_collectors() -> List[str]:
+    lines = []
+    for prefix, collect in COLLECTORS.items():
+        try:
+            stats = collect()
+        except Exception as e:
+            logger.warning("Metrics collector %s failed: %s", prefix, e)
+            continue
+        for key, value in sorted(stats.items()):
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"webapp_{prefix}_{key}"
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += render_collectors()
+    return "\n".join(lines) + "\n"
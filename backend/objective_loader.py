@@ -1,26 +1,238 @@
-import importlib.util
 import os
+import logging
+import hashlib
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
 
-def load_objective_checker(topic_id, subtopic_id=None, nested_subtopic_id=None):
-    try:
-        # Build path to the Python file to import dynamically
-        if nested_subtopic_id:
-            filepath = os.path.join("backend", "learning_objectives", topic_id, subtopic_id, f"{nested_subtopic_id}.py")
-        elif subtopic_id:
-            filepath = os.path.join("backend", "learning_objectives", topic_id, f"{subtopic_id}.py")
-        else:
-            filepath = os.path.join("backend", "learning_objectives", f"{topic_id}.py")
-
-        if not os.path.exists(filepath):
-           
-            return None
+BACKEND_DIR = Path(__file__).resolve().parent
+
+logger = logging.getLogger(__name__)
+
+# Re-check file mtimes on every lookup and re-exec changed modules (dev only)
+REGISTRY_RELOAD = os.getenv("REGISTRY_RELOAD", "0").lower() in ("1", "true", "yes")
+
+
+class ModuleRegistry:
+    """
+    Import-once registry for the plug-in modules under backend/ (objective
+    checkers, chat evaluators, assignment graders).
 
-        # Load the module dynamically
-        spec = importlib.util.spec_from_file_location("objective_checker", filepath)
+    Files are discovered on first use and keyed by a tuple derived from their
+    path. Each module is executed once and kept in memory; with `reload=True`
+    a module is re-executed when its file mtime changes.
+    """
+
+    def __init__(self, name: str, base_dir: Path, key_for_path: Callable[[Path], Optional[tuple]], reload: bool = REGISTRY_RELOAD):
+        self.name = name
+        self.base_dir = base_dir
+        self.key_for_path = key_for_path
+        self.reload = reload
+        self._paths: Optional[Dict[tuple, Path]] = None
+        self._modules: Dict[tuple, Tuple[float, object]] = {}
+
+    def discover(self) -> Dict[tuple, Path]:
+        paths = {}
+        for path in sorted(self.base_dir.rglob("*.py")):
+            if path.name == "__init__.py":
+                continue
+            key = self.key_for_path(path.relative_to(self.base_dir))
+            if key is not None:
+                paths[key] = path
+        self._paths = paths
+        return paths
+
+    def keys(self):
+        if self._paths is None:
+            self.discover()
+        return list(self._paths)
+
+    def path(self, key: tuple) -> Optional[Path]:
+        """Source file registered under `key`, or None."""
+        if self._paths is None or (self.reload and key not in self._paths):
+            self.discover()
+        return self._paths.get(key)
+
+    def _load(self, key: tuple, path: Path):
+        module_name = f"backend._registry.{self.name}." + ".".join(k for k in key if k)
+        spec = importlib.util.spec_from_file_location(module_name, path)
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
+        return module
+
+    def get_module(self, key: tuple):
+        """Return the module registered under `key`, or None."""
+        if self._paths is None or (self.reload and key not in self._paths):
+            self.discover()
+        path = self._paths.get(key)
+        if path is None:
+            return None
 
-        return module.evaluate_objectives
-    except Exception as e:
-        
+        cached = self._modules.get(key)
+        if cached is not None and not self.reload:
+            return cached[1]
+
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            self._modules.pop(key, None)
+            return None
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            module = self._load(key, path)
+        except Exception as e:
+            logger.error("Failed to load %s module from %s: %s", self.name, path, e)
+            module = None
+        self._modules[key] = (mtime, module)
+        if module is not None:
+            logger.info("Loaded %s module from %s", self.name, path)
+        return module
+
+    def get(self, key: tuple, attr: str):
+        module = self.get_module(key)
+        return getattr(module, attr, None) if module is not None else None
+
+    def warm(self):
+        """Load every discovered module up front (used at startup)."""
+        for key in self.discover():
+            self.get_module(key)
+
+
+def _objective_key(rel: Path) -> Optional[tuple]:
+    # topic.py, topic/subtopic.py, topic/subtopic/nested_subtopic.py
+    parts = rel.with_suffix("").parts
+    if len(parts) > 3:
         return None
+    return tuple(parts) + (None,) * (3 - len(parts))
+
+
+def _chat_evaluator_key(rel: Path) -> Optional[tuple]:
+    # {topic}/chat_ai/{subtopic}_chat.py
+    parts = rel.parts
+    if len(parts) == 3 and parts[1] == "chat_ai" and rel.stem.endswith("_chat"):
+        return (parts[0], rel.stem[: -len("_chat")])
+    return None
+
+
+def _grader_key(rel: Path) -> Optional[tuple]:
+    # {topic}/assignments/{subtopic}.py
+    parts = rel.parts
+    if len(parts) == 3 and parts[1] == "assignments":
+        return (parts[0], rel.stem)
+    return None
+
+
+def _quiz_evaluator_key(rel: Path) -> Optional[tuple]:
+    # {topic}/quiz_ai/{subtopic}_evaluator.py
+    parts = rel.parts
+    if len(parts) == 3 and parts[1] == "quiz_ai" and rel.stem.endswith("_evaluator"):
+        return (parts[0], rel.stem[: -len("_evaluator")])
+    return None
+
+
+def _quiz_key(rel: Path) -> Optional[tuple]:
+    # {topic}/{subtopic}/{nested_subtopic}_quiz.py
+    parts = rel.parts
+    if len(parts) == 3 and rel.stem.endswith("_quiz"):
+        return (parts[0], parts[1], rel.stem[: -len("_quiz")])
+    return None
+
+
+objective_checkers = ModuleRegistry("learning_objectives", BACKEND_DIR / "learning_objectives", _objective_key)
+chat_evaluators = ModuleRegistry("chat_ai", BACKEND_DIR / "graders", _chat_evaluator_key)
+assignment_graders = ModuleRegistry("graders", BACKEND_DIR / "graders", _grader_key)
+quiz_generators = ModuleRegistry("quiz_generators", BACKEND_DIR / "quiz_generators", _quiz_key)
+quiz_evaluators = ModuleRegistry("quiz_ai", BACKEND_DIR / "graders", _quiz_evaluator_key)
+
+# nested_subtopic ids whose quiz module is named differently
+QUIZ_ALIASES = {"hex": "hexadecimal"}
+
+
+def load_objective_checker(topic_id, subtopic_id=None, nested_subtopic_id=None, attr="evaluate_objectives"):
+    """Most specific `attr` (default `evaluate_objectives`) for topic/subtopic/nested_subtopic, falling back up the tree."""
+    keys_to_try = []
+    if nested_subtopic_id and subtopic_id:
+        keys_to_try.append((topic_id, subtopic_id, nested_subtopic_id))
+    if subtopic_id:
+        keys_to_try.append((topic_id, subtopic_id, None))
+    keys_to_try.append((topic_id, None, None))
+
+    for key in keys_to_try:
+        checker = objective_checkers.get(key, attr)
+        if checker is not None:
+            return checker
+
+    if attr != "evaluate_objectives":
+        return None
+    logger.debug("Objective checker not found for %s / %s / %s", topic_id, subtopic_id, nested_subtopic_id, extra={"sampled": True})
+    return None
+
+
+def load_nested_chat_evaluator(topic_id, subtopic_id):
+    """(evaluate_chat, NESTED_OBJECTIVES) from graders/{topic}/chat_ai/{subtopic}_chat.py."""
+    module = chat_evaluators.get_module((topic_id, subtopic_id))
+    if module is None:
+        return None, {}
+    return getattr(module, "evaluate_chat", None), getattr(module, "NESTED_OBJECTIVES", {})
+
+
+def load_incremental_chat_evaluator(topic_id, subtopic_id):
+    """`evaluate_chat_incremental` from graders/{topic}/chat_ai/{subtopic}_chat.py, if it has one."""
+    return chat_evaluators.get((topic_id, subtopic_id), "evaluate_chat_incremental")
+
+
+def load_grader(topic_id, subtopic_id):
+    """`grade` function from graders/{topic}/assignments/{subtopic}.py (or `SPEC.grade` for declarative graders)."""
+    grade = assignment_graders.get((topic_id, subtopic_id), "grade")
+    if grade is None:
+        spec = assignment_graders.get((topic_id, subtopic_id), "SPEC")
+        grade = getattr(spec, "grade", None)
+    return grade
+
+
+def has_grader(topic_id, subtopic_id) -> bool:
+    """Whether graders/{topic}/assignments/{subtopic}.py exists, without importing it (graders pull in pandas)."""
+    return assignment_graders.path((topic_id, subtopic_id)) is not None
+
+
+# Declarative graders run through the engine, so its source is part of every grader's version
+GRADER_ENGINE = BACKEND_DIR / "graders" / "engine.py"
+_grader_versions: Dict[tuple, Tuple[tuple, str]] = {}
+
+
+def grader_version(topic_id, subtopic_id) -> Optional[str]:
+    """Short hash of the grader's source (plus the engine's), or None if there is no grader; changes whenever either file does."""
+    path = assignment_graders.path((topic_id, subtopic_id))
+    if path is None:
+        return None
+    try:
+        stamp = tuple(p.stat().st_mtime_ns for p in (path, GRADER_ENGINE))
+    except OSError:
+        return None
+    cached = _grader_versions.get((topic_id, subtopic_id))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    digest = hashlib.sha256()
+    for p in (path, GRADER_ENGINE):
+        digest.update(p.read_bytes())
+    version = digest.hexdigest()[:16]
+    _grader_versions[(topic_id, subtopic_id)] = (stamp, version)
+    return version
+
+
+def load_quiz(topic_id, subtopic_id, nested_subtopic_id):
+    """`QUIZ` spec from quiz_generators/{topic}/{subtopic}/{nested_subtopic}_quiz.py."""
+    nested_subtopic_id = QUIZ_ALIASES.get(nested_subtopic_id, nested_subtopic_id)
+    return quiz_generators.get((topic_id, subtopic_id, nested_subtopic_id), "QUIZ")
+
+
+def load_quiz_scorer(topic_id, subtopic_id):
+    """`score_submission` from graders/{topic}/quiz_ai/{subtopic}_evaluator.py."""
+    return quiz_evaluators.get((topic_id, subtopic_id), "score_submission")
+
+
+def warm_registries():
+    for registry in (objective_checkers, chat_evaluators, assignment_graders, quiz_generators, quiz_evaluators):
+        registry.warm()
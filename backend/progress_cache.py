@@ -0,0 +1,80 @@
+# progress_cache.py — read-through cache of merged /get-progress views
+#
+# Keyed on the normalized (student_id, topic_id, subtopic_id, nested_subtopic_id).
+# Writes in this process refresh the entry from the document they just
+# wrote; writes elsewhere (another worker, the rescoring script) are picked
+# up when the entry's TTL runs out.
+
+import os
+import json
+import hashlib
+from typing import Optional
+
+from backend.cache import TTLCache
+from backend.progress_store import progress_query, merge_flags, flags_grade
+
+PROGRESS_CACHE_SIZE = int(os.getenv("PROGRESS_CACHE_SIZE", "4096"))
+PROGRESS_CACHE_TTL = float(os.getenv("PROGRESS_CACHE_TTL", "30"))  # seconds; bounds staleness across processes
+
+progress_cache = TTLCache(max_entries=PROGRESS_CACHE_SIZE, ttl=PROGRESS_CACHE_TTL)
+counters = {"not_modified": 0, "refreshed": 0, "invalidated": 0}
+
+
+def progress_key(query: dict) -> tuple:
+    return (query["student_id"], query["topic_id"], query["subtopic_id"], query["nested_subtopic_id"])
+
+
+def merge_objective_progress(ai_flags, quiz_flags) -> list:
+    """Either source can complete an objective; same merge as the stored topic_grade uses."""
+    return merge_flags(list(ai_flags or []), list(quiz_flags or []))
+
+
+def progress_view(progress: dict) -> dict:
+    """The /get-progress body for a stored progress document."""
+    objective_progress = merge_objective_progress(
+        progress.get("ai_objective_progress", []),
+        progress.get("quiz_objective_progress", []),
+    )
+    topic_grade = progress.get("topic_grade")
+    return {
+        "objective_progress": objective_progress,
+        "quiz_score": progress.get("quiz_score", 0),
+        "assignment_score": progress.get("assignment_score", 0),
+        # Documents from before the unified grade get it computed the same way
+        "topic_grade": topic_grade if topic_grade is not None else flags_grade(objective_progress),
+    }
+
+
+def cache_view(query: dict, progress: dict) -> tuple:
+    """Store the view of `progress` under `query`; returns (view, etag)."""
+    view = progress_view(progress)
+    body = json.dumps(view, sort_keys=True, default=str).encode("utf-8")
+    entry = (view, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+    progress_cache.set(progress_key(query), entry)
+    return entry
+
+
+def cached_view(query: dict) -> Optional[tuple]:
+    return progress_cache.get(progress_key(query))
+
+
+def remember_progress(progress: Optional[dict]):
+    """Refresh the cached view from a document a write just returned."""
+    if not progress:
+        return
+    query = progress_query(progress["student_id"], progress["topic_id"], progress["subtopic_id"], progress["nested_subtopic_id"])
+    cache_view(query, progress)
+    counters["refreshed"] += 1
+
+
+def invalidate_progress(student_id: str, topic_id: Optional[str] = None, subtopic_id: Optional[str] = None):
+    """Drop every cached view of the student (optionally only under one topic/subtopic)."""
+    prefix = tuple(p.lower().strip() for p in (topic_id, subtopic_id) if p)
+    for key in progress_cache.keys():
+        if key[0] == student_id and key[1:1 + len(prefix)] == prefix:
+            progress_cache.pop(key)
+            counters["invalidated"] += 1
+
+
+def progress_cache_stats() -> dict:
+    return {**progress_cache.stats(), **counters}
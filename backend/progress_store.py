@@ -0,0 +1,135 @@
+from typing import List, Optional, Union
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.progress_summaries import update_lesson_summary
+
+Flag = Union[bool, str]
+
+
+def progress_query(student_id: str, topic_id: str, subtopic_id: str, nested_subtopic_id: str) -> dict:
+    """Normalized filter for one student's progress document on a nested subtopic."""
+    return {
+        "student_id": student_id,
+        "topic_id": topic_id.lower().strip(),
+        "subtopic_id": subtopic_id.lower().strip(),
+        "nested_subtopic_id": nested_subtopic_id.lower().strip(),
+    }
+
+
+def merge_flags_expr(existing, new) -> dict:
+    """
+    Aggregation expression that merges two flag arrays element-wise:
+    True beats "progress" beats False, padded to the longer length.
+    """
+    return {
+        "$map": {
+            "input": {"$range": [0, {"$max": [{"$size": existing}, {"$size": new}]}]},
+            "as": "i",
+            "in": {
+                "$let": {
+                    "vars": {
+                        "e": {"$ifNull": [{"$arrayElemAt": [existing, "$$i"]}, False]},
+                        "n": {"$ifNull": [{"$arrayElemAt": [new, "$$i"]}, False]},
+                    },
+                    "in": {
+                        "$switch": {
+                            "branches": [
+                                {"case": {"$or": [{"$eq": ["$$e", True]}, {"$eq": ["$$n", True]}]}, "then": True},
+                                {"case": {"$or": [{"$eq": ["$$e", "progress"]}, {"$eq": ["$$n", "progress"]}]}, "then": "progress"},
+                            ],
+                            "default": False,
+                        }
+                    },
+                }
+            },
+        }
+    }
+
+
+def merge_flags(existing: List[Flag], new: List[Flag]) -> List[Flag]:
+    """Python twin of merge_flags_expr: True beats "progress" beats False, padded to the longer length."""
+    merged = []
+    for i in range(max(len(existing), len(new))):
+        pair = (existing[i] if i < len(existing) else False, new[i] if i < len(new) else False)
+        merged.append(True if True in pair else "progress" if "progress" in pair else False)
+    return merged
+
+
+def grade_expr(flags) -> dict:
+    """int(completed / total * 100), counting only True flags; 0 for an empty array."""
+    return {
+        "$let": {
+            "vars": {"flags": flags},
+            "in": {
+                "$cond": [
+                    {"$eq": [{"$size": "$$flags"}, 0]},
+                    0,
+                    {"$toInt": {"$trunc": {"$multiply": [
+                        {"$divide": [
+                            {"$size": {"$filter": {"input": "$$flags", "cond": {"$eq": ["$$this", True]}}}},
+                            {"$size": "$$flags"},
+                        ]},
+                        100,
+                    ]}}},
+                ]
+            },
+        }
+    }
+
+
+def flags_grade(flags: List[Flag]) -> int:
+    """Python twin of grade_expr: int(completed / total * 100), counting only True flags."""
+    return int(sum(1 for f in flags if f is True) / len(flags) * 100) if flags else 0
+
+
+def build_progress_update(
+    ai_flags: Optional[List[Flag]] = None,
+    quiz_flags: Optional[List[Flag]] = None,
+    quiz_score: Optional[int] = None,
+) -> list:
+    """Update pipeline that merges new flags into the stored ones and recomputes topic_grade."""
+    stored_ai = {"$ifNull": ["$ai_objective_progress", []]}
+    stored_quiz = {"$ifNull": ["$quiz_objective_progress", []]}
+
+    merge_stage = {
+        "ai_objective_progress": merge_flags_expr(stored_ai, {"$literal": list(ai_flags or [])}),
+        "quiz_objective_progress": merge_flags_expr(stored_quiz, {"$literal": list(quiz_flags or [])}),
+        "updated_at": "$$NOW",
+    }
+    if quiz_score is not None:
+        merge_stage["quiz_score"] = quiz_score
+
+    # Either AI or quiz can complete an objective
+    grade_stage = {
+        "topic_grade": grade_expr(merge_flags_expr("$ai_objective_progress", "$quiz_objective_progress")),
+    }
+    return [{"$set": merge_stage}, {"$set": grade_stage}]
+
+
+async def upsert_progress(
+    collection,
+    query: dict,
+    ai_flags: Optional[List[Flag]] = None,
+    quiz_flags: Optional[List[Flag]] = None,
+    quiz_score: Optional[int] = None,
+    summaries=None,
+) -> dict:
+    """
+    Merge flags into the progress document in one atomic round trip and
+    return the updated document. With `summaries`, the student's summary
+    document is updated from the result (see progress_summaries).
+    """
+    pipeline = build_progress_update(ai_flags, quiz_flags, quiz_score)
+    try:
+        updated = await collection.find_one_and_update(
+            query, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Two first-time saves raced on the unique key; the document exists now
+        updated = await collection.find_one_and_update(
+            query, pipeline, return_document=ReturnDocument.AFTER
+        )
+    await update_lesson_summary(summaries, updated)
+    return updated
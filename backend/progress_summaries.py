@@ -0,0 +1,200 @@
+# progress_summaries.py — one summary document per student, kept current on every progress/grade write
+#
+# student_summaries documents (_id = student_id):
+#   lessons:      {"topic/subtopic/nested": {module, topic_id, ..., topic_grade, quiz_score, completed, updated_at}}
+#   assignments:  {"topic/subtopic": score}
+#   topics:       {"topic/subtopic": {average_grade, completed, nested, assignment_score}}
+#   overall_grade, nested_completed, nested_total, assignment_average, last_activity
+#
+# Writes replace one lesson (or assignment) and recompute the rollups in the
+# same update pipeline, so a summary is never half-updated. topic_grade is
+# the stored progress grade (only True objectives count, see progress_store).
+#
+# Rebuild every summary from raw progress (from the repo root):
+#   python -m backend.progress_summaries --rebuild
+#   python -m backend.progress_summaries --rebuild --student s123
+
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Optional
+
+from backend.database import get_db
+
+
+def lesson_key(topic_id: str, subtopic_id: str, nested_subtopic_id: str) -> str:
+    return f"{topic_id}/{subtopic_id}/{nested_subtopic_id}"
+
+
+def lesson_entry(progress: dict) -> dict:
+    topic_grade = progress.get("topic_grade", 0) or 0
+    return {
+        "module": f"{progress['topic_id']}/{progress['subtopic_id']}",
+        "topic_id": progress["topic_id"],
+        "subtopic_id": progress["subtopic_id"],
+        "nested_subtopic_id": progress["nested_subtopic_id"],
+        "topic_grade": topic_grade,
+        "quiz_score": progress.get("quiz_score"),
+        "completed": topic_grade >= 100,
+        "updated_at": progress.get("updated_at"),
+    }
+
+
+def values_of(field: str) -> dict:
+    return {"$map": {"input": {"$objectToArray": {"$ifNull": [field, {}]}}, "in": "$$this.v"}}
+
+
+def rollup_stages() -> list:
+    """Recompute topics and overall figures from lessons/assignments (update pipeline or aggregation)."""
+    assignment_pairs = {"$objectToArray": {"$ifNull": ["$assignments", {}]}}
+    return [
+        {"$set": {
+            "_lessons": values_of("$lessons"),
+            "_modules": {"$setUnion": [
+                {"$map": {"input": values_of("$lessons"), "in": "$$this.module"}},
+                {"$map": {"input": assignment_pairs, "in": "$$this.k"}},
+            ]},
+        }},
+        {"$set": {
+            "nested_total": {"$size": "$_lessons"},
+            "nested_completed": {"$size": {"$filter": {"input": "$_lessons", "cond": "$$this.completed"}}},
+            "overall_grade": {"$round": [{"$ifNull": [{"$avg": "$_lessons.topic_grade"}, 0]}, 1]},
+            "assignment_average": {"$round": [{"$avg": values_of("$assignments")}, 1]},
+            "topics": {"$arrayToObject": {"$map": {
+                "input": "$_modules",
+                "as": "m",
+                "in": {"k": "$$m", "v": {"$let": {
+                    "vars": {"ls": {"$filter": {"input": "$_lessons", "cond": {"$eq": ["$$this.module", "$$m"]}}}},
+                    "in": {
+                        "average_grade": {"$round": [{"$ifNull": [{"$avg": "$$ls.topic_grade"}, 0]}, 1]},
+                        "completed": {"$size": {"$filter": {"input": "$$ls", "cond": "$$this.completed"}}},
+                        "nested": {"$size": "$$ls"},
+                        "assignment_score": {"$first": {"$map": {
+                            "input": {"$filter": {"input": assignment_pairs, "cond": {"$eq": ["$$this.k", "$$m"]}}},
+                            "in": "$$this.v",
+                        }}},
+                    },
+                }}},
+            }}},
+        }},
+        {"$unset": ["_lessons", "_modules"]},
+    ]
+
+
+def set_field_stage(field: str, key: str, value, activity: datetime) -> dict:
+    return {"$set": {
+        field: {"$setField": {"field": key, "input": {"$ifNull": [f"${field}", {}]}, "value": {"$literal": value}}},
+        "last_activity": {"$max": ["$last_activity", activity]},
+    }}
+
+
+async def update_lesson_summary(summaries, progress: Optional[dict]):
+    """Fold one updated progress document into its student's summary (one round trip)."""
+    if summaries is None or not progress:
+        return
+    entry = lesson_entry(progress)
+    key = lesson_key(entry["topic_id"], entry["subtopic_id"], entry["nested_subtopic_id"])
+    pipeline = [set_field_stage("lessons", key, entry, entry["updated_at"] or datetime.utcnow()), *rollup_stages()]
+    await summaries.update_one({"_id": progress["student_id"]}, pipeline, upsert=True)
+
+
+async def update_assignment_summary(summaries, student_id: str, topic_id: str, subtopic_id: str, score):
+    if summaries is None:
+        return
+    pipeline = [set_field_stage("assignments", f"{topic_id}/{subtopic_id}", score, datetime.utcnow()), *rollup_stages()]
+    await summaries.update_one({"_id": student_id}, pipeline, upsert=True)
+
+
+def summary_response(student_id: str, summary: Optional[dict]) -> dict:
+    """Summary for the dashboard; lessons use the /progress-all field names."""
+    summary = summary or {}
+    lessons = sorted(summary.get("lessons", {}).items())
+    return {
+        "student_id": student_id,
+        "overall_grade": summary.get("overall_grade", 0),
+        "nested_completed": summary.get("nested_completed", 0),
+        "nested_total": summary.get("nested_total", 0),
+        "assignment_average": summary.get("assignment_average"),
+        "last_activity": summary.get("last_activity"),
+        "topics": summary.get("topics", {}),
+        "lessons": [
+            {
+                "topic": lesson["topic_id"],
+                "subtopic": lesson["subtopic_id"],
+                "nested_subtopic": lesson["nested_subtopic_id"],
+                "quiz_score": lesson.get("quiz_score"),
+                "topic_grade": lesson.get("topic_grade", 0),
+                "completed": lesson.get("completed", False),
+                "updated_at": lesson.get("updated_at"),
+            }
+            for _, lesson in lessons
+        ],
+    }
+
+
+# ───── Bulk Rebuild ─────
+def build_rebuild_pipeline(student_id: Optional[str] = None) -> list:
+    """Aggregation over progress (+ assignment_grades) that recomputes and $merges every summary."""
+    match = [{"$match": {"student_id": student_id}}] if student_id else []
+    grade = {"$ifNull": ["$topic_grade", 0]}
+    module = {"$concat": ["$topic_id", "/", "$subtopic_id"]}
+    return [
+        *match,
+        {"$project": {
+            "student_id": 1,
+            "kind": {"$literal": "lesson"},
+            "k": {"$concat": ["$topic_id", "/", "$subtopic_id", "/", "$nested_subtopic_id"]},
+            "v": {
+                "module": module,
+                "topic_id": "$topic_id",
+                "subtopic_id": "$subtopic_id",
+                "nested_subtopic_id": "$nested_subtopic_id",
+                "topic_grade": grade,
+                "quiz_score": "$quiz_score",
+                "completed": {"$gte": [grade, 100]},
+                "updated_at": "$updated_at",
+            },
+            "at": "$updated_at",
+        }},
+        {"$unionWith": {"coll": "assignment_grades", "pipeline": [
+            *match,
+            {"$project": {"student_id": 1, "kind": {"$literal": "assignment"}, "k": module, "v": "$score", "at": "$timestamp"}},
+        ]}},
+        {"$group": {"_id": "$student_id", "items": {"$push": {"kind": "$kind", "k": "$k", "v": "$v"}}, "last_activity": {"$max": "$at"}}},
+        {"$set": {
+            "lessons": {"$arrayToObject": {"$map": {
+                "input": {"$filter": {"input": "$items", "cond": {"$eq": ["$$this.kind", "lesson"]}}},
+                "in": {"k": "$$this.k", "v": "$$this.v"},
+            }}},
+            "assignments": {"$arrayToObject": {"$map": {
+                "input": {"$filter": {"input": "$items", "cond": {"$eq": ["$$this.kind", "assignment"]}}},
+                "in": {"k": "$$this.k", "v": "$$this.v"},
+            }}},
+        }},
+        {"$unset": "items"},
+        *rollup_stages(),
+        {"$merge": {"into": "student_summaries", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+
+async def rebuild_summaries(database=None, student_id: Optional[str] = None) -> dict:
+    database = database if database is not None else get_db()
+    started = time.perf_counter()
+    await database["progress"].aggregate(build_rebuild_pipeline(student_id)).to_list(length=None)
+    query = {"_id": student_id} if student_id else {}
+    return {
+        "summaries": await database["student_summaries"].count_documents(query),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student progress summaries")
+    parser.add_argument("--rebuild", action="store_true", help="recompute summaries from raw progress")
+    parser.add_argument("--student", default=None, help="only this student")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do (use --rebuild)")
+    stats = asyncio.run(rebuild_summaries(student_id=args.student))
+    print(f"✅ Rebuilt student summaries: {stats}")
@@ -1,20 +1,18 @@
-import random
+from backend.quiz_generators.engine import QuestionBank, QuizSpec
+from backend.quiz_generators.digital_electronics.number_systems.conversions import to_bcd
 
-def generate_quiz():
-    def to_bcd(n):
-        return ' '.join(f"{int(d):04b}" for d in str(n))
-    
-    questions = []
-    used = set()
-    while len(questions) < 5:
-        dec = random.randint(0, 99)
-        if dec in used:
-            continue
-        used.add(dec)
-        bcd = to_bcd(dec)
-        questions.append({
-            "type": "dec_to_bcd",
-            "question": f"What is the BCD representation of {dec}?",
-            "correct_answer": bcd
-        })
-    return questions
\ No newline at end of file
+DEC_TO_BCD = QuestionBank("dec_to_bcd", range(0, 100), lambda dec: {
+    "type": "dec_to_bcd",
+    "question": f"What is the BCD representation of {dec}?",
+    "correct_answer": to_bcd(dec)
+})
+
+QUIZ = QuizSpec("number_systems/bcd", [(DEC_TO_BCD, 5)], shuffle=False)
+
+
+def generate_quiz(count=None, seed=None, student_id=None):
+    return QUIZ.generate(seed=seed, student_id=student_id, count=count)
+
+
+def generate_quizzes(n, seed=None, student_id=None, count=None):
+    return QUIZ.generate_many(n, seed=seed, student_id=student_id, count=count)
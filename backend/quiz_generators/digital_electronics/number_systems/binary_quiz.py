@@ -1,49 +1,54 @@
 import random
 
-def generate_decimal_to_binary_question():
-    decimal = random.randint(0, 255)
-    correct_answer = format(decimal, '08b')
-    return {
-        "type": "dec_to_bin",
-        "question": f"What is the 8-bit binary representation of the decimal number {decimal}?",
-        "answer": correct_answer,
-        "decimal": decimal
-    }
+from backend.quiz_generators.engine import QuestionBank, QuizSpec
+from backend.quiz_generators.digital_electronics.number_systems.conversions import to_binary
+
+DEC_TO_BIN = QuestionBank("dec_to_bin", range(0, 256), lambda decimal: {
+    "type": "dec_to_bin",
+    "question": f"What is the 8-bit binary representation of the decimal number {decimal}?",
+    "answer": to_binary(decimal, 8),
+    "decimal": decimal
+})
+
+BIN_TO_DEC = QuestionBank("bin_to_dec", range(0, 256), lambda decimal: {
+    "type": "bin_to_dec",
+    "question": f"What is the decimal value of the binary number {to_binary(decimal, 8)}?",
+    "answer": str(decimal),
+    "binary": to_binary(decimal, 8)
+})
 
-def generate_binary_to_decimal_question():
-    decimal = random.randint(0, 255)
-    binary = format(decimal, '08b')
-    return {
-        "type": "bin_to_dec",
-        "question": f"What is the decimal value of the binary number {binary}?",
-        "answer": str(decimal),
-        "binary": binary
+DEFINITIONS = QuestionBank.from_items("definition", [
+    {
+        "type": "definition",
+        "question": "What is a bit?",
+        "answer": "The smallest unit of data in computing, either 0 or 1."
+    },
+    {
+        "type": "definition",
+        "question": "How many bits are in a nibble?",
+        "answer": "4"
+    },
+    {
+        "type": "definition",
+        "question": "How many bits are in a byte?",
+        "answer": "8"
     }
+])
+
+QUIZ = QuizSpec("number_systems/binary", [(DEC_TO_BIN, 5), (BIN_TO_DEC, 5), (DEFINITIONS, 3)])
+
+
+def generate_decimal_to_binary_question(rng=random):
+    return DEC_TO_BIN.sample(rng, 1)[0]
+
+def generate_binary_to_decimal_question(rng=random):
+    return BIN_TO_DEC.sample(rng, 1)[0]
+
+def generate_definition_question(rng=random):
+    return DEFINITIONS.sample(rng, 3)  # Return all 3 in randomized order
+
+def generate_binary_quiz(count=None, seed=None, student_id=None):
+    return QUIZ.generate(seed=seed, student_id=student_id, count=count)
 
-def generate_definition_question():
-    questions = [
-        {
-            "type": "definition",
-            "question": "What is a bit?",
-            "answer": "The smallest unit of data in computing, either 0 or 1."
-        },
-        {
-            "type": "definition",
-            "question": "How many bits are in a nibble?",
-            "answer": "4"
-        },
-        {
-            "type": "definition",
-            "question": "How many bits are in a byte?",
-            "answer": "8"
-        }
-    ]
-    return random.sample(questions, 3)  # Return all 3 in randomized order
-
-def generate_binary_quiz():
-    quiz = []
-    quiz += [generate_decimal_to_binary_question() for _ in range(5)]
-    quiz += [generate_binary_to_decimal_question() for _ in range(5)]
-    quiz += generate_definition_question()
-    random.shuffle(quiz)
-    return quiz
+def generate_quizzes(n, seed=None, student_id=None, count=None):
+    return QUIZ.generate_many(n, seed=seed, student_id=student_id, count=count)
@@ -0,0 +1,35 @@
+# conversions.py — number system conversions shared by the quiz generators and graders
+
+
+def to_binary(n: int, width: int = 0) -> str:
+    return format(n, f"0{width}b") if width else format(n, "b")
+
+
+def to_octal(n: int) -> str:
+    return format(n, "o")
+
+
+def to_hex(n: int) -> str:
+    return format(n, "X")
+
+
+def to_bcd(n: int) -> str:
+    """Each decimal digit as a 4-bit group: 25 -> "0010 0101"."""
+    return " ".join(f"{int(d):04b}" for d in str(n))
+
+
+def to_gray(n: int) -> int:
+    return n ^ (n >> 1)
+
+
+def gray_to_binary(g: int) -> int:
+    n = 0
+    while g:
+        n ^= g
+        g >>= 1
+    return n
+
+
+def to_gray_code(n: int, width: int = 0) -> str:
+    """Gray code of `n` as a bit string: 5 -> "111" (or "0111" with width=4)."""
+    return to_binary(to_gray(n), width)
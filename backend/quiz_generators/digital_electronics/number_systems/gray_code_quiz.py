@@ -1,20 +1,18 @@
-import random
+from backend.quiz_generators.engine import QuestionBank, QuizSpec
+from backend.quiz_generators.digital_electronics.number_systems.conversions import to_gray_code
 
-def generate_quiz():
-    def to_gray(n):
-        return n ^ (n >> 1)
+DEC_TO_GRAY = QuestionBank("dec_to_gray", range(0, 16), lambda n: {
+    "type": "dec_to_gray",
+    "question": f"What is the 4-bit Gray code for decimal {n}?",
+    "correct_answer": to_gray_code(n, 4)
+})
 
-    questions = []
-    used = set()
-    while len(questions) < 5:
-        n = random.randint(0, 15)
-        if n in used:
-            continue
-        used.add(n)
-        gray = format(to_gray(n), '04b')
-        questions.append({
-            "type": "dec_to_gray",
-            "question": f"What is the 4-bit Gray code for decimal {n}?",
-            "correct_answer": gray
-        })
-    return questions
\ No newline at end of file
+QUIZ = QuizSpec("number_systems/gray_code", [(DEC_TO_GRAY, 5)], shuffle=False)
+
+
+def generate_quiz(count=None, seed=None, student_id=None):
+    return QUIZ.generate(seed=seed, student_id=student_id, count=count)
+
+
+def generate_quizzes(n, seed=None, student_id=None, count=None):
+    return QUIZ.generate_many(n, seed=seed, student_id=student_id, count=count)
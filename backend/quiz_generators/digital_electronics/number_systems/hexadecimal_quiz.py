@@ -1,17 +1,18 @@
-import random
+from backend.quiz_generators.engine import QuestionBank, QuizSpec
+from backend.quiz_generators.digital_electronics.number_systems.conversions import to_hex
 
-def generate_quiz():
-    questions = []
-    used = set()
-    while len(questions) < 5:
-        dec = random.randint(16, 255)
-        if dec in used:
-            continue
-        used.add(dec)
-        hex_val = hex(dec)[2:].upper()
-        questions.append({
-            "type": "dec_to_hex",
-            "question": f"What is the hexadecimal representation of decimal {dec}?",
-            "correct_answer": hex_val
-        })
-    return questions
\ No newline at end of file
+DEC_TO_HEX = QuestionBank("dec_to_hex", range(16, 256), lambda dec: {
+    "type": "dec_to_hex",
+    "question": f"What is the hexadecimal representation of decimal {dec}?",
+    "correct_answer": to_hex(dec)
+})
+
+QUIZ = QuizSpec("number_systems/hex", [(DEC_TO_HEX, 5)], shuffle=False)
+
+
+def generate_quiz(count=None, seed=None, student_id=None):
+    return QUIZ.generate(seed=seed, student_id=student_id, count=count)
+
+
+def generate_quizzes(n, seed=None, student_id=None, count=None):
+    return QUIZ.generate_many(n, seed=seed, student_id=student_id, count=count)
@@ -1,17 +1,18 @@
-import random
+from backend.quiz_generators.engine import QuestionBank, QuizSpec
+from backend.quiz_generators.digital_electronics.number_systems.conversions import to_octal
 
-def generate_quiz():
-    questions = []
-    used = set()
-    while len(questions) < 5:
-        dec = random.randint(8, 63)
-        if dec in used:
-            continue
-        used.add(dec)
-        oct_val = oct(dec)[2:]
-        questions.append({
-            "type": "dec_to_oct",
-            "question": f"What is the octal representation of decimal {dec}?",
-            "correct_answer": oct_val
-        })
-    return questions
\ No newline at end of file
+DEC_TO_OCT = QuestionBank("dec_to_oct", range(8, 64), lambda dec: {
+    "type": "dec_to_oct",
+    "question": f"What is the octal representation of decimal {dec}?",
+    "correct_answer": to_octal(dec)
+})
+
+QUIZ = QuizSpec("number_systems/octal", [(DEC_TO_OCT, 5)], shuffle=False)
+
+
+def generate_quiz(count=None, seed=None, student_id=None):
+    return QUIZ.generate(seed=seed, student_id=student_id, count=count)
+
+
+def generate_quizzes(n, seed=None, student_id=None, count=None):
+    return QUIZ.generate_many(n, seed=seed, student_id=student_id, count=count)
@@ -0,0 +1,91 @@
+# engine.py — quiz generation from precomputed question banks
+#
+# Every question a generator can ask is enumerated once into a QuestionBank
+# (the value spaces are small: 0-255, 0-99, 0-15). A quiz draws k unique
+# questions per bank with random.sample, so there are no rejection loops,
+# and any quiz can be reproduced from its seed.
+
+import random
+import hashlib
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Unseeded quizzes share one generator; building a Random per quiz costs more than the quiz
+_shared_rng = random.Random()
+
+
+def quiz_rng(seed=None, student_id: Optional[str] = None, quiz_key: Optional[str] = None) -> random.Random:
+    """
+    Random source for one quiz. With a seed and/or student id the quiz is
+    reproducible (same student + quiz + seed -> same questions); with
+    neither it is freshly random.
+    """
+    if seed is None and student_id is None:
+        return _shared_rng
+    material = f"{quiz_key or ''}|{student_id or ''}|{'' if seed is None else seed}"
+    return random.Random(int.from_bytes(hashlib.sha256(material.encode("utf-8")).digest()[:8], "big"))
+
+
+class QuestionBank:
+    """All distinct questions of one type, rendered once."""
+
+    def __init__(self, qtype: str, values: Iterable, render: Callable[[object], dict]):
+        self.qtype = qtype
+        self.items: Tuple[dict, ...] = tuple(render(v) for v in dict.fromkeys(values))
+
+    @classmethod
+    def from_items(cls, qtype: str, items: Sequence[dict]) -> "QuestionBank":
+        """Bank of hand-written questions (definitions and the like)."""
+        return cls(qtype, range(len(items)), lambda i: items[i])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng: random.Random, k: int) -> List[dict]:
+        """k unique questions (copies, so callers may annotate them)."""
+        return [item.copy() for item in rng.sample(self.items, min(k, len(self.items)))]
+
+
+class QuizSpec:
+    """
+    A quiz: `count` questions from each bank, in bank order or shuffled.
+    `generate()` builds one quiz; `generate_many()` builds a batch of
+    quizzes from one random stream for bulk exam generation.
+    """
+
+    def __init__(self, key: str, sections: Sequence[Tuple[QuestionBank, int]], shuffle: bool = True):
+        self.key = key
+        self.sections = list(sections)
+        self.shuffle = shuffle
+        self._default_counts = [min(count, len(bank)) for bank, count in self.sections]
+
+    @property
+    def size(self) -> int:
+        return sum(self.section_counts())
+
+    def section_counts(self, count: Optional[int] = None) -> List[int]:
+        """Questions per section; `count` rescales the defaults to that total (largest remainder)."""
+        if count is None:
+            return self._default_counts
+        defaults = [count_ for _, count_ in self.sections]
+        if sum(defaults):
+            shares = [count * c / sum(defaults) for c in defaults]
+            counts = [int(share) for share in shares]
+            by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - counts[i], reverse=True)
+            for i in by_remainder[: count - sum(counts)]:
+                counts[i] += 1
+            defaults = counts
+        return [min(c, len(bank)) for (bank, _), c in zip(self.sections, defaults)]
+
+    def generate(self, rng: Optional[random.Random] = None, seed=None, student_id: Optional[str] = None, count: Optional[int] = None) -> List[dict]:
+        rng = rng or quiz_rng(seed, student_id, self.key)
+        questions = []
+        for (bank, _), k in zip(self.sections, self.section_counts(count)):
+            questions += bank.sample(rng, k)
+        if self.shuffle:
+            rng.shuffle(questions)
+        return questions
+
+    def generate_many(self, n: int, seed=None, student_id: Optional[str] = None, count: Optional[int] = None) -> List[List[dict]]:
+        """n quizzes for bulk exam generation; the same seed always yields the same batch."""
+        rng = quiz_rng(seed, student_id, self.key)
+        return [self.generate(rng, count=count) for _ in range(n)]
@@ -0,0 +1,132 @@
+# quiz_submissions.py — store scored quiz submissions and re-score them when an answer key changes
+#
+# Usage (from the repo root):
+#   python -m backend.quiz_submissions --nested binary           # re-score stale binary submissions
+#   python -m backend.quiz_submissions --all --dry-run           # re-score everything without writing
+
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from backend.database import progress_collection, quiz_submissions_collection, student_summaries_collection
+from backend.objective_loader import load_quiz_scorer
+from backend.progress_store import progress_query, upsert_progress
+
+RESCORE_BATCH_SIZE = 500
+
+
+async def save_submission(collection, submission: dict, result: dict) -> dict:
+    doc = {
+        **submission,
+        "score": result["score"],
+        "correct": result["correct"],
+        "total": result["total"],
+        "results": result["results"],
+        "quiz_objective_progress": result["quiz_objective_progress"],
+        "key_version": result["key_version"],
+        "submitted_at": datetime.utcnow(),
+    }
+    await collection.insert_one(doc)
+    return doc
+
+
+async def rescore_submissions(
+    submissions=quiz_submissions_collection,
+    progress=progress_collection,
+    summaries=student_summaries_collection,
+    topic_id: Optional[str] = None,
+    subtopic_id: Optional[str] = None,
+    nested_subtopic_id: Optional[str] = None,
+    all_versions: bool = False,
+    batch_size: int = RESCORE_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Re-score stored submissions against the current answer keys.
+
+    Submissions are streamed oldest first and updated with unordered
+    bulk writes of `batch_size`. Afterwards each affected student's
+    progress gets the quiz score and flags of their latest submission
+    (flags still only move forward, see progress_store).
+    """
+    query = {k: v for k, v in (("topic_id", topic_id), ("subtopic_id", subtopic_id), ("nested_subtopic_id", nested_subtopic_id)) if v}
+    projection = {"student_id": 1, "topic_id": 1, "subtopic_id": 1, "nested_subtopic_id": 1, "answers": 1, "score": 1, "key_version": 1}
+    scorers = {}
+    pending = []
+    latest = {}
+    stats = {"scanned": 0, "updated": 0, "score_changed": 0, "unscorable": 0, "progress_updated": 0}
+    started = time.perf_counter()
+
+    async def flush():
+        if pending and not dry_run:
+            await submissions.bulk_write(pending, ordered=False)
+        pending.clear()
+
+    async for doc in submissions.find(query, projection).sort("submitted_at", 1).batch_size(batch_size):
+        stats["scanned"] += 1
+        scorer_key = (doc["topic_id"], doc["subtopic_id"])
+        if scorer_key not in scorers:
+            scorers[scorer_key] = load_quiz_scorer(*scorer_key)
+        score_submission = scorers[scorer_key]
+        if score_submission is None:
+            stats["unscorable"] += 1
+            continue
+
+        result = score_submission(doc["nested_subtopic_id"], doc.get("answers", []))
+        if not all_versions and doc.get("key_version") == result["key_version"]:
+            continue
+
+        stats["updated"] += 1
+        stats["score_changed"] += result["score"] != doc.get("score")
+        pending.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "score": result["score"],
+            "correct": result["correct"],
+            "total": result["total"],
+            "results": result["results"],
+            "quiz_objective_progress": result["quiz_objective_progress"],
+            "key_version": result["key_version"],
+            "rescored_at": datetime.utcnow(),
+        }}))
+        # Sorted by submitted_at, so the last one seen per student/quiz is the latest
+        latest[(doc["student_id"], doc["topic_id"], doc["subtopic_id"], doc["nested_subtopic_id"])] = result
+        if len(pending) >= batch_size:
+            await flush()
+    await flush()
+
+    if not dry_run:
+        for (student_id, topic, subtopic, nested), result in latest.items():
+            await upsert_progress(
+                progress,
+                progress_query(student_id, topic, subtopic, nested),
+                quiz_flags=result["quiz_objective_progress"],
+                quiz_score=result["score"],
+                summaries=summaries,
+            )
+            stats["progress_updated"] += 1
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored quiz submissions against the current answer keys")
+    parser.add_argument("--topic", default=None)
+    parser.add_argument("--subtopic", default=None)
+    parser.add_argument("--nested", default=None)
+    parser.add_argument("--all", action="store_true", help="re-score every submission, not just ones with an old key_version")
+    parser.add_argument("--batch-size", type=int, default=RESCORE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    stats = asyncio.run(rescore_submissions(
+        topic_id=args.topic,
+        subtopic_id=args.subtopic,
+        nested_subtopic_id=args.nested,
+        all_versions=args.all,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+    ))
+    print(f"✅ Rescore complete: {stats}")
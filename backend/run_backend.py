@@ -1,3 +1,4 @@
+# Development server (single process, auto-reload). For production: python -m backend.serve
 import sys
 import os
 
@@ -0,0 +1,85 @@
+# serve.py — production launcher: N uvicorn worker processes, no reloader
+#
+# Each worker imports backend.main on its own and runs the app lifespan,
+# so prompts, plug-in registries, the LLM gateway, the grading pool and the
+# in-process caches are per worker. State that must agree across workers
+# lives in Mongo (progress, grades, grading jobs, chat summaries, and the
+# grade/LLM caches with their mongo backends). The rest is either rebuilt on
+# a miss (incremental evaluation state) or bounded by a short TTL (the
+# /get-progress cache; see below).
+#
+# Defaults set here only when the variable isn't already configured:
+#   GRADING_WORKERS      cores / WEB_WORKERS (at least 1) so grading pools don't oversubscribe the host
+#   PROGRESS_CACHE_TTL   2 s with more than one worker: a save on one worker is seen by the others within that
+#
+# /metrics and the /metrics/* endpoints describe the worker that answered.
+#
+# Settings (environment, or the matching flags):
+#   WEB_WORKERS=<cores>  worker processes
+#   WEB_HOST=0.0.0.0
+#   WEB_PORT=8000
+#   WEB_BACKLOG=2048
+#   WEB_KEEPALIVE=5      seconds an idle keep-alive connection is held
+#   WEB_ACCESS_LOG=0     uvicorn access log (requests are already in /metrics and the slow-request log)
+#
+# Usage (from the repo root):
+#   python -m backend.serve --workers 4
+#   (development with auto-reload: python run_backend.py)
+
+import os
+import argparse
+from pathlib import Path
+
+import uvicorn
+from dotenv import load_dotenv
+
+# Launcher settings may live in backend/.env too
+load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
+
+CORES = os.cpu_count() or 1
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(CORES)))
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+WEB_BACKLOG = int(os.getenv("WEB_BACKLOG", "2048"))
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+WEB_ACCESS_LOG = os.getenv("WEB_ACCESS_LOG", "0").lower() in ("1", "true", "yes")
+
+
+def worker_defaults(workers: int) -> dict:
+    """Per-worker settings that depend on how many workers share the host."""
+    defaults = {"GRADING_WORKERS": str(max(1, CORES // workers))}
+    if workers > 1:
+        defaults["PROGRESS_CACHE_TTL"] = "2"
+    return defaults
+
+
+def main(args):
+    workers = max(1, args.workers)
+    # Workers are spawned, so they inherit this environment
+    for name, value in worker_defaults(workers).items():
+        os.environ.setdefault(name, value)
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        reload=False,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keepalive,
+        access_log=args.access_log,
+        proxy_headers=True,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    parser.add_argument("--backlog", type=int, default=WEB_BACKLOG)
+    parser.add_argument("--keepalive", type=int, default=WEB_KEEPALIVE)
+    parser.add_argument("--access-log", action="store_true", default=WEB_ACCESS_LOG)
+    parser.add_argument("--log-level", default="info")
+    main(parser.parse_args())
@@ -1,4 +1,9 @@
-from fastapi import APIRouter, HTTPException
+import re
+import io
+import csv
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
@@ -6,6 +11,12 @@ from backend.database import students_collection
 
 router = APIRouter()
 
+STUDENT_FIELDS = ("user_id", "first_name", "last_name", "email", "allowed", "created_at")
+STUDENTS_PAGE_SIZE = 100
+STUDENTS_MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 500  # documents per cursor batch while exporting
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 # Pydantic model
 class Student(BaseModel):
     user_id: str
@@ -14,17 +25,101 @@ class Student(BaseModel):
     email: Optional[str] = ""
     allowed: bool = True
 
-@router.get("/students", response_model=List[Student])
-async def list_students():
-    cursor = students_collection.find({})
-    valid_students = []
+# ───── Listing: keyset pages on user_id, projections, filters, streaming export ─────
+def student_filter(allowed: Optional[bool] = None, name_prefix: Optional[str] = None, after: Optional[str] = None) -> dict:
+    query = {"user_id": {"$gt": after}} if after else {"user_id": {"$exists": True}}
+    if allowed is not None:
+        query["allowed"] = allowed
+    if name_prefix:
+        prefix = {"$regex": "^" + re.escape(name_prefix), "$options": "i"}
+        query["$or"] = [{"first_name": prefix}, {"last_name": prefix}]
+    return query
+
+
+def student_projection(fields: Optional[str]) -> dict:
+    """Mongo projection for a comma-separated field list; user_id is always included (it is the cursor)."""
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(STUDENT_FIELDS)
+    unknown = sorted(set(requested) - set(STUDENT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown student fields: {', '.join(unknown)}")
+    return {"_id": 0, "user_id": 1, **{f: 1 for f in requested}}
+
+
+async def student_page(query: dict, projection: dict, limit: int, collection=students_collection):
+    """One page of students plus the cursor for the next page (None on the last page)."""
+    docs = await collection.find(query, projection).sort("user_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = docs[limit - 1]["user_id"] if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+async def export_lines(query: dict, projection: dict, export_format: str, collection=students_collection):
+    """Yield the roster as NDJSON or CSV lines while the cursor streams it."""
+    cursor = collection.find(query, projection).sort("user_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    if export_format == "ndjson":
+        async for doc in cursor:
+            yield json.dumps(doc, default=str) + "\n"
+        return
+
+    columns = [f for f in projection if f != "_id"]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
     async for doc in cursor:
-        if "user_id" in doc:
-            try:
-                valid_students.append(Student(**doc))
-            except Exception as e:
-                print(f"⚠️ Skipping malformed student document: {doc} — Error: {e}")
-    return valid_students
+        writer.writerow(doc)
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def list_students_response(
+    after: Optional[str],
+    limit: int,
+    fields: Optional[str],
+    allowed: Optional[bool],
+    name_prefix: Optional[str],
+):
+    """
+    A page of students as a JSON list. The cursor for the next page is
+    returned in the X-Next-Cursor header so the body stays a plain list.
+    """
+    docs, next_cursor = await student_page(student_filter(allowed, name_prefix, after), student_projection(fields), limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return Response(content=json.dumps(docs, default=str), media_type="application/json", headers=headers)
+
+
+def export_students_response(export_format: str, fields: Optional[str], allowed: Optional[bool], name_prefix: Optional[str]):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    lines = export_lines(student_filter(allowed, name_prefix), student_projection(fields), export_format)
+    return StreamingResponse(
+        lines,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="students.{export_format}"'},
+    )
+
+
+@router.get("/students")
+async def list_students(
+    after: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(STUDENTS_PAGE_SIZE, ge=1, le=STUDENTS_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="comma-separated, e.g. user_id,first_name,last_name"),
+    allowed: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, max_length=64),
+):
+    return await list_students_response(after, limit, fields, allowed, name_prefix)
+
+
+# Declared before /students/{user_id} so "export" isn't taken for a user id
+@router.get("/students/export")
+async def export_students(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    allowed: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, max_length=64),
+):
+    return export_students_response(format, fields, allowed, name_prefix)
 
 @router.get("/students/{user_id}", response_model=Student)
 async def get_student(user_id: str):
@@ -0,0 +1,147 @@
+# uploads.py — bounded, hashed assignment uploads
+#
+# Starlette's multipart parser already writes each uploaded file to a
+# SpooledTemporaryFile (in memory up to a threshold, then on disk), but it
+# accepts a body of any size. UploadLimitMiddleware stops /grade bodies at
+# MAX_UPLOAD_BYTES while they stream in, routes built with UploadRoute spool
+# at UPLOAD_SPOOL_BYTES (other routes keep Starlette's default), and
+# spool_upload() hashes the spooled file in chunks so a grade-cache lookup
+# never needs the whole workbook in memory.
+#
+# Settings (environment):
+#   MAX_UPLOAD_BYTES=10485760     largest accepted workbook (see grading_pool)
+#   UPLOAD_SPOOL_BYTES=1048576    per-file in-memory spool before it moves to disk
+#
+# Usage:
+#   app.add_middleware(UploadLimitMiddleware)
+#   upload_router = APIRouter(route_class=UploadRoute)
+#   upload = await spool_upload(file)     # upload.sha256, upload.size
+#   contents = await upload.read()        # only when the workbook must be graded
+
+import os
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from multipart.multipart import parse_options_header
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.responses import JSONResponse
+
+from backend.grading_pool import MAX_UPLOAD_BYTES
+
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 256 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries, part headers and other form fields
+
+UPLOAD_PATHS = ("/grade/", "/grade-jobs/")
+
+
+def too_large(max_bytes: int = MAX_UPLOAD_BYTES) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File is larger than the {max_bytes / (1024 * 1024):g} MB upload limit")
+
+
+class Upload:
+    """A spooled upload with its size and SHA-256; the bytes stay in the spool until read()."""
+
+    def __init__(self, file: UploadFile, size: int, sha256: str):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+    async def read(self) -> bytes:
+        await self.file.seek(0)
+        return await self.file.read()
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> Upload:
+    """Hash the uploaded file chunk by chunk, rejecting anything over `max_bytes` with a 413."""
+    if file.size is not None and file.size > max_bytes:
+        raise too_large(max_bytes)
+    digest, size = hashlib.sha256(), 0
+    await file.seek(0)
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large(max_bytes)
+        digest.update(chunk)
+    await file.seek(0)
+    return Upload(file, size, digest.hexdigest())
+
+
+class SpoolingMultiPartParser(MultiPartParser):
+    max_file_size = UPLOAD_SPOOL_BYTES  # read per part in on_part_begin
+
+
+class UploadRequest(Request):
+    """Request whose multipart files spool UPLOAD_SPOOL_BYTES in memory before moving to disk."""
+
+    async def _get_form(self, *, max_files=1000, max_fields=1000):
+        if self._form is None:
+            content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+            if content_type == b"multipart/form-data":
+                parser = SpoolingMultiPartParser(self.headers, self.stream(), max_files=max_files, max_fields=max_fields)
+                try:
+                    self._form = await parser.parse()
+                except MultiPartException as exc:
+                    raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields)
+
+
+class UploadRoute(APIRoute):
+    """Route class for upload endpoints: their form parsing uses UploadRequest."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request):
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_handler
+
+
+class UploadLimitMiddleware:
+    """
+    Caps request bodies on the upload routes. A declared Content-Length
+    over the limit is refused before anything is read; otherwise the body
+    is counted as it streams and parsing stops with a 413 once it passes
+    the limit, so an oversized upload never reaches the temporary file.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES, paths=UPLOAD_PATHS):
+        self.app = app
+        self.max_body = max_bytes + MULTIPART_OVERHEAD
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.paths):
+            return await self.app(scope, receive, send)
+
+        declared = self._content_length(scope)
+        if declared is not None and declared > self.max_body:
+            response = JSONResponse({"detail": too_large(self.max_bytes).detail}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    raise too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _content_length(scope) -> Optional[int]:
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
@@ -47,6 +47,51 @@ const inferIntent = (message) => {
   return "default";
 };
 
+// POST /chat/stream and read its NDJSON events; returns the final "done"/"error" event
+const streamChat = async (payload, onToken) => {
+  const response = await fetch(
+    `${import.meta.env.VITE_BACKEND_URL}/chat/stream`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload),
+    }
+  );
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let final = null;
+
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line);
+    if (event.type === "token") onToken(event.content);
+    else final = event;
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer + decoder.decode());
+  return final;
+};
+
+// After a turn queued for background evaluation, re-read progress after each
+// of these delays until its ETag changes (evaluation can take several seconds,
+// and with several API workers a read may be briefly stale)
+const PROGRESS_POLL_DELAYS_MS = [750, 1500, 2500, 4000, 6000, 8000];
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const LearningCopilot = forwardRef(
   (
     {
@@ -70,11 +115,14 @@ const LearningCopilot = forwardRef(
     const [quizOpen, setQuizOpen] = useState(false);
     const chatContainerRef = useRef(null);
     const lastSaveRef = useRef({});
+    const progressEtagRef = useRef(null);
+    const progressPollRef = useRef(0);
     const [firstPromptSent, setFirstPromptSent] = useState(false);
     const [completionMessageSent, setCompletionMessageSent] = useState(false);
     const [progressLoaded, setProgressLoaded] = useState(false);
     const [mergedProgress, setMergedProgress] = useState([]);
     const [progressCounts, setProgressCounts] = useState({});
+    const [streaming, setStreaming] = useState(false);
 
     const updateProgressWithCounts = (evidenceMap) => {
       const updatedCounts = { ...progressCounts };
@@ -178,6 +226,7 @@ const LearningCopilot = forwardRef(
             }
           );
           const { objective_progress = [], quiz_score = 0 } = res.data || {};
+          progressEtagRef.current = res.headers?.etag ?? null;
 
           if (Array.isArray(objective_progress)) {
             onProgressUpdate?.([...objective_progress]);
@@ -208,6 +257,50 @@ const LearningCopilot = forwardRef(
       }
     }, [chat, loading]);
 
+    // Stop any progress poll when the page changes or the component unmounts
+    useEffect(() => {
+      progressPollRef.current += 1;
+      return () => {
+        progressPollRef.current += 1;
+      };
+    }, [topic_id, subtopic_id, nested_subtopic_id]);
+
+    // /chat evaluates objectives in the background; poll with backoff until the
+    // saved progress changes (new ETag), then show it
+    const pollSavedProgress = async () => {
+      const poll = ++progressPollRef.current;
+      const startEtag = progressEtagRef.current;
+      for (const delay of PROGRESS_POLL_DELAYS_MS) {
+        await sleep(delay);
+        if (poll !== progressPollRef.current) return; // superseded by a newer turn or page
+        try {
+          const res = await axios.get(
+            `${import.meta.env.VITE_BACKEND_URL}/get-progress`,
+            {
+              params: {
+                student_id: studentId,
+                topic_id: topic_id,
+                subtopic_id: subtopic_id,
+                nested_subtopic_id: nested_subtopic_id,
+              },
+            }
+          );
+          if (poll !== progressPollRef.current) return;
+          const etag = res.headers?.etag ?? null;
+          if (etag && etag === startEtag) continue;
+          progressEtagRef.current = etag;
+          const { objective_progress = [] } = res.data || {};
+          if (Array.isArray(objective_progress)) {
+            setMergedProgress([...objective_progress]);
+            onProgressUpdate?.([...objective_progress]);
+          }
+          return;
+        } catch (error) {
+          console.error("Failed to refresh progress", error);
+        }
+      }
+    };
+
     const calculateGrade = (flags) => {
       const total = flags.length;
       const score = flags.reduce(
@@ -344,8 +437,17 @@ const LearningCopilot = forwardRef(
         }
 
         // 🔁 Always send message to backend regardless of firstPromptSent
-        const res = await axios.post(
-          `${import.meta.env.VITE_BACKEND_URL}/chat`,
+        // Reply tokens are streamed into a placeholder message as they arrive
+        setChat((prev) => [...prev, { role: "assistant", content: "" }]);
+        let streamedReply = "";
+        const updateStreamedMessage = (content) =>
+          setChat((prev) => {
+            const next = [...prev];
+            next[next.length - 1] = { role: "assistant", content };
+            return next;
+          });
+
+        const final = await streamChat(
           {
             student_id: studentId,
             message: messageToSend,
@@ -354,15 +456,25 @@ const LearningCopilot = forwardRef(
             nested_subtopic_id,
             history: updatedChat,
             objectives,
+          },
+          (token) => {
+            streamedReply += token;
+            setStreaming(true);
+            updateStreamedMessage(streamedReply);
           }
         );
 
-        const { reply: backendReply, progress = [], ready_prompt } = res.data;
+        const {
+          reply: backendReply = streamedReply,
+          progress = [],
+          ready_prompt,
+          evaluation,
+        } = final || {};
+        updateStreamedMessage(backendReply);
 
-        setChat((prev) => [
-          ...prev,
-          { role: "assistant", content: backendReply },
-        ]);
+        if (evaluation === "queued") {
+          pollSavedProgress();
+        }
 
         if (Array.isArray(progress)) {
           const newEvidence = {};
@@ -379,13 +491,6 @@ const LearningCopilot = forwardRef(
           }
         }
 
-        // ⛔️ This block is outside the above `if (Array.isArray(progress))`
-        if (JSON.stringify(newProgress) !== JSON.stringify(mergedProgress)) {
-          setMergedProgress(newProgress);
-          onProgressUpdate?.(newProgress);
-          persistProgress(newProgress, quizScore, "ai");
-        }
-
         if (ready_prompt) {
           setChat((prev) => [
             ...prev,
@@ -395,11 +500,12 @@ const LearningCopilot = forwardRef(
       } catch (err) {
         console.error("Chat error:", err);
         setChat((prev) => [
-          ...prev,
+          ...prev.filter((msg) => msg.content !== ""),
           { role: "assistant", content: "⚠️ Sorry, something went wrong." },
         ]);
       } finally {
         setLoading(false);
+        setStreaming(false);
       }
     };
 
@@ -420,7 +526,8 @@ const LearningCopilot = forwardRef(
             className="flex-1 px-4 py-4 space-y-2 overflow-y-auto"
             ref={chatContainerRef}
           >
-            {chat.map((msg, idx) => (
+            {chat.map((msg, idx) =>
+              msg.content === "" ? null : (
               <div
                 key={idx}
                 className={`text-sm ${
@@ -435,8 +542,9 @@ const LearningCopilot = forwardRef(
                   <ReactMarkdown>{msg.content}</ReactMarkdown>
                 </div>
               </div>
-            ))}
-            {loading && (
+              )
+            )}
+            {loading && !streaming && (
               <div className="text-center text-gray-500">Thinking…</div>
             )}
           </div>
@@ -33,9 +33,18 @@ const AdminPanel = () => {
 
   const fetchStudents = async () => {
     try {
-      const res = await fetch("http://localhost:8000/students");
-      const data = await res.json();
-      setStudents(data);
+      // /students is paged; follow X-Next-Cursor until the last page
+      const all = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: "500" });
+        if (cursor) params.set("after", cursor);
+        const res = await fetch(`http://localhost:8000/students?${params}`);
+        if (!res.ok) throw new Error();
+        all.push(...(await res.json()));
+        cursor = res.headers.get("X-Next-Cursor");
+      } while (cursor);
+      setStudents(all);
     } catch (err) {
       setError("Failed to load students.");
     }
@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 
 const Dashboard = () => {
     const [progressData, setProgressData] = useState([]);
+    const [topicSummaries, setTopicSummaries] = useState({});
     const [loading, setLoading] = useState(true);
     const [expandedModules, setExpandedModules] = useState({});
     const userId = localStorage.getItem('student_id');
@@ -11,10 +12,11 @@ const Dashboard = () => {
         const fetchProgress = async () => {
             if (!userId) return;
             try {
-                const res = await fetch(`http://localhost:8000/progress-all/${userId}`);
+                const res = await fetch(`http://localhost:8000/progress-summary/${userId}`);
                 const data = await res.json();
-                console.log("📊 Loaded Progress Data:", data);
-                setProgressData(data);
+                console.log("📊 Loaded Progress Summary:", data);
+                setProgressData(data.lessons || []);
+                setTopicSummaries(data.topics || {});
             } catch (err) {
                 console.error("Failed to fetch progress:", err);
             } finally {
@@ -75,7 +77,7 @@ const Dashboard = () => {
                                                 Module: {subtopic.replace(/_/g, ' ').replace(/\b\w/g, char => char.toUpperCase())}
                                             </h2>
                                             <span className="text-md text-green-700 font-semibold">
-                                                Assignment: 0%
+                                                Assignment: {topicSummaries[`${topic}/${subtopic}`]?.assignment_score ?? 0}%
                                             </span>
                                         </div>
                                     </div>
@@ -1,4 +1,5 @@
-# run_backend.py
+# run_backend.py — development server (single process, auto-reload on file changes)
+# For production use the multi-worker launcher: python -m backend.serve
 import os
 from dotenv import load_dotenv
 import uvicorn
@@ -0,0 +1,42 @@
+import asyncio
+
+from backend.objective_loader import chat_evaluators
+
+chat = chat_evaluators.get_module(("digital_electronics", "number_systems"))
+
+QUESTION = {"role": "assistant", "content": "Convert 25 to binary."}
+
+
+def run_with_model(monkeypatch, reply, messages, state=None):
+    """evaluate_chat_incremental with the model stubbed to `reply`; returns (flags, prompts sent)."""
+    prompts = []
+
+    async def fake_evaluate_flags(prompt):
+        prompts.append(prompt)
+        return reply
+
+    monkeypatch.setattr(chat, "evaluate_flags", fake_evaluate_flags)
+    _, flags = asyncio.run(chat.evaluate_chat_incremental(state, messages, "binary"))
+    return flags, prompts
+
+
+def test_bare_checked_answer_skips_the_model(monkeypatch):
+    flags, prompts = run_with_model(monkeypatch, "[true, true, true, true]", [QUESTION, {"role": "user", "content": "11001"}])
+    assert prompts == []
+    assert flags == [False, "progress", False, False, False, False]
+
+
+def test_answer_with_an_explanation_is_also_judged_by_the_model(monkeypatch):
+    message = {"role": "user", "content": "25 in binary is 11001. The leftmost bit is the MSB, worth 16 here."}
+    # Model-scored objectives for binary are 0, 3, 4 and 5 (1 and 2 are checked conversions)
+    flags, prompts = run_with_model(monkeypatch, "[false, true, false, 'partial']", [QUESTION, message])
+    assert len(prompts) == 1
+    assert flags == [False, "progress", False, True, False, "progress"]
+
+
+def test_model_is_skipped_once_its_objectives_are_complete(monkeypatch):
+    state = {"flags": [True, False, False, True, True, True], "verifier": None}
+    message = {"role": "user", "content": "25 in binary is 11001, and the MSB is the leftmost bit."}
+    flags, prompts = run_with_model(monkeypatch, "[false, false, false, false]", [QUESTION, message], state)
+    assert prompts == []
+    assert flags == [True, "progress", False, True, True, True]
@@ -0,0 +1,74 @@
+import asyncio
+
+from backend.grade_cache import GradeCache
+
+
+def test_concurrent_misses_share_one_grading_run():
+    cache = GradeCache()
+    runs = []
+
+    async def grade():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 80.0, "feedback": "ok"}
+
+    async def run():
+        first = await asyncio.gather(*(cache.get_or_create("k", grade) for _ in range(5)))
+        again = await cache.get_or_create("k", grade)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert len(runs) == 1
+    assert first == [{"score": 80.0, "feedback": "ok"}] * 5
+    assert again == {"score": 80.0, "feedback": "ok"}
+    stats = cache.stats()
+    assert stats["coalesced"] == 4
+    assert stats["stores"] == 1
+
+
+def test_callers_get_their_own_copy():
+    cache = GradeCache()
+
+    async def run():
+        result = await cache.get_or_create("k", _grade(90.0))
+        result["score"] = 0
+        return await cache.get("k")
+
+    assert asyncio.run(run())["score"] == 90.0
+
+
+def test_grader_errors_are_not_cached():
+    cache = GradeCache()
+    failed = {"score": 0, "feedback": "❌ An error occurred while grading: boom", "error": "ValueError"}
+
+    async def run():
+        first = await cache.get_or_create("k", _grade(result=failed))
+        second = await cache.get_or_create("k", _grade(75.0))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["error"] == "ValueError"
+    assert second["score"] == 75.0
+    assert cache.stats()["stores"] == 1
+
+
+def test_disabled_cache_always_grades():
+    cache = GradeCache(enabled=False)
+    runs = []
+
+    async def grade():
+        runs.append(1)
+        return {"score": 50.0, "feedback": "ok"}
+
+    async def run():
+        for _ in range(3):
+            await cache.get_or_create("k", grade)
+
+    asyncio.run(run())
+    assert len(runs) == 3
+
+
+def _grade(score: float = 0.0, result: dict = None):
+    async def grade():
+        return dict(result) if result else {"score": score, "feedback": "ok"}
+    return grade
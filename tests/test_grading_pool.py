@@ -0,0 +1,103 @@
+import time
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+from backend.grading_pool import GraderNotFound, GradingOverloaded, GradingPool, GradingTimeout, StudentGradingLimit
+
+
+def sleep_then_grade(seconds: float) -> dict:
+    """Stand-in grader run in the pool's worker processes (importable there as tests.test_grading_pool)."""
+    time.sleep(seconds)
+    return {"score": 100.0, "feedback": f"slept {seconds}"}
+
+
+class InlinePool(GradingPool):
+    """No worker processes: every job resolves immediately to `result`."""
+
+    def __init__(self, result=None, **kwargs):
+        super().__init__(**kwargs)
+        self.result = result
+        self._executor = object()  # running, nothing to start
+
+    def _submit(self, topic_id, subtopic_id, contents):
+        future = Future()
+        future.set_result(self.result)
+        return self._executor, future
+
+
+class SleepingPool(GradingPool):
+    """Real worker processes; the upload bytes are the number of seconds the job sleeps."""
+
+    def _submit(self, topic_id, subtopic_id, contents):
+        executor = self._executor
+        return executor, executor.submit(sleep_then_grade, float(contents))
+
+
+def test_admit_enforces_queue_and_per_student_limits():
+    pool = InlinePool(max_queue=3, max_per_student=2)
+    pool.admit("alice")
+    pool.admit("alice")
+    with pytest.raises(StudentGradingLimit):
+        pool.admit("alice")
+    pool.admit("bob")
+    with pytest.raises(GradingOverloaded):
+        pool.admit("carol")
+    assert pool.stats()["in_flight"] == 3
+    assert pool.stats()["rejected"] == 2
+
+
+def test_grade_releases_its_slot():
+    pool = InlinePool(result={"score": 90.0, "feedback": "ok"}, max_queue=1, max_per_student=1)
+
+    async def run():
+        results = []
+        for _ in range(3):
+            pool.admit("alice")
+            results.append(await pool.grade("t", "s", b"", "alice"))
+        return results
+
+    assert asyncio.run(run()) == [{"score": 90.0, "feedback": "ok"}] * 3
+    assert pool.stats()["in_flight"] == 0
+    assert pool.stats()["completed"] == 3
+    assert pool._per_student == {}
+
+
+def test_missing_grader_releases_its_slot():
+    pool = InlinePool(result=None, max_queue=1)
+
+    async def run():
+        pool.admit("alice")
+        await pool.grade("t", "s", b"", "alice")
+
+    with pytest.raises(GraderNotFound):
+        asyncio.run(run())
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_timeout_frees_the_slot_and_recycles_workers():
+    pool = SleepingPool(workers=1, max_queue=1, timeout=1.0)
+
+    async def run():
+        await pool.start()
+        hung_executor = pool._executor
+        pool.admit("alice")
+        started = time.monotonic()
+        with pytest.raises(GradingTimeout):
+            await pool.grade("t", "s", b"60", "alice")
+        waited = time.monotonic() - started
+        # The slot is free right away, and the next job runs on fresh workers
+        assert pool.stats()["in_flight"] == 0
+        assert pool._executor is not hung_executor
+        pool.timeout = 60  # the replacement worker still has to spawn and warm up
+        pool.admit("alice")
+        result = await pool.grade("t", "s", b"0", "alice")
+        await pool.shutdown()
+        return waited, result
+
+    waited, result = asyncio.run(run())
+    assert waited < 5
+    assert result["score"] == 100.0
+    assert pool.stats()["timed_out"] == 1
+    assert pool.stats()["completed"] == 1
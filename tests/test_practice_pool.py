@@ -0,0 +1,19 @@
+import asyncio
+
+from backend.llm_cache import LLMResponseCache, MemoryCacheBackend, PracticeProblemPool
+
+
+def test_problems_rotate_and_cursors_stay_bounded():
+    pool = PracticeProblemPool(LLMResponseCache(local=MemoryCacheBackend()), size=2, max_objectives=3)
+
+    async def generate(n):
+        return [f"problem {i}" for i in range(n)]
+
+    async def run():
+        served = [await pool.next("Convert decimal to binary", generate) for _ in range(3)]
+        for i in range(10):
+            await pool.next(f"objective {i}", generate)
+        return served
+
+    assert asyncio.run(run()) == ["problem 0", "problem 1", "problem 0"]
+    assert pool.stats()["objectives"] == 3
@@ -0,0 +1,147 @@
+import math
+import asyncio
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.progress_store import build_progress_update, flags_grade, merge_flags, progress_query, upsert_progress
+
+
+# ───── A tiny evaluator for the aggregation operators the update pipeline uses ─────
+def evaluate(expr, doc, variables):
+    if isinstance(expr, str) and expr.startswith("$$"):
+        return variables[expr[2:]]
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc, variables) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+
+    (op, arg), = expr.items()
+    ev = lambda e: evaluate(e, doc, variables)  # noqa: E731
+    if op == "$literal":
+        return arg
+    if op == "$ifNull":
+        value = ev(arg[0])
+        return ev(arg[1]) if value is None else value
+    if op == "$size":
+        return len(ev(arg))
+    if op == "$max":
+        return max(ev(a) for a in arg)
+    if op == "$range":
+        return list(range(ev(arg[0]), ev(arg[1])))
+    if op == "$arrayElemAt":
+        array, i = ev(arg[0]), ev(arg[1])
+        return array[i] if i < len(array) else None
+    if op == "$eq":
+        a, b = ev(arg[0]), ev(arg[1])
+        return type(a) is type(b) and a == b  # Mongo never equates true with 1
+    if op == "$or":
+        return any(ev(a) for a in arg)
+    if op == "$cond":
+        return ev(arg[1]) if ev(arg[0]) else ev(arg[2])
+    if op == "$divide":
+        return ev(arg[0]) / ev(arg[1])
+    if op == "$multiply":
+        return ev(arg[0]) * ev(arg[1])
+    if op == "$trunc":
+        return math.trunc(ev(arg))
+    if op == "$toInt":
+        return int(ev(arg))
+    if op == "$switch":
+        for branch in arg["branches"]:
+            if ev(branch["case"]):
+                return ev(branch["then"])
+        return ev(arg["default"])
+    if op == "$let":
+        return evaluate(arg["in"], doc, {**variables, **{name: ev(v) for name, v in arg["vars"].items()}})
+    if op == "$map":
+        return [evaluate(arg["in"], doc, {**variables, arg["as"]: x}) for x in ev(arg["input"])]
+    if op == "$filter":
+        return [x for x in ev(arg["input"]) if evaluate(arg["cond"], doc, {**variables, "this": x})]
+    raise NotImplementedError(op)
+
+
+def apply_pipeline(doc: dict, pipeline: list) -> dict:
+    for stage in pipeline:
+        (op, fields), = stage.items()
+        assert op == "$set"
+        doc = {**doc, **{name: evaluate(expr, doc, {"NOW": datetime.utcnow()}) for name, expr in fields.items()}}
+    return doc
+
+
+class FakeProgressCollection:
+    """find_one_and_update over a dict of documents; `race` simulates a concurrent first insert."""
+
+    def __init__(self, race: dict = None):
+        self.docs = {}
+        self.race = race
+        self.calls = []
+
+    async def find_one_and_update(self, query, pipeline, upsert=False, return_document=None):
+        self.calls.append({"upsert": upsert})
+        key = tuple(sorted(query.items()))
+        if upsert and self.race is not None:
+            # Another request inserted the document between our match and our insert
+            self.docs[key], self.race = {**query, **self.race}, None
+            raise DuplicateKeyError("E11000 duplicate key error")
+        if key not in self.docs and not upsert:
+            return None
+        self.docs[key] = apply_pipeline(self.docs.get(key, dict(query)), pipeline)
+        return self.docs[key]
+
+
+# ───── build_progress_update ─────
+def test_update_merges_into_stored_flags_and_grades():
+    stored = {"ai_objective_progress": [True, False, "progress"], "quiz_objective_progress": [False, "progress", False, True]}
+    doc = apply_pipeline(stored, build_progress_update(ai_flags=[False, "progress", True]))
+    assert doc["ai_objective_progress"] == [True, "progress", True]
+    assert doc["quiz_objective_progress"] == [False, "progress", False, True]
+    assert doc["topic_grade"] == 75  # either source completes an objective: True, "progress", True, True
+
+
+def test_update_on_a_new_document():
+    doc = apply_pipeline({}, build_progress_update(quiz_flags=["progress", True], quiz_score=80))
+    assert doc["ai_objective_progress"] == []
+    assert doc["quiz_objective_progress"] == ["progress", True]
+    assert doc["quiz_score"] == 80
+    assert doc["topic_grade"] == 50
+
+
+def test_update_leaves_quiz_score_alone_unless_given():
+    doc = apply_pipeline({"quiz_score": 60}, build_progress_update(ai_flags=[True]))
+    assert doc["quiz_score"] == 60
+
+
+def test_pipeline_matches_python_twins():
+    cases = [([], []), ([True], []), (["progress", False], [False, True, "progress"]), ([False] * 4, ["progress"] * 2)]
+    for ai, quiz in cases:
+        doc = apply_pipeline({}, build_progress_update(ai_flags=ai, quiz_flags=quiz))
+        assert doc["topic_grade"] == flags_grade(merge_flags(ai, quiz))
+
+
+# ───── upsert_progress ─────
+def test_upsert_creates_then_merges():
+    collection = FakeProgressCollection()
+    query = progress_query("s1", " Digital_Electronics", "Number_Systems ", "binary")
+
+    first = asyncio.run(upsert_progress(collection, query, ai_flags=[True, False]))
+    second = asyncio.run(upsert_progress(collection, query, ai_flags=[False, "progress"], quiz_score=70))
+
+    assert first["topic_id"] == "digital_electronics"
+    assert second["ai_objective_progress"] == [True, "progress"]
+    assert second["quiz_score"] == 70
+    assert second["topic_grade"] == 50
+    assert len(collection.docs) == 1
+
+
+def test_upsert_retries_without_upsert_after_duplicate_key():
+    collection = FakeProgressCollection(race={"ai_objective_progress": [False, True], "quiz_objective_progress": []})
+    query = progress_query("s1", "digital_electronics", "number_systems", "binary")
+
+    updated = asyncio.run(upsert_progress(collection, query, ai_flags=[True, False]))
+
+    assert collection.calls == [{"upsert": True}, {"upsert": False}]
+    assert updated["ai_objective_progress"] == [True, True]  # merged with the racing writer's flags, not overwritten
+    assert updated["topic_grade"] == 100
@@ -0,0 +1,23 @@
+from backend.progress_cache import merge_objective_progress, progress_view
+
+
+def test_true_beats_progress_regardless_of_source():
+    assert merge_objective_progress(["progress", False, True], [True, "progress", False]) == [True, "progress", True]
+    assert merge_objective_progress([True], ["progress"]) == [True]
+
+
+def test_shorter_list_is_padded_with_false():
+    assert merge_objective_progress([True], [False, "progress", False]) == [True, "progress", False]
+    assert merge_objective_progress([], []) == []
+
+
+def test_view_returns_stored_topic_grade():
+    view = progress_view({"ai_objective_progress": [True, False], "quiz_objective_progress": [], "quiz_score": 90, "topic_grade": 50})
+    assert view["topic_grade"] == 50
+    assert view["quiz_score"] == 90
+
+
+def test_view_computes_grade_for_documents_without_one():
+    view = progress_view({"ai_objective_progress": [True, "progress"], "quiz_objective_progress": [False, False, True, False], "quiz_score": 10})
+    assert view["objective_progress"] == [True, "progress", True, False]
+    assert view["topic_grade"] == 50
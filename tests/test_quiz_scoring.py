@@ -0,0 +1,51 @@
+from backend.objective_loader import load_quiz_scorer, quiz_evaluators
+
+score_submission = load_quiz_scorer("digital_electronics", "number_systems")
+evaluator = quiz_evaluators.get_module(("digital_electronics", "number_systems"))
+
+
+def key_questions(nested, count):
+    """The first `count` (type, question, canonical answer) entries of the real answer key."""
+    return [(qtype, question, expected) for (qtype, question), expected in list(evaluator.answer_key(nested).items())[:count]]
+
+
+def test_fabricated_questions_earn_nothing():
+    answers = [
+        {"type": "dec_to_bin", "question": f"Convert {900 + i} to binary (made up)", "student_answer": "1", "correct_answer": "1"}
+        for i in range(5)
+    ]
+    result = score_submission("binary", answers)
+    assert result["score"] == 0
+    assert result["correct"] == 0
+    assert result["ungradable"] == 5
+    assert result["results"] == [None] * 5
+    assert not any(result["quiz_objective_progress"])
+
+
+def test_fabricated_questions_dilute_real_ones():
+    (qtype, question, expected), = key_questions("binary", 1)
+    answers = [{"type": qtype, "question": question, "student_answer": format(expected, "b") if isinstance(expected, int) else expected}]
+    answers += [{"type": "dec_to_bin", "question": "made up", "student_answer": "1", "correct_answer": "1"}]
+    result = score_submission("binary", answers)
+    assert result["results"] == [True, None]
+    assert result["correct"] == 1
+    assert result["total"] == 2
+    assert result["score"] == 50
+
+
+def test_real_questions_are_scored_against_the_key():
+    items = key_questions("octal", 3)
+    answers = [{"type": t, "question": q, "student_answer": "not a number"} for t, q, _ in items]
+    result = score_submission("octal", answers)
+    assert result["results"] == [False, False, False]
+    assert result["score"] == 0
+    assert result["ungradable"] == 0
+
+
+def test_repeated_question_is_scored_once():
+    (qtype, question, expected), = key_questions("binary", 1)
+    answer = {"type": qtype, "question": question, "student_answer": format(expected, "b") if isinstance(expected, int) else expected}
+    result = score_submission("binary", [answer] * 3)
+    assert result["results"] == [True, None, None]
+    assert result["score"] == 33
+    assert result["ungradable"] == 2
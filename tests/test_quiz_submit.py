@@ -0,0 +1,66 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.api.quiz import QuizSubmission, check_answers, issued_questions
+from backend.objective_loader import load_quiz
+
+KEY = ("digital_electronics", "number_systems", "binary")
+
+
+def submission(answers=(), seed="week-3", count=None) -> QuizSubmission:
+    return QuizSubmission(
+        student_id="s1", topic_id=KEY[0], subtopic_id=KEY[1], nested_subtopic_id=KEY[2],
+        answers=list(answers), seed=seed, count=count,
+    )
+
+
+def issued_quiz(seed="week-3", count=None):
+    """The quiz GET /quiz/... serves to student s1 for this seed and count."""
+    return load_quiz(*KEY).generate(seed=seed, student_id="s1", count=count)
+
+
+def answers_for(quiz):
+    return [{"type": q["type"], "question": q["question"], "student_answer": ""} for q in quiz]
+
+
+def test_issued_quiz_is_rebuilt_from_seed_student_and_count():
+    quiz = issued_quiz(count=4)
+    assert issued_questions(load_quiz(*KEY), submission(count=4)) == [(q["type"], q["question"]) for q in quiz]
+
+
+def test_complete_submission_is_accepted():
+    quiz = issued_quiz()
+    check_answers([(q["type"], q["question"]) for q in quiz], answers_for(quiz))
+
+
+@pytest.mark.parametrize("tamper", ["duplicate", "unknown", "partial"])
+def test_tampered_submissions_are_rejected(tamper):
+    quiz = issued_quiz()
+    issued = [(q["type"], q["question"]) for q in quiz]
+    answers = answers_for(quiz)
+    if tamper == "duplicate":
+        answers[-1] = answers[0]
+    elif tamper == "unknown":
+        answers[-1] = {"type": "dec_to_bin", "question": "made up", "student_answer": "1"}
+    else:
+        answers = answers[:-1]
+    with pytest.raises(HTTPException) as error:
+        check_answers(issued, answers)
+    assert error.value.status_code == 422
+
+
+def test_another_seed_is_another_quiz():
+    issued = [(q["type"], q["question"]) for q in issued_quiz(seed="week-4")]
+    with pytest.raises(HTTPException):
+        check_answers(issued, answers_for(issued_quiz(seed="week-3")))
+
+
+def test_empty_submission_never_reaches_progress():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.api.quiz import router
+
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).post("/quiz/submit", json=submission().model_dump())
+    assert response.status_code == 422